@@ -0,0 +1,158 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from typing import Protocol
+
+from catalog import PrefetchedCatalog
+from models.products import Product
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class AsyncCatalog(Protocol):
+    """
+    Non blocking price lookups for asyncio applications.
+    Products without a price are left out of the returned mapping.
+    """
+
+    async def get_unit_prices(self, products: Iterable[Product]) -> dict:
+        ...
+
+
+class FakeAsyncCatalog:
+    """
+    In-process AsyncCatalog answering every bulk lookup after a configurable latency.
+    connections limits the concurrent lookups like the connection pool of a real database.
+    """
+
+    def __init__(self, latency: float = 0.0, connections: int | None = None) -> None:
+        self.latency = latency
+        self.prices = {}
+        self.calls = 0
+        self._connections = asyncio.Semaphore(connections) if connections else None
+
+    def add_product(self, product: Product, price: float) -> None:
+        self.prices[product] = price
+
+    async def get_unit_prices(self, products: Iterable[Product]) -> dict:
+        self.calls += 1
+        products = list(products)
+        if self._connections is None:
+            await asyncio.sleep(self.latency)
+        else:
+            async with self._connections:
+                await asyncio.sleep(self.latency)
+        return {product: self.prices[product] for product in products if product in self.prices}
+
+
+class CoalescingCatalog:
+    """
+    AsyncCatalog in front of another one that merges concurrent lookups.
+    A product already being fetched is not requested again, every waiter shares the one
+    in-flight lookup (single flight), and the products requested within window seconds are
+    fetched together with one bulk call (micro batching), at most max_batch per call.
+    Nothing is cached once the lookup completes.
+    """
+
+    def __init__(self, catalog: AsyncCatalog, window: float = 0.001, max_batch: int = 1000) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self._catalog = catalog
+        self.window = window
+        self.max_batch = max_batch
+        # product -> future of the prices of the batch fetching it, until that fetch completes
+        self._in_flight = {}
+        # the batch being collected and the future its waiters share
+        self._pending = []
+        self._pending_future = None
+        self._flush_handle = None
+        self._fetches = set()
+        self.batches = 0
+        self.coalesced = 0
+
+    async def get_unit_prices(self, products: Iterable[Product]) -> dict:
+        loop = asyncio.get_running_loop()
+        wanted = {}
+        for product in products:
+            if product in wanted:
+                continue
+            future = self._in_flight.get(product)
+            if future is None:
+                if self._pending_future is None:
+                    self._pending_future = loop.create_future()
+                future = self._in_flight[product] = self._pending_future
+                self._pending.append(product)
+                if len(self._pending) >= self.max_batch:
+                    self._flush()
+            else:
+                self.coalesced += 1
+            wanted[product] = future
+
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # one future per batch rather than per product, usually a single one to wait for,
+        # shielded so a cancelled checkout does not cancel a lookup other checkouts share
+        batches = list({id(future): future for future in wanted.values()}.values())
+        results = await asyncio.gather(*(asyncio.shield(future) for future in batches), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        prices = {}
+        for product, future in wanted.items():
+            batch_prices = future.result()
+            if product in batch_prices:
+                prices[product] = batch_prices[product]
+        return prices
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, future = self._pending, self._pending_future
+        self._pending, self._pending_future = [], None
+        self.batches += 1
+        # keep a reference, the event loop only holds weak references to tasks
+        task = asyncio.ensure_future(self._fetch(batch, future))
+        self._fetches.add(task)
+        task.add_done_callback(self._fetches.discard)
+
+    async def _fetch(self, batch: list[Product], future: asyncio.Future) -> None:
+        try:
+            prices = await self._catalog.get_unit_prices(batch)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(prices)
+        finally:
+            for product in batch:
+                del self._in_flight[product]
+
+
+class AsyncTeller:
+    """
+    Asyncio front of a Teller, the prices of a cart are fetched with one awaited bulk lookup on an
+    AsyncCatalog so the event loop is never blocked. The offers are registered on the wrapped Teller
+    and applied exactly like it does, the pricing itself is synchronous and in memory. The Teller's
+    own catalog answers the strategies that price products outside the cart.
+    """
+
+    def __init__(self, teller: Teller, catalog: AsyncCatalog) -> None:
+        self.teller = teller
+        self.catalog = catalog
+
+    async def checks_out_articles_from(self, cart: ShoppingCart) -> Receipt:
+        # the offers of the snapshot taken when the checkout starts, even if they are reloaded meanwhile
+        context = self.teller.pricing_context()
+        products = list(dict.fromkeys(pq.product for pq in cart.items))
+        prices = await self.catalog.get_unit_prices(products)
+        if len(prices) < len(products):
+            raise KeyError("Missing product in prices list")
+        return context.check_out(cart, PrefetchedCatalog(context.catalog, prices))
+
+    async def checkout_many(self, carts: Iterable[ShoppingCart]) -> AsyncIterator[Receipt]:
+        for cart in carts:
+            yield await self.checks_out_articles_from(cart)
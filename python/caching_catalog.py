@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from catalog import SupermarketCatalog
+from models.products import Product
+
+
+class CachingCatalog(SupermarketCatalog):
+    """
+    Read-through price cache in front of any SupermarketCatalog.
+    Entries are evicted least recently used first once max_size is reached, and expire
+    after ttl seconds. Changing a price through add_product invalidates the cached entry.
+    """
+
+    def __init__(self, catalog: SupermarketCatalog, max_size: int | None = None,
+                 ttl: float | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._catalog = catalog
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        # product -> (unit price, expiry time or None)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def add_product(self, product: Product, price: float) -> None:
+        self._catalog.add_product(product, price)
+        self.invalidate(product)
+
+    def get_unit_price(self, product: Product) -> float:
+        entry = self._lookup(product)
+        if entry is not None:
+            return entry[0]
+
+        self.misses += 1
+        unit_price = self._catalog.get_unit_price(product)
+        self._store(product, unit_price)
+        return unit_price
+
+    def get_unit_prices(self, products: Iterable[Product]) -> dict:
+        prices = {}
+        missing = []
+        for product in products:
+            entry = self._lookup(product)
+            if entry is None:
+                missing.append(product)
+            else:
+                prices[product] = entry[0]
+
+        # every miss is fetched with a single bulk call to the wrapped catalog
+        if missing:
+            self.misses += len(missing)
+            for product, unit_price in self._catalog.get_unit_prices(missing).items():
+                self._store(product, unit_price)
+                prices[product] = unit_price
+        return prices
+
+    def invalidate(self, product: Product | None = None) -> None:
+        """Drops the cached price of the product, or every cached price when no product is given."""
+        if product is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(product, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, product: Product) -> tuple | None:
+        entry = self._entries.get(product)
+        if entry is None:
+            return None
+        if entry[1] is not None and self._clock() >= entry[1]:
+            del self._entries[product]
+            self.expirations += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(product)
+        return entry
+
+    def _store(self, product: Product, unit_price: float) -> None:
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        self._entries[product] = (unit_price, expires_at)
+        self._entries.move_to_end(product)
+        if self.max_size is not None and len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
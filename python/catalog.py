@@ -1,3 +1,10 @@
+import csv
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from models.products import Product, ProductUnit
+from models.registry import ProductRegistry, default_registry
+
 
 class SupermarketCatalog:
 
@@ -7,3 +14,83 @@ class SupermarketCatalog:
     def get_unit_price(self, product):
         raise Exception("cannot be called from a unit test - it accesses the database")
 
+    def get_unit_prices(self, products: Iterable) -> dict:
+        """
+        Returns {product: unit price} for all the given products in a single call.
+        Catalogs backed by a database should override this with one round trip,
+        the default falls back to one get_unit_price call per product.
+        """
+        return {product: self.get_unit_price(product) for product in products}
+
+
+class PrefetchedCatalog(SupermarketCatalog):
+    """
+    Read only catalog view serving the prices fetched in bulk for a cart,
+    products that were not prefetched are looked up in the wrapped catalog,
+    or are missing when there is no catalog to fall back on.
+    """
+
+    def __init__(self, catalog: SupermarketCatalog | None, prices: dict) -> None:
+        self._catalog = catalog
+        self._prices = dict(prices)
+
+    def add_product(self, product, price):
+        if self._catalog is None:
+            raise TypeError("prefetched prices cannot be changed")
+        self._catalog.add_product(product, price)
+        self._prices.pop(product, None)
+
+    def get_unit_price(self, product):
+        try:
+            return self._prices[product]
+        except KeyError:
+            if self._catalog is None:
+                raise KeyError("Missing product in prices list") from None
+            return self._catalog.get_unit_price(product)
+
+
+class InMemoryCatalog(SupermarketCatalog):
+    """
+    Catalog held in memory. The prices are a table indexed by the registry id of the product,
+    so a lookup is one dict probe in the registry and one list index, and two products sharing
+    a name but not a unit keep their own prices.
+    """
+
+    def __init__(self, registry: ProductRegistry | None = None) -> None:
+        # should be the registry of the teller and the carts, the ids then come interned already
+        self.registry = registry if registry is not None else default_registry
+        # product id -> unit price, None for the products of the registry without a price
+        self._prices = []
+
+    def add_product(self, product, price):
+        product_id = self.registry.intern(product)
+        if product_id >= len(self._prices):
+            self._prices.extend([None] * (product_id + 1 - len(self._prices)))
+        self._prices[product_id] = price
+
+    def get_unit_price(self, product):
+        product_id = self.registry.id_of(product)
+        price = self._prices[product_id] if product_id is not None and product_id < len(self._prices) else None
+        if price is None:
+            raise KeyError("Missing product in prices list")
+        return price
+
+    def get_unit_prices(self, products: Iterable) -> dict:
+        return {product: self.get_unit_price(product) for product in products}
+
+    def products(self) -> Iterator:
+        """Yields every product with a price, in registration order."""
+        registry = self.registry
+        return (registry.product(product_id) for product_id, price in enumerate(self._prices) if price is not None)
+
+    def __len__(self) -> int:
+        return sum(price is not None for price in self._prices)
+
+
+def load_catalog(path: str | Path, registry: ProductRegistry | None = None) -> InMemoryCatalog:
+    """Reads a catalog CSV with the columns name, unit (a ProductUnit name) and price."""
+    catalog = InMemoryCatalog(registry)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            catalog.add_product(Product(row["name"], ProductUnit[row["unit"]]), float(row["price"]))
+    return catalog
@@ -0,0 +1,175 @@
+from catalog import PrefetchedCatalog, SupermarketCatalog
+from models.bundles import BundleStrategy, FixedBundleStrategy
+from models.money import multiply, to_minor
+from models.offers import OfferStrategy
+from models.products import Product
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import PricingContext, Teller
+
+
+class CheckoutSession:
+    """
+    Live pricing of a cart while it is being scanned at the lane.
+    The session subscribes to the cart and on every scan adds the receipt line and
+    re-evaluates only the offers affected by the scanned product, replacing their
+    previous discounts, so each scan costs O(1) in the basket size.
+    Bundles are the exception: a scan changing the whole units of a bundled product matches
+    again every bundle connected to it through the products of the cart, which costs a
+    match_bundles of that group, bounded by its search budget. The match is skipped when the
+    scan cannot change it: the whole units of the product did not change, or its bundles are
+    fixed ones already holding more of it than their other products let them use.
+    The totals match a full Teller checkout, the discounts are not listed in the offer
+    registration order.
+    """
+
+    def __init__(self, teller: Teller, cart: ShoppingCart | None = None, exact: bool = False) -> None:
+        self.teller = teller
+        self.cart = cart if cart is not None else ShoppingCart(teller.registry)
+        context = teller.pricing_context()
+        context.check_registry(self.cart)
+        # a session of a Teller pricing in Money rounds the lines and discounts like its checkout
+        self.receipt = Receipt(exact=exact, money=teller.money)
+        # product -> unit price, every product is looked up once per session
+        self._prices = {}
+        # product id -> index of its receipt line, only used when the cart aggregates the scans
+        self._lines = {}
+        # strategy -> the discounts it currently has on the receipt
+        self._discounts = {}
+        # product id -> whole units the bundles were last matched with, and the offer index they were matched on
+        self._bundled_units = {}
+        self._bundle_index = None
+
+        # price whatever was scanned before the session started, with one snapshot of the teller
+        for pq in self.cart.items:
+            self._add_line(pq.product, pq.quantity, context.catalog)
+        for product in dict.fromkeys(pq.product for pq in self.cart.items):
+            self._reprice(product, context)
+        self.cart.subscribe(self._on_item_added)
+
+    @property
+    def total(self):
+        return self.receipt.total_price()
+
+    @property
+    def discounts(self):
+        return self.receipt.discounts
+
+    def close(self) -> Receipt:
+        """Stops following the cart and returns the final receipt."""
+        self.cart.unsubscribe(self._on_item_added)
+        return self.receipt
+
+    def _on_item_added(self, product: Product, quantity: int | float) -> None:
+        # the catalog and the offers of one registration for the scan, even if the teller is reloaded meanwhile
+        context = self.teller.pricing_context()
+        self._add_line(product, quantity, context.catalog)
+        self._reprice(product, context)
+
+    def _add_line(self, product: Product, quantity: int | float, catalog: SupermarketCatalog) -> None:
+        unit_price = self._prices.get(product)
+        if unit_price is None:
+            unit_price = self._prices[product] = catalog.get_unit_price(product)
+        receipt = self.receipt
+        line = None
+        if self.cart.aggregate:
+            # the cart sums the scans of a product into one line, the receipt line follows it like a checkout
+            product_id = self.teller.registry.id_of(product)
+            quantity = self.cart.product_quantities[product_id]
+            line = self._lines.get(product_id)
+            if line is None:
+                self._lines[product_id] = len(receipt.items)
+        if receipt.money:
+            unit_price = to_minor(unit_price)
+            if line is None:
+                receipt.add_product_minor(product, quantity, unit_price, multiply(unit_price, quantity))
+            else:
+                receipt.replace_product_minor(line, product, quantity, unit_price, multiply(unit_price, quantity))
+        elif line is None:
+            receipt.add_product(product, quantity, unit_price, quantity * unit_price)
+        else:
+            receipt.replace_product(line, product, quantity, unit_price, quantity * unit_price)
+
+    def _reprice(self, product: Product, context: PricingContext) -> None:
+        prefetched = PrefetchedCatalog(context.catalog, {product: self._prices[product]})
+        product_id = context.registry.id_of(product)
+        quantity = self.cart.product_quantities.get(product_id, 0)
+        # the exclusive offers are resolved together, the ones left out lose their discounts
+        winners = {strategy: (plan, allotted) for _, strategy, plan, allotted
+                   in context.exclusive_offers(product_id, quantity, self.cart, prefetched)}
+        for _, strategy, plan in context.affected_entries(product_id):
+            if isinstance(strategy, BundleStrategy):
+                continue
+            if not getattr(strategy, "exclusive", False):
+                discounts = context.evaluate(strategy, plan, quantity, self.cart, prefetched)
+            elif strategy in winners:
+                discounts = context.evaluate(strategy, *winners[strategy], self.cart, prefetched)
+            else:
+                discounts = []
+            self._replace_discounts(strategy, discounts)
+        if product_id in context.index.bundles_by_product:
+            units = int(quantity)
+            matched_units = self._bundled_units.get(product_id, 0)
+            self._bundled_units[product_id] = units
+            if context.index is not self._bundle_index:
+                # reloaded or another schedule segment, the bundles themselves may have changed
+                self._bundle_index = context.index
+            elif units == matched_units or self._saturated(product_id, matched_units, context):
+                return
+            self._rematch_bundles(product_id, context)
+
+    def _saturated(self, product_id: int, units: int, context: PricingContext) -> bool:
+        # the bundles cannot use more than units of the product, whatever the match more of it changes nothing,
+        # only fixed bundles have such a bound, a mix and match bundle can take any number of a product
+        registry = context.registry
+        product_quantities = self.cart.product_quantities
+        product = registry.product(product_id)
+        usable = 0
+        for _, bundle, _ in context.index.bundles_by_product[product_id]:
+            if not isinstance(bundle, FixedBundleStrategy):
+                return False
+            counts = bundle.counts
+            others = [int(product_quantities.get(registry.id_of(other), 0)) // count
+                      for other, count in counts.items() if other != product]
+            if not others:
+                return False
+            usable += counts[product] * min(others)
+            if usable > units:
+                return False
+        return True
+
+    def _rematch_bundles(self, product_id: int, context: PricingContext) -> None:
+        # a scan can move units between bundles sharing products of the cart, the bundles connected to the
+        # scanned product that way are matched again, the units of the other bundles cannot move
+        registry = context.registry
+        bundles_by_product = context.index.bundles_by_product
+        product_quantities = self.cart.product_quantities
+        entries = {}
+        reached = {product_id}
+        pending = [product_id]
+        while pending:
+            for entry in bundles_by_product.get(pending.pop(), ()):
+                if entry[0] in entries:
+                    continue
+                entries[entry[0]] = entry
+                for product in entry[1].products:
+                    other_id = registry.id_of(product)
+                    if other_id not in reached and other_id in product_quantities:
+                        reached.add(other_id)
+                        pending.append(other_id)
+
+        prefetched = PrefetchedCatalog(context.catalog, self._prices)
+        matches = {bundle: match for _, bundle, match, _ in context.match_bundles(entries.values(), self.cart, prefetched)}
+        for _, bundle, _ in entries.values():
+            match = matches.get(bundle)
+            discounts = [] if match is None else context.evaluate(bundle, match, None, self.cart, prefetched)
+            self._replace_discounts(bundle, discounts)
+
+    def _replace_discounts(self, strategy: OfferStrategy, discounts: list) -> None:
+        # the receipt removes a discount in O(1), replacing costs the discounts of the strategy only
+        for discount in self._discounts.pop(strategy, ()):
+            self.receipt.remove_discount(discount)
+        for discount in discounts:
+            self.receipt.add_discount(discount)
+        if discounts:
+            self._discounts[strategy] = discounts
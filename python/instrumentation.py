@@ -0,0 +1,111 @@
+import bisect
+import socket
+from collections import defaultdict, deque
+from collections.abc import Iterable
+from time import perf_counter
+
+from catalog import SupermarketCatalog
+
+# upper bounds in seconds of the latency histogram buckets, the last bucket is unbounded
+DEFAULT_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+
+def _stopped_clock() -> float:
+    return 0.0
+
+
+class MetricsSink:
+    """
+    Receives the checkout metrics. This base class is the no-op default: its clock is stopped and
+    its timings and counters are dropped, the Teller only checks enabled to skip the per offer metrics.
+    """
+
+    enabled = False
+    # the timer of the checkout phases
+    clock = staticmethod(_stopped_clock)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        pass
+
+    def timing(self, name: str, seconds: float) -> None:
+        pass
+
+
+class NullSink(MetricsSink):
+    """Explicit no-op sink, instrumentation is disabled."""
+
+
+class InMemorySink(MetricsSink):
+    """
+    Collects counters and timings in memory, for tests and ad hoc profiling. Only the last
+    max_samples timings of each name are kept, so a long running process does not grow.
+    """
+
+    enabled = True
+    clock = staticmethod(perf_counter)
+
+    def __init__(self, max_samples: int = 10000) -> None:
+        self.counters = defaultdict(int)
+        self.timings = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def timing(self, name: str, seconds: float) -> None:
+        self.timings[name].append(seconds)
+
+    def histogram(self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> list[int]:
+        """Counts the kept timings of name per bucket, one more count than buckets for the overflow."""
+        counts = [0] * (len(buckets) + 1)
+        for seconds in self.timings.get(name, ()):
+            counts[bisect.bisect_left(buckets, seconds)] += 1
+        return counts
+
+
+class StatsdSink(MetricsSink):
+    """
+    Emits the metrics as StatsD packets over UDP (fire and forget, send errors are ignored).
+    Timings are sent in milliseconds, the StatsD server builds the histograms.
+    """
+
+    enabled = True
+    clock = staticmethod(perf_counter)
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8125, prefix: str = "supermarket") -> None:
+        self._address = (host, port)
+        self._prefix = f"{prefix}." if prefix else ""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self._send(f"{self._prefix}{name}:{value}|c")
+
+    def timing(self, name: str, seconds: float) -> None:
+        self._send(f"{self._prefix}{name}:{seconds * 1000:.3f}|ms")
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def _send(self, packet: str) -> None:
+        try:
+            self._socket.sendto(packet.encode("ascii"), self._address)
+        except OSError:
+            pass
+
+
+class InstrumentedCatalog(SupermarketCatalog):
+    """Counts the calls made to the wrapped catalog."""
+
+    def __init__(self, catalog: SupermarketCatalog, metrics: MetricsSink) -> None:
+        self._catalog = catalog
+        self._metrics = metrics
+
+    def add_product(self, product, price):
+        self._catalog.add_product(product, price)
+
+    def get_unit_price(self, product):
+        self._metrics.increment("catalog.get_unit_price.calls")
+        return self._catalog.get_unit_price(product)
+
+    def get_unit_prices(self, products: Iterable) -> dict:
+        self._metrics.increment("catalog.get_unit_prices.calls")
+        return self._catalog.get_unit_prices(products)
@@ -0,0 +1,166 @@
+"""
+Replays a transaction journal through the Teller and writes the receipts, for example:
+
+python journal_replay.py journal.jsonl.gz --catalog catalog.csv --offers offers.toml --output receipts.txt
+
+The journal is streamed through a generator pipeline, parse -> price -> format -> write, a single
+cart is in flight at a time so memory does not grow with the size of the journal.
+Journals are JSON lines, one cart per line: {"cart": "0001", "items": [{"name": "apples", "quantity": 1.5}]}
+or CSV with the columns cart, name, quantity where the rows of a cart are consecutive.
+Files starting with the gzip magic number are decompressed on the fly.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from itertools import groupby
+from pathlib import Path
+from typing import NamedTuple, TextIO
+
+from catalog import load_catalog
+from models.products import Product
+from offer_config import load_offers
+from receipt import Receipt
+from receipt_printer import ReceiptFormatter, TextReceiptFormatter
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class Transaction(NamedTuple):
+    """A cart of the journal, its (product name, quantity) lines in scan order."""
+    cart: str
+    items: list[tuple[str, float]]
+
+
+class ReplayReport(NamedTuple):
+    carts: int
+    items: int
+    seconds: float
+
+    @property
+    def carts_per_second(self) -> float:
+        return self.carts / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"replayed {self.carts} carts ({self.items} items) in {self.seconds:.3f}s, "
+                f"{self.carts_per_second:.1f} carts/s")
+
+
+def open_journal(path: str | Path) -> TextIO:
+    """Opens a journal for reading as text, gzip compressed journals are recognised by their content."""
+    with open(path, "rb") as f:
+        compressed = f.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[Transaction]:
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            yield Transaction(str(record["cart"]),
+                              [(item["name"], float(item["quantity"])) for item in record["items"]])
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Transaction]:
+    rows = csv.DictReader(lines)
+    for cart, cart_rows in groupby(rows, key=lambda row: row["cart"]):
+        yield Transaction(cart, [(row["name"], float(row["quantity"])) for row in cart_rows])
+
+
+def parse_journal(lines: Iterable[str], journal_format: str) -> Iterator[Transaction]:
+    if journal_format == "jsonl":
+        return parse_jsonl(lines)
+    if journal_format == "csv":
+        return parse_csv(lines)
+    raise ValueError(f"unknown journal format {journal_format!r}, expected 'jsonl' or 'csv'")
+
+
+def journal_format_of(journal: str | Path) -> str:
+    suffixes = [suffix for suffix in Path(journal).suffixes if suffix != ".gz"]
+    return suffixes[-1].lstrip(".") if suffixes else "jsonl"
+
+
+def price(transactions: Iterable[Transaction], teller: Teller,
+          products: Mapping[str, Product]) -> Iterator[tuple[Transaction, Receipt]]:
+    """Checks out every transaction, the product names are resolved with products (name -> Product)."""
+    for transaction in transactions:
+        cart = ShoppingCart(teller.registry)
+        for name, quantity in transaction.items:
+            try:
+                product = products[name]
+            except KeyError:
+                raise KeyError(f"cart {transaction.cart}: unknown product {name!r}") from None
+            cart.add_item_quantity(product, quantity)
+        yield transaction, teller.checks_out_articles_from(cart)
+
+
+def format_receipts(priced: Iterable[tuple[Transaction, Receipt]],
+                    formatter: ReceiptFormatter) -> Iterator[tuple[Transaction, Iterator[str]]]:
+    for transaction, receipt in priced:
+        yield transaction, formatter.iter_lines(receipt)
+
+
+def write_receipts(formatted: Iterable[tuple[Transaction, Iterator[str]]], stream: TextIO,
+                   clock: Callable[[], float] = time.perf_counter) -> ReplayReport:
+    """Drains the pipeline into the stream, the receipts are separated by a blank line."""
+    start = clock()
+    carts = items = 0
+    for transaction, lines in formatted:
+        if carts:
+            stream.write("\n")
+        stream.writelines(lines)
+        carts += 1
+        items += len(transaction.items)
+    return ReplayReport(carts, items, clock() - start)
+
+
+def replay(journal: str | Path, teller: Teller, products: Mapping[str, Product], stream: TextIO,
+           journal_format: str | None = None, formatter: ReceiptFormatter | None = None,
+           clock: Callable[[], float] = time.perf_counter) -> ReplayReport:
+    """
+    Replays the journal file and writes a receipt per cart to the stream. The format is taken from
+    the file name (.jsonl or .csv, optionally followed by .gz) unless journal_format is given.
+    """
+    if journal_format is None:
+        journal_format = journal_format_of(journal)
+    formatter = formatter or TextReceiptFormatter()
+    with open_journal(journal) as lines:
+        transactions = parse_journal(lines, journal_format)
+        return write_receipts(format_receipts(price(transactions, teller, products), formatter), stream, clock)
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description="Replays a transaction journal and writes the receipts.")
+    parser.add_argument("journal", help="journal file, .jsonl or .csv, optionally gzip compressed")
+    parser.add_argument("--catalog", default="catalog.csv", help="catalog CSV with the columns name, unit, price")
+    parser.add_argument("--offers", help="offer file (.csv, .json or .toml, see offer_config), no offers by default")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="journal format, taken from the file name by default")
+    parser.add_argument("--output", help="write the receipts to this file instead of the standard output")
+    options = parser.parse_args(args)
+
+    catalog = load_catalog(options.catalog)
+    # the journal names the products, a name sold by the kilo and by the piece resolves to the last one
+    products = {product.name: product for product in catalog.products()}
+    teller = Teller(catalog, catalog.registry)
+    if options.offers:
+        teller.add_special_offers(load_offers(options.offers, products))
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as stream:
+            report = replay(options.journal, teller, products, stream, options.format)
+    else:
+        report = replay(options.journal, teller, products, sys.stdout, options.format)
+    print(report, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from catalog import SupermarketCatalog
+from models.products import Product, ProductUnit
+
+# Snapshot layout, little-endian on every platform, every section starts on an 8 byte boundary:
+#   header   magic, version, product count
+#   offsets  count + 1 uint64, name i is names[offsets[i]:offsets[i + 1]]
+#   prices   count float64
+#   units    count uint8, 0 for no unit, ProductUnit.value otherwise
+#   names    the utf-8 names, sorted by (name, unit)
+_HEADER = struct.Struct("<4sHxxQ")
+_MAGIC = b"SMKT"
+_VERSION = 1
+# the arrays are written and read little-endian, big-endian hosts swap them
+_SWAP = sys.byteorder != "little"
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def write_snapshot(path: str, products_with_prices: Iterable[tuple[Product, float]]) -> int:
+    """
+    Writes a catalog snapshot for MmapCatalog, the last price of a product listed twice wins.
+    The file is written next to path and renamed over it, so workers mapping the previous
+    snapshot keep a consistent view. Returns the number of products written.
+    """
+    prices = {}
+    for product, price in products_with_prices:
+        prices[product.name.encode("utf-8"), product.unit.value if product.unit else 0] = price
+    keys = sorted(prices)
+
+    offsets = [0]
+    for name, _ in keys:
+        offsets.append(offsets[-1] + len(name))
+    count = len(keys)
+
+    # a temporary file of its own, concurrent writers of the same snapshot never share one
+    directory, name = os.path.split(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False) as f:
+        try:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, count))
+            f.write(_little_endian(array("Q", offsets)))
+            f.write(_little_endian(array("d", (prices[key] for key in keys))))
+            units = bytes(unit for _, unit in keys)
+            f.write(units + bytes(_aligned(count) - count))
+            f.write(b"".join(name for name, _ in keys))
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    # temporary files are private, the snapshot gets the mode of any file created by the process
+    # so workers running as other users can map it
+    os.chmod(f.name, 0o666 & ~_umask())
+    os.replace(f.name, path)
+    return count
+
+
+def _umask() -> int:
+    # the umask can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def _little_endian(values: array) -> bytes:
+    if _SWAP:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, data: memoryview) -> memoryview | array:
+    # read in place on little-endian hosts, copied and swapped on the others
+    if not _SWAP:
+        return data.cast(typecode)
+    values = array(typecode, data.tobytes())
+    values.byteswap()
+    return values
+
+
+class _Names:
+    """Sorted names of a snapshot as a sequence, bisect searches it without reading the whole index."""
+
+    def __init__(self, names: mmap.mmap, start: int, offsets: memoryview) -> None:
+        self._names = names
+        self._start = start
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._names[self._start + self._offsets[index]:self._start + self._offsets[index + 1]]
+
+
+class MmapCatalog(SupermarketCatalog):
+    """
+    Read only catalog serving the prices of a snapshot written by write_snapshot.
+    The file is memory mapped and nothing is parsed when it is opened, a lookup is a binary search
+    over the sorted names touching O(log n) pages, so processes mapping the same snapshot share it
+    through the page cache. Pickling reopens the file instead of copying the prices.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is not a catalog snapshot")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        offsets_start = _HEADER.size
+        prices_start = offsets_start + 8 * (count + 1)
+        units_start = prices_start + 8 * count
+        names_start = units_start + _aligned(count)
+        if len(self._map) < names_start:
+            self._map.close()
+            raise ValueError(f"{path} is a truncated catalog snapshot")
+
+        view = memoryview(self._map)
+        self._offsets = _read_array("Q", view[offsets_start:prices_start])
+        self._prices = _read_array("d", view[prices_start:units_start])
+        self._units = view[units_start:units_start + count]
+        self._names = _Names(self._map, names_start, self._offsets)
+        view.release()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __reduce__(self):
+        return (MmapCatalog, (self.path,))
+
+    def add_product(self, product, price):
+        raise TypeError("snapshot prices cannot be changed, write a new snapshot")
+
+    def get_unit_price(self, product: Product) -> float:
+        name = product.name.encode("utf-8")
+        unit = product.unit.value if product.unit else 0
+        # the units of a name are next to each other, in increasing order
+        index = bisect_left(self._names, name)
+        while index < len(self._names) and self._names[index] == name:
+            if self._units[index] == unit:
+                return self._prices[index]
+            index += 1
+        raise KeyError("Missing product in prices list")
+
+    def items(self) -> Iterable[tuple[Product, float]]:
+        """Yields (product, unit price) for every product of the snapshot, sorted by name."""
+        units = {unit.value: unit for unit in ProductUnit}
+        for index in range(len(self._names)):
+            yield Product(self._names[index].decode("utf-8"), units.get(self._units[index])), self._prices[index]
+
+    def close(self) -> None:
+        for view in (self._offsets, self._prices, self._units):
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __enter__(self) -> "MmapCatalog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
@@ -0,0 +1,488 @@
+from abc import abstractmethod
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import product as combinations_of
+from typing import NamedTuple
+
+from catalog import SupermarketCatalog
+from models.discounts import Discount
+from models.money import Rounding
+from models.offers import OfferStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+
+
+class BundleMatch(NamedTuple):
+    """How many times a bundle applies to a cart and the discount it gives (positive)."""
+    count: int
+    amount: float
+
+
+class BundleStrategy(OfferStrategy):
+    """
+    Offer on several products bought together. A bundle has no target product, the Teller indexes
+    it on each of its products and matches all the bundles of a cart together so a unit counts
+    towards at most one bundle. Only whole units are bundled.
+    The receipt has no line for the bundle itself, its discount is attached to a product named
+    after the bundle.
+    """
+
+    def __init__(self, products: Iterable[Product], bundle_price: float, name: str = None,
+                 description: str = None, *, priority: int = 0,
+                 rounding: Rounding = Rounding.HALF_UP, effective_from: float | datetime | None = None,
+                 effective_until: float | datetime | None = None):
+        super().__init__(None, 1, description, priority=priority, rounding=rounding,
+                         effective_from=effective_from, effective_until=effective_until)
+        self.products = tuple(dict.fromkeys(products))
+        self.bundle_price = bundle_price
+        self.product = Product(name or self.generate_name(), ProductUnit.EACH)
+        if not description:
+            self.description = self.generate_description()
+
+    @abstractmethod
+    def generate_name(self) -> str:
+        """Generates the name printed for the bundle, e.g. 'toothbrush + toothpaste'."""
+
+    @abstractmethod
+    def max_count(self, available: dict) -> int:
+        """Returns how many times the bundle can be made from the available units (product -> units)."""
+
+    def discounts_for(self, match: BundleMatch) -> list[Discount]:
+        if match.amount > 0:
+            return [Discount(self.product, self.description, -match.amount)]
+        return []
+
+    def calculate_discount(self, cart: ShoppingCart, catalog: SupermarketCatalog) -> list[Discount]:
+        # the bundle on its own, the Teller matches it together with the other bundles of the cart
+        available = {}
+        for product in self.products:
+            units = int(cart.get_product_quantity(product))
+            if units > 0:
+                available[product] = units
+        if not available:
+            return []
+        match = match_bundles([self], available, catalog.get_unit_prices(available)).get(self)
+        return self.discounts_for(match) if match else []
+
+
+class FixedBundleStrategy(BundleStrategy):
+    """A set of products for a fixed price, e.g. toothbrush + toothpaste for 2.99. A product listed twice is needed twice."""
+
+    def __init__(self, products: Iterable[Product], bundle_price: float, name: str = None,
+                 description: str = None, *, priority: int = 0,
+                 rounding: Rounding = Rounding.HALF_UP, effective_from: float | datetime | None = None,
+                 effective_until: float | datetime | None = None):
+        products = list(products)
+        self.counts = Counter(products)
+        super().__init__(products, bundle_price, name, description, priority=priority, rounding=rounding,
+                         effective_from=effective_from, effective_until=effective_until)
+
+    def generate_name(self) -> str:
+        return " + ".join(product.name for product in self.products)
+
+    def generate_description(self) -> str:
+        return f"bundle for {self.bundle_price:.2f}"
+
+    def max_count(self, available: dict) -> int:
+        return min(available.get(product, 0) // count for product, count in self.counts.items())
+
+
+class MixAndMatchBundleStrategy(BundleStrategy):
+    """
+    Any required_count units of the products for a fixed price, e.g. any 3 of these yogurts for 5.00.
+    The most expensive units are bundled, they give the customer the biggest discount, unless another
+    bundle of the cart gives more for them.
+    """
+
+    def __init__(self, products: Iterable[Product], required_count: int, bundle_price: float, name: str = None,
+                 description: str = None, *, priority: int = 0,
+                 rounding: Rounding = Rounding.HALF_UP, effective_from: float | datetime | None = None,
+                 effective_until: float | datetime | None = None):
+        self.required_count = required_count
+        super().__init__(products, bundle_price, name, description, priority=priority, rounding=rounding,
+                         effective_from=effective_from, effective_until=effective_until)
+
+    def generate_name(self) -> str:
+        return "mix and match"
+
+    def generate_description(self) -> str:
+        return f"any {self.required_count} for {self.bundle_price:.2f}"
+
+    def max_count(self, available: dict) -> int:
+        return sum(available.get(product, 0) for product in self.products) // self.required_count
+
+
+def match_bundles(bundles: list[BundleStrategy], available: dict, prices: dict) -> dict:
+    """
+    Assigns the available units (product -> whole units) to the bundles for the biggest total discount,
+    returns bundle -> BundleMatch for the bundles that apply. available is not modified.
+    Bundles sharing no product are matched separately. Within a group of overlapping bundles every
+    number of applications of each bundle is searched, the fixed bundles one after the other keyed
+    on the units they leave, then the mix and match bundles together on each of those leftovers, see
+    _fill_pooled. Matching overlapping bundles is a packing problem, the combinations grow with the
+    units and exponentially with the bundles competing for them, so the search of a group stops after
+    _SEARCH_BUDGET steps, about a tenth of a second. The group is then matched greedily, see _greedy,
+    in time proportional to the units times the products of the group, and the match may miss the
+    biggest discount.
+    Between combinations giving the same discount the bundles with the higher priority win, then
+    the ones given first.
+    """
+    bundles = sorted(bundles, key=lambda bundle: -bundle.priority)
+    matches = {}
+    for group in _overlapping_groups(bundles, available):
+        products = list(dict.fromkeys(product for bundle in group for product in bundle.products
+                                      if product in available))
+        try:
+            assignment = _search(group, products, available, prices, _Budget(_SEARCH_BUDGET))
+        except _OutOfBudget:
+            assignment = _greedy(group, available, prices)
+        for bundle, (count, regular_total) in zip(group, assignment):
+            if count:
+                matches[bundle] = BundleMatch(count, regular_total - count * bundle.bundle_price)
+    return matches
+
+
+def _overlapping_groups(bundles: list[BundleStrategy], available: dict) -> list[list[BundleStrategy]]:
+    # union find on the products in the cart, two bundles are in the same group when they share one
+    parent = {}
+
+    def find(product):
+        while parent[product] is not product:
+            parent[product] = parent[parent[product]]
+            product = parent[product]
+        return product
+
+    for bundle in bundles:
+        in_cart = [product for product in bundle.products if product in available]
+        for product in in_cart:
+            parent.setdefault(product, product)
+        for product in in_cart[1:]:
+            parent[find(product)] = find(in_cart[0])
+
+    groups = {}
+    for bundle in bundles:
+        in_cart = [product for product in bundle.products if product in available]
+        if in_cart:
+            groups.setdefault(find(in_cart[0]), []).append(bundle)
+    return list(groups.values())
+
+
+# discounts closer than this are a tie, the sums of float prices depend on the order they are added in
+_TIE = 1e-9
+
+
+def _better(gain: float, counts: tuple, best: tuple | None) -> bool:
+    # the biggest discount, then the most applications of the first bundles
+    if best is None or gain > best[0] + _TIE:
+        return True
+    return gain >= best[0] - _TIE and counts > best[1]
+
+
+# steps of the search of a group of overlapping bundles, a step is a unit count or a product looked at,
+# a budget of about a tenth of a second
+_SEARCH_BUDGET = 100_000
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class _Budget:
+
+    def __init__(self, steps: int) -> None:
+        self.steps = steps
+
+    def spend(self, steps: int) -> None:
+        self.steps -= steps
+        if self.steps < 0:
+            raise _OutOfBudget()
+
+
+def _search(group: list[BundleStrategy], products: list[Product], available: dict, prices: dict,
+            budget: _Budget) -> list[tuple]:
+    """
+    Returns (count, regular total of the units bundled) for each bundle of the group, in order.
+    Raises _OutOfBudget when the search takes more steps than budget allows.
+    """
+    position = {product: index for index, product in enumerate(products)}
+    fixed = [index for index, bundle in enumerate(group) if not isinstance(bundle, MixAndMatchBundleStrategy)]
+    pooled = [index for index, bundle in enumerate(group) if isinstance(bundle, MixAndMatchBundleStrategy)]
+
+    # the units left of the products touched by the fixed bundles so far that a later bundle wants
+    # are the state, the other products are either untouched or done with
+    pooled_positions = sorted({position[product] for index in pooled for product in group[index].products
+                               if product in position})
+    wanted = set(pooled_positions)
+    frontiers = []
+    for index in reversed(fixed):
+        frontiers.append(wanted)
+        wanted = wanted | {position[product] for product in group[index].counts if product in position}
+    frontiers.reverse()
+    touched = set()
+    for stage, index in enumerate(fixed):
+        touched |= {position[product] for product in group[index].counts if product in position}
+        frontiers[stage] = sorted(touched & frontiers[stage])
+    units_at = [available[product] for product in products]
+    # the regular price of the units of one fixed bundle, the bundles missing a product never apply
+    worth = {index: sum(count * prices.get(product, 0.0) for product, count in group[index].counts.items())
+             for index in fixed}
+
+    # the fixed bundles one at a time, state -> (discount, counts so far), two ways of leaving the
+    # same units are completed the same way so only the best is kept, iteratively however many bundles
+    frontier = []
+    layer = {(): (0.0, ())}
+    for index, next_frontier in zip(fixed, frontiers):
+        bundle = group[index]
+        needs = {position[product]: count for product, count in bundle.counts.items() if product in position}
+        complete = len(needs) == len(bundle.counts)
+        next_layer = {}
+        for remaining, (gain, counts) in layer.items():
+            units = dict(zip(frontier, remaining))
+            budget.spend(len(frontier))
+            most = min(units.get(i, units_at[i]) // count for i, count in needs.items()) if complete else 0
+            budget.spend(most * len(next_frontier))
+            for count in range(most, -1, -1):
+                left = tuple(units.get(i, units_at[i]) - needs.get(i, 0) * count for i in next_frontier)
+                candidate = gain + count * (worth[index] - bundle.bundle_price), counts + (count,)
+                if _better(*candidate, next_layer.get(left)):
+                    next_layer[left] = candidate
+        frontier, layer = next_frontier, next_layer
+
+    pooled_bundles = [group[index] for index in pooled]
+    # a unit is bundled for no less than the cheapest price per unit of the bundles it is part of
+    cheapest = {}
+    for bundle in pooled_bundles:
+        rate = bundle.bundle_price / bundle.required_count
+        for product in bundle.products:
+            cheapest[product] = min(cheapest.get(product, rate), rate)
+    leaves = []
+    for remaining, (gain, fixed_counts) in layer.items():
+        left = dict(zip(frontier, remaining))
+        units = {products[i]: left.get(i, units_at[i]) for i in pooled_positions if left.get(i, units_at[i]) > 0}
+        alone = [_alone(bundle, units, prices) for bundle in pooled_bundles]
+        budget.spend(len(units) + sum(map(len, alone)))
+        bound = min(sum(max(discounts) for discounts in alone),
+                    sum(max(prices[product] - cheapest[product], 0.0) * count for product, count in units.items()))
+        leaves.append((gain + bound, gain, fixed_counts, units, alone))
+    # the most promising leftovers first, the others are skipped once they cannot reach the best
+    leaves.sort(key=lambda leaf: -leaf[0])
+
+    best = None
+    for bound, gain, fixed_counts, units, alone in leaves:
+        if best is not None and bound < best[0] - _TIE:
+            break
+        matched = _fill_pooled(pooled_bundles, units, alone, prices, None if best is None else best[0] - gain, budget)
+        if matched is None:
+            continue
+        pooled_gain, pooled_counts, pooled_totals = matched
+        counts = [0] * len(group)
+        regular_totals = [0.0] * len(group)
+        for index, count in zip(fixed, fixed_counts):
+            counts[index] = count
+            regular_totals[index] = count * worth[index]
+        for index, count, regular_total in zip(pooled, pooled_counts, pooled_totals):
+            counts[index] = count
+            regular_totals[index] = regular_total
+        if _better(gain + pooled_gain, tuple(counts), best):
+            best = gain + pooled_gain, tuple(counts), regular_totals
+    return list(zip(best[1], best[2]))
+
+
+def _alone(bundle: MixAndMatchBundleStrategy, units: dict, prices: dict) -> list[float]:
+    """
+    Returns the discount of 0, 1, ... bundles made of the most expensive units, up to the last one
+    worth its price. Sharing the units with other bundles gives no more, and the units of a bundle
+    worth less than its price are better left out, so no count above these is ever the best.
+    """
+    eligible = sorted((product for product in bundle.products if product in units), key=lambda product: -prices[product])
+    discounts = [0.0]
+    block, size = 0.0, 0
+    for product in eligible:
+        price, left = prices[product], units[product]
+        while left:
+            count = min(left, bundle.required_count - size)
+            block += count * price
+            size += count
+            left -= count
+            if size == bundle.required_count:
+                if block - bundle.bundle_price < -_TIE:
+                    return discounts
+                discounts.append(discounts[-1] + block - bundle.bundle_price)
+                block, size = 0.0, 0
+    return discounts
+
+
+def _fill_pooled(bundles: list[MixAndMatchBundleStrategy], units: dict, alone: list[list[float]], prices: dict,
+                 floor: float | None, budget: _Budget) -> tuple[float, tuple, list] | None:
+    """
+    Matches the mix and match bundles of a group on the units left by the fixed bundles, returns the
+    discount, the count and the regular total of the units of each bundle, None when no match gives
+    at least floor.
+    Whichever bundle a unit goes to, the discount is the price of the units bundled minus the bundle
+    prices, so for given counts the most expensive units the bundles can absorb together are taken.
+    See _fill. The counts of the bundles but the last are all tried, bounded by what each bundle gives
+    on its own.
+    """
+    if not bundles:
+        return 0.0, (), []
+    # product -> the bundles it is part of, only the products some bundle can take
+    members = {}
+    for index, bundle in enumerate(bundles):
+        for product in bundle.products:
+            if product in units:
+                members.setdefault(product, []).append(index)
+    order = sorted(members, key=lambda product: -prices[product])
+
+    best = None
+    for counts in combinations_of(*(range(len(discounts) - 1, -1, -1) for discounts in alone[:-1])):
+        bound = sum(discounts[count] for discounts, count in zip(alone, counts)) + max(alone[-1])
+        if floor is not None and bound < floor - _TIE or best is not None and bound < best[0] - _TIE:
+            continue
+        filled = {}
+
+        def fill(count):
+            if count not in filled:
+                filled[count] = _fill_counts(bundles, counts + (count,), order, members, units, prices, budget)
+            return filled[count]
+
+        if fill(0) is None:
+            continue
+        # the discount is concave in the count of the last bundle, adding the units of the next
+        # bundle is worth less each time, so the best count is the last one still paying for itself
+        low, high = 0, len(alone[-1]) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fill(middle) is not None and fill(middle)[0] >= fill(middle - 1)[0] - _TIE:
+                low = middle
+            else:
+                high = middle - 1
+        gain, totals = fill(low)
+        if (floor is None or gain >= floor - _TIE) and _better(gain, counts + (low,), best):
+            best = gain, counts + (low,), totals
+    return best
+
+
+def _fill_counts(bundles: list[MixAndMatchBundleStrategy], counts: tuple, order: list[Product], members: dict,
+                 units: dict, prices: dict, budget: _Budget) -> tuple | None:
+    # the discount and the regular total of each bundle for these counts, None when they cannot be made
+    demands = [count * bundle.required_count for count, bundle in zip(counts, bundles)]
+    budget.spend(len(order) * len(bundles))
+    totals = _fill(demands, order, members, units, prices)
+    if totals is None:
+        return None
+    return sum(totals) - sum(count * bundle.bundle_price for count, bundle in zip(counts, bundles)), totals
+
+
+def _fill(demands: list[int], order: list[Product], members: dict, units: dict, prices: dict) -> list[float] | None:
+    """
+    Fills exactly the demands of the bundles with the most expensive units, returns the regular total
+    of each bundle, None when they cannot be filled.
+    A flow from the products to the bundles: the units of each product, by decreasing price, are given
+    to a bundle with room, moving units already given along the way when that makes room, so a unit is
+    never given back. Taking as many units as fit by decreasing price is the best choice, the sets of
+    units the bundles can hold together are the independent sets of a matroid.
+    """
+    room = list(demands)
+    # bundle -> product -> units given
+    given = [{} for _ in demands]
+    needed = sum(demands)
+    for product in order:
+        left = units[product]
+        while left and needed:
+            path = _room_for(product, members, room, given)
+            if path is None:
+                break
+            first, moves, last = path
+            count = min([left, room[last]] + [given[source][moved] for source, _, moved in moves])
+            given[first][product] = given[first].get(product, 0) + count
+            for source, target, moved in moves:
+                given[source][moved] -= count
+                given[target][moved] = given[target].get(moved, 0) + count
+            room[last] -= count
+            left -= count
+            needed -= count
+    if needed:
+        return None
+    return [sum(count * prices[product] for product, count in bundle.items()) for bundle in given]
+
+
+def _room_for(product: Product, members: dict, room: list[int], given: list[dict]) -> tuple | None:
+    """
+    Finds room for units of the product, breadth first: they go to one of the bundles of the product,
+    a full bundle makes room by moving units of another product to another bundle of that product.
+    Returns (first bundle, [(bundle, bundle, product moved from the first to the second)], bundle with
+    room), None when the bundles are full.
+    """
+    previous = dict.fromkeys(members[product])
+    queue = list(members[product])
+    for bundle in queue:
+        if room[bundle]:
+            moves = []
+            while previous[bundle] is not None:
+                source, moved = previous[bundle]
+                moves.append((source, bundle, moved))
+                bundle = source
+            moves.reverse()
+            return bundle, moves, moves[-1][1] if moves else bundle
+        for moved, count in given[bundle].items():
+            if count:
+                for other in members[moved]:
+                    if other not in previous:
+                        previous[other] = bundle, moved
+                        queue.append(other)
+    return None
+
+
+def _greedy(group: list[BundleStrategy], available: dict, prices: dict) -> list[tuple]:
+    """
+    Matches a group one bundle at a time, each time the bundle giving the biggest discount on the
+    units left, a mix and match bundle taking the most expensive ones, until none gives a discount.
+    Returns (count, regular total of the units bundled) for each bundle of the group, in order.
+    """
+    left = dict(available)
+    # the products of each bundle with the units of one bundle, the most expensive first
+    ranked = []
+    for bundle in group:
+        if isinstance(bundle, MixAndMatchBundleStrategy):
+            eligible = [product for product in bundle.products if product in left]
+            ranked.append(sorted(eligible, key=lambda product: -prices[product]))
+        else:
+            ranked.append(None)
+    counts = [0] * len(group)
+    regular_totals = [0.0] * len(group)
+    while True:
+        best = None
+        for index, bundle in enumerate(group):
+            taken = _take_one(bundle, ranked[index], left)
+            if taken is None:
+                continue
+            regular_total = sum(count * prices[product] for product, count in taken.items())
+            gain = regular_total - bundle.bundle_price
+            if gain > _TIE and (best is None or gain > best[0] + _TIE):
+                best = gain, index, taken, regular_total
+        if best is None:
+            return list(zip(counts, regular_totals))
+        _, index, taken, regular_total = best
+        for product, count in taken.items():
+            left[product] -= count
+        counts[index] += 1
+        regular_totals[index] += regular_total
+
+
+def _take_one(bundle: BundleStrategy, ranked: list[Product] | None, left: dict) -> dict | None:
+    # the units of one more bundle, None when there are not enough left
+    if ranked is None:
+        if any(left.get(product, 0) < count for product, count in bundle.counts.items()):
+            return None
+        return dict(bundle.counts)
+    taken = {}
+    needed = bundle.required_count
+    for product in ranked:
+        count = min(left[product], needed)
+        if count:
+            taken[product] = count
+            needed -= count
+            if not needed:
+                return taken
+    return None
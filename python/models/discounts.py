@@ -1,7 +1,9 @@
+from dataclasses import dataclass
+
 from models.products import Product
 
+@dataclass(frozen=True, slots=True)
 class Discount:
-    def __init__(self, product: Product, description, amount: float) -> None:
-        self.product = product
-        self.description = description
-        self.amount = amount
\ No newline at end of file
+    product: Product
+    description: str
+    amount: float
@@ -0,0 +1,135 @@
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache, total_ordering
+
+# minor units per major unit, amounts are counted in cents
+MINOR_UNITS = 100
+
+
+class Rounding(Enum):
+    """How an amount that falls between two minor units is rounded, ties are exactly half way."""
+    HALF_UP = "half up"      # ties away from zero
+    HALF_EVEN = "half even"  # ties to the even minor unit, no bias over many amounts
+    DOWN = "down"            # towards zero, a discount never gives away more than it computes
+    UP = "up"                # away from zero
+
+
+# receipt lines (quantity * unit price) are rounded with this policy, discounts with the one of their offer
+LINE_ROUNDING = Rounding.HALF_UP
+
+
+# looking the members up on the enum class costs more than the division itself
+_HALF_UP, _HALF_EVEN, _UP = Rounding.HALF_UP, Rounding.HALF_EVEN, Rounding.UP
+
+
+def divide(numerator: int, denominator: int, rounding: Rounding) -> int:
+    """Divides two integers (denominator > 0) rounding the quotient to an integer with the policy."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder:
+        if rounding is _HALF_UP:
+            quotient += 2 * remainder >= denominator
+        elif rounding is _HALF_EVEN:
+            twice = 2 * remainder
+            quotient += twice > denominator or (twice == denominator and quotient % 2 == 1)
+        elif rounding is _UP:
+            quotient += 1
+    return -quotient if numerator < 0 else quotient
+
+
+def ratio(value: int | float) -> tuple[int, int]:
+    """Returns value as an exact (numerator, denominator) fraction of its printed decimal value, 0.1 is 1/10."""
+    if type(value) is int:
+        return value, 1
+    if value.is_integer():
+        return int(value), 1
+    return _decimal_ratio(value)
+
+
+@lru_cache(maxsize=4096)
+def _decimal_ratio(value: float) -> tuple[int, int]:
+    return Decimal(repr(value)).as_integer_ratio()
+
+
+def multiply(minor: int, quantity: int | float, rounding: Rounding = LINE_ROUNDING) -> int:
+    """Returns minor units times quantity, rounded with the policy when the quantity is fractional."""
+    if type(quantity) is int:
+        return minor * quantity
+    if quantity.is_integer():
+        return minor * int(quantity)
+    numerator, denominator = ratio(quantity)
+    return divide(minor * numerator, denominator, rounding)
+
+
+@lru_cache(maxsize=65536)
+def to_minor(value: int | float, rounding: Rounding = Rounding.HALF_EVEN) -> int:
+    """Converts an amount in major units (1.99) to minor units (199), cached for the catalog prices."""
+    scaled = value * MINOR_UNITS
+    minor = round(scaled)
+    # prices are whole minor units, scaling them is only off by the float error, far below half a unit
+    if abs(scaled - minor) < 1e-6:
+        return minor
+    return _to_minor_exact(value, rounding)
+
+
+def _to_minor_exact(value: int | float, rounding: Rounding) -> int:
+    numerator, denominator = ratio(value)
+    return divide(numerator * MINOR_UNITS, denominator, rounding)
+
+
+@total_ordering
+class Money:
+    """
+    Amount of money as an integer number of minor units, so sums never drift.
+    Amounts only change scale through times and Money.of, which round with an explicit policy.
+    Treated as immutable, it is not a frozen dataclass like the other models as the frozen __init__
+    is twice as slow.
+    """
+    __slots__ = ("minor",)
+
+    def __init__(self, minor: int) -> None:
+        self.minor = minor
+
+    @classmethod
+    def of(cls, value: "Money | int | float", rounding: Rounding = Rounding.HALF_EVEN) -> "Money":
+        """Converts an amount in major units (1.99) to Money."""
+        if isinstance(value, Money):
+            return value
+        return cls(to_minor(value, rounding))
+
+    def times(self, quantity: int | float, rounding: Rounding = LINE_ROUNDING) -> "Money":
+        return Money(multiply(self.minor, quantity, rounding))
+
+    def __add__(self, other: "Money") -> "Money":
+        return Money(self.minor + other.minor)
+
+    def __sub__(self, other: "Money") -> "Money":
+        return Money(self.minor - other.minor)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.minor)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not Money:
+            return NotImplemented
+        return self.minor == other.minor
+
+    def __lt__(self, other: "Money") -> bool:
+        if type(other) is not Money:
+            return NotImplemented
+        return self.minor < other.minor
+
+    def __hash__(self) -> int:
+        return hash(self.minor)
+
+    def __repr__(self) -> str:
+        return f"Money(minor={self.minor})"
+
+    def __float__(self) -> float:
+        # the receipt formatters print amounts with %.2f
+        return self.minor / MINOR_UNITS
+
+    def __str__(self) -> str:
+        sign = "-" if self.minor < 0 else ""
+        major, minor = divmod(abs(self.minor), MINOR_UNITS)
+        return f"{sign}{major}.{minor:0{len(str(MINOR_UNITS)) - 1}d}"
+
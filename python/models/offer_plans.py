@@ -0,0 +1,95 @@
+from typing import NamedTuple
+
+from models.money import Rounding, divide, ratio, to_minor
+from models.offers import BuyNGetMFreeStrategy, BuyQuantityForAmountStrategy, OfferStrategy, PercentDiscountStrategy
+from models.products import Product
+
+BUY_N_GET_M_FREE = 0
+PERCENT_DISCOUNT = 1
+BUY_QUANTITY_FOR_AMOUNT = 2
+
+
+class OfferPlan(NamedTuple):
+    """
+    Flat, immutable pricing plan of a built-in offer, compiled once when the offer is registered.
+    Unused fields are 0 for the kinds that do not need them.
+    """
+    kind: int
+    product: Product
+    threshold: int | float
+    free_count: int | float
+    factor: float
+    deal_price: float
+    description: str
+
+
+def compile_offer(strategy: OfferStrategy) -> OfferPlan | None:
+    """
+    Compiles a built-in strategy into its pricing plan. Returns None for any other strategy,
+    subclasses included as they may override calculate_discount, those keep being evaluated
+    through calculate_discount.
+    """
+    strategy_type = type(strategy)
+    if strategy_type is BuyNGetMFreeStrategy:
+        return OfferPlan(BUY_N_GET_M_FREE, strategy.target_product, strategy.required_product_count,
+                         strategy.free_m, 0.0, 0.0, strategy.description)
+    if strategy_type is PercentDiscountStrategy:
+        return OfferPlan(PERCENT_DISCOUNT, strategy.target_product, strategy.required_product_count,
+                         0, strategy.percentage_decimal, 0.0, strategy.description)
+    if strategy_type is BuyQuantityForAmountStrategy:
+        return OfferPlan(BUY_QUANTITY_FOR_AMOUNT, strategy.target_product, strategy.required_product_count,
+                         0, 0.0, strategy.fixed_price_x, strategy.description)
+    return None
+
+
+def evaluate_plan(plan: OfferPlan, quantity: int | float, unit_price: float) -> float:
+    """
+    Returns the discount amount (positive) the plan gives on quantity, 0 when it does not apply.
+    The arithmetic is the same, in the same order, as the strategy so the amounts are identical.
+    """
+    kind, _, threshold, free_count, factor, deal_price, _ = plan
+    if not quantity or quantity < threshold:
+        return 0
+    if kind == BUY_N_GET_M_FREE:
+        amount = quantity // threshold * free_count * unit_price
+    elif kind == PERCENT_DISCOUNT:
+        amount = quantity * unit_price * factor
+    else:
+        amount = quantity * unit_price - (quantity // threshold * deal_price + quantity % threshold * unit_price)
+    return amount if amount > 0 else 0
+
+
+def evaluate_plan_minor(plan: OfferPlan, quantity: int | float, unit_price: int, rounding: Rounding) -> int:
+    """
+    Integer twin of evaluate_plan: the discount (positive, in minor units) the plan gives on quantity
+    at unit_price minor units, 0 when it does not apply. The amount is computed exactly and rounded
+    once with the offer's policy.
+    """
+    kind, _, threshold, free_count, factor, deal_price, _ = plan
+    if not quantity or quantity < threshold:
+        return 0
+    if type(quantity) is int and type(threshold) is int and type(free_count) is int:
+        # whole quantities, the common case, need no fractions and only a percentage is rounded
+        if kind == PERCENT_DISCOUNT:
+            factor_n, factor_d = ratio(factor)
+            amount = divide(unit_price * quantity * factor_n, factor_d, rounding)
+        elif kind == BUY_N_GET_M_FREE:
+            amount = quantity // threshold * free_count * unit_price
+        else:
+            amount = quantity // threshold * (unit_price * threshold - to_minor(deal_price))
+        return amount if amount > 0 else 0
+    quantity_n, quantity_d = ratio(quantity)
+    if kind == PERCENT_DISCOUNT:
+        factor_n, factor_d = ratio(factor)
+        amount = divide(unit_price * quantity_n * factor_n, quantity_d * factor_d, rounding)
+    else:
+        threshold_n, threshold_d = ratio(threshold)
+        number_of_deals = (quantity_n * threshold_d) // (quantity_d * threshold_n)
+        if kind == BUY_N_GET_M_FREE:
+            free_n, free_d = ratio(free_count)
+            amount = divide(number_of_deals * free_n * unit_price, free_d, rounding)
+        else:
+            # regular price of the deal quantity minus the deal price, the remainder is charged as usual
+            amount = divide(number_of_deals * (unit_price * threshold_n - to_minor(deal_price) * threshold_d),
+                            threshold_d, rounding)
+    return amount if amount > 0 else 0
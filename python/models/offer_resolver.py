@@ -0,0 +1,98 @@
+from catalog import SupermarketCatalog
+from models.offer_plans import PERCENT_DISCOUNT, evaluate_plan
+from shopping_cart import ShoppingCart
+
+
+def resolve_exclusive_offers(entries: list[tuple], quantity: int | float, unit_price: float,
+                             cart: ShoppingCart, catalog: SupermarketCatalog) -> list[tuple]:
+    """
+    Chooses the combination of the exclusive offers of one product that gives the biggest discount.
+    entries are the (registration order, strategy, plan) of the offers, each unit of the product is
+    given to at most one of them. Returns the (registration order, strategy, plan, allotted quantity)
+    of the offers that apply, the losers are left out.
+    When two combinations give the same discount the offers with the higher priority win, then the
+    ones registered first.
+    """
+    candidates = sorted(entries, key=lambda entry: (-getattr(entry[1], "priority", 0), entry[0]))
+    compiled = [entry for entry in candidates if entry[2] is not None]
+
+    # the quantity is split on whole units, weighed products and fractional offers can only
+    # give the whole quantity to a single offer
+    if _is_whole(quantity) and all(_is_whole(plan.threshold) for _, _, plan in compiled):
+        best_value, best = _split(compiled, int(quantity), unit_price)
+    else:
+        best_value, best = _whole(compiled, quantity, unit_price)
+
+    # custom strategies cannot be split, they compete for the whole quantity
+    for entry in candidates:
+        if entry[2] is None:
+            value = -sum(discount.amount for discount in entry[1].calculate_discount(cart, catalog))
+            if value > best_value:
+                best_value, best = value, [entry + (quantity,)]
+
+    best.sort(key=lambda entry: entry[0])
+    return best
+
+
+def _is_whole(value: int | float) -> bool:
+    return float(value).is_integer()
+
+
+def _whole(compiled: list[tuple], quantity: int | float, unit_price: float) -> tuple[float, list]:
+    best_value, best = 0, []
+    for entry in compiled:
+        value = evaluate_plan(entry[2], quantity, unit_price)
+        if value > best_value:
+            best_value, best = value, [entry + (quantity,)]
+    return best_value, best
+
+
+def _split(compiled: list[tuple], quantity: int, unit_price: float) -> tuple[float, list]:
+    # a deal offer only gains on complete deals, giving it anything but a multiple of its
+    # threshold wastes units, so every deal is an item of weight threshold in an unbounded
+    # knapsack: best[q] is the biggest discount on q units, O(quantity * offers)
+    deals = []
+    percent = None
+    for entry in compiled:
+        plan = entry[2]
+        if plan.kind == PERCENT_DISCOUNT:
+            # linear in the quantity, only the best percentage can be worth a unit
+            if percent is None or plan.factor > percent[2].factor:
+                percent = entry
+            continue
+        threshold = int(plan.threshold)
+        gain = evaluate_plan(plan, threshold, unit_price)
+        if 0 < threshold <= quantity and gain > 0:
+            deals.append((entry, threshold, gain))
+
+    best = [0.0] * (quantity + 1)
+    choice = [-1] * (quantity + 1)
+    for units in range(1, quantity + 1):
+        best_units = best[units - 1]
+        for index, (_, threshold, gain) in enumerate(deals):
+            if threshold <= units and best[units - threshold] + gain > best_units:
+                best_units = best[units - threshold] + gain
+                choice[units] = index
+        best[units] = best_units
+
+    # whatever the deals leave goes to the percentage
+    used = quantity
+    if percent is not None:
+        unit_gain = evaluate_plan(percent[2], 1, unit_price)
+        used = max(range(quantity + 1), key=lambda units: (best[units] + (quantity - units) * unit_gain, -units))
+
+    allotted = [0] * len(deals)
+    units = used
+    while units > 0:
+        index = choice[units]
+        if index < 0:
+            units -= 1
+        else:
+            allotted[index] += deals[index][1]
+            units -= deals[index][1]
+
+    resolved = [entry + (allotted_units,) for (entry, _, _), allotted_units in zip(deals, allotted) if allotted_units]
+    if percent is not None and used < quantity:
+        resolved.append(percent + (quantity - used,))
+    value = sum(evaluate_plan(entry[2], entry[3], unit_price) for entry in resolved)
+    return value, resolved
@@ -0,0 +1,86 @@
+from bisect import bisect_right
+from collections.abc import Iterable
+from math import inf
+
+from models.offers import OfferStrategy
+
+
+def effective_window(strategy: OfferStrategy) -> tuple[float, float]:
+    """Returns the [start, end) window of the offer, open sides are -inf and inf."""
+    start = getattr(strategy, "effective_from", None)
+    end = getattr(strategy, "effective_until", None)
+    return -inf if start is None else start, inf if end is None else end
+
+
+def is_scheduled(strategy: OfferStrategy) -> bool:
+    """True when the offer only applies during a window, offers without one always apply."""
+    return effective_window(strategy) != (-inf, inf)
+
+
+def is_effective(strategy: OfferStrategy, at: float) -> bool:
+    start, end = effective_window(strategy)
+    return start <= at < end
+
+
+class OfferSchedule:
+    """
+    Interval index of the offers with an effective window, the entries are (registration order,
+    strategy, plan) like the Teller's. The window bounds cut the timeline into segments in which
+    the same offers are active, the segment of a timestamp is found by binary search and its active
+    entries are computed the first time it is asked for. A schedule is never changed once built,
+    updated returns a new one, so it can be read from many threads.
+    """
+
+    def __init__(self, entries: Iterable[tuple] = ()) -> None:
+        self._entries = tuple(entries)
+        # sorted window bounds, computed on first lookup
+        self._boundaries = None
+        # segment -> active entries, segment i starts at _boundaries[i - 1]
+        self._active = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def updated(self, added: Iterable[tuple] = (), removed: Iterable[OfferStrategy] = ()) -> "OfferSchedule":
+        """
+        Returns a schedule with the entries added and the strategies removed, a strategy registered
+        twice loses its first entry only, like the Teller's offers and index.
+        """
+        entries = list(self._entries)
+        for offer_strategy in removed:
+            for position, (_, strategy, _) in enumerate(entries):
+                if strategy is offer_strategy:
+                    del entries[position]
+                    break
+        return OfferSchedule(entries + list(added))
+
+    def _timeline(self) -> list[float]:
+        boundaries = self._boundaries
+        if boundaries is None:
+            bounds = set()
+            for _, strategy, _ in self._entries:
+                bounds.update(bound for bound in effective_window(strategy) if bound not in (-inf, inf))
+            boundaries = self._boundaries = sorted(bounds)
+        return boundaries
+
+    def segment_at(self, at: float) -> int:
+        """Returns the segment of the timestamp, two timestamps in the same segment have the same active offers."""
+        return bisect_right(self._timeline(), at)
+
+    def active_at(self, at: float) -> tuple:
+        """Returns the entries active at the timestamp, in registration order."""
+        boundaries = self._timeline()
+        segment = bisect_right(boundaries, at)
+        active = self._active.get(segment)
+        if active is None:
+            # every timestamp of the segment sees the same offers, its start stands for all of them
+            start = boundaries[segment - 1] if segment else -inf
+            active = self._active[segment] = tuple(entry for entry in self._entries
+                                                   if is_effective(entry[1], start))
+        return active
+
+    def next_change(self, at: float) -> float | None:
+        """Returns the next timestamp at which the active offers change, None when they never do."""
+        boundaries = self._timeline()
+        segment = bisect_right(boundaries, at)
+        return boundaries[segment] if segment < len(boundaries) else None
@@ -1,16 +1,40 @@
 from abc import ABC, abstractmethod
+from datetime import date, datetime
+
 from catalog import SupermarketCatalog
 from models.discounts import Discount
+from models.money import Rounding
 from models.products import Product
 from shopping_cart import ShoppingCart
 
 
 class OfferStrategy(ABC):
-
-    def __init__(self, target_product: Product, required_product_count: int | float, discription: str =None):
+    # exclusive offers of the same product never stack, the Teller gives each unit to at most one
+    # of them, choosing the combination with the best price. Between combinations giving the same
+    # discount the higher priority wins. Offers that are not exclusive always stack.
+    exclusive = False
+    priority = 0
+    # how the Teller rounds the discount to whole minor units when it prices with Money
+    rounding = Rounding.HALF_UP
+    # the offer applies from effective_from (included) until effective_until (excluded), timestamps
+    # in seconds like time.time(), None leaves that side of the window open
+    effective_from = None
+    effective_until = None
+
+    def __init__(self, target_product: Product, required_product_count: int | float, discription: str =None,
+                 *, exclusive: bool = False, priority: int = 0, rounding: Rounding = Rounding.HALF_UP,
+                 effective_from: float | datetime | None = None, effective_until: float | datetime | None = None):
         self.target_product = target_product
         self.required_product_count = required_product_count
         self.description = discription
+        self.exclusive = exclusive
+        self.priority = priority
+        self.rounding = rounding
+        self.effective_from = _timestamp(effective_from)
+        self.effective_until = _timestamp(effective_until)
+        if (self.effective_from is not None and self.effective_until is not None
+                and self.effective_from >= self.effective_until):
+            raise ValueError("effective_from must be before effective_until")
 
     @abstractmethod
     def calculate_discount(self, cart: ShoppingCart , catalog: SupermarketCatalog) -> list[Discount]:
@@ -48,9 +72,12 @@ class OfferStrategy(ABC):
 class BuyNGetMFreeStrategy(OfferStrategy):
     
     def __init__(self, target_product: Product, required_product_count: int | float,
-                charge_m: int | float, description=None):
+                charge_m: int | float, description=None, *, exclusive: bool = False, priority: int = 0,
+                rounding: Rounding = Rounding.HALF_UP, effective_from: float | datetime | None = None,
+                effective_until: float | datetime | None = None):
         # N here is the required product count
-        super().__init__(target_product, required_product_count)
+        super().__init__(target_product, required_product_count, exclusive=exclusive, priority=priority,
+                         rounding=rounding, effective_from=effective_from, effective_until=effective_until)
         self.charge_m = charge_m
         self.free_m = required_product_count - charge_m
         self.description = description
@@ -91,8 +118,12 @@ class BuyNGetMFreeStrategy(OfferStrategy):
 
 class PercentDiscountStrategy(OfferStrategy):
     
-    def __init__(self, target_product: Product, percentage: float, description: str=None) -> None:
-        super().__init__(target_product, 1, description)
+    def __init__(self, target_product: Product, percentage: float, description: str=None,
+                 *, exclusive: bool = False, priority: int = 0, rounding: Rounding = Rounding.HALF_UP,
+                 effective_from: float | datetime | None = None,
+                 effective_until: float | datetime | None = None) -> None:
+        super().__init__(target_product, 1, description, exclusive=exclusive, priority=priority, rounding=rounding,
+                         effective_from=effective_from, effective_until=effective_until)
         self.percentage_decimal = percentage / 100.0 # Store as decimal (0.10)
         self.description = description
         if not description:
@@ -128,8 +159,11 @@ class PercentDiscountStrategy(OfferStrategy):
 class BuyQuantityForAmountStrategy(OfferStrategy):
     
     def __init__(self, target_product: Product, required_product_count: int | float,
-                 fixed_price_x: float, description: str=None):
-        super().__init__(target_product, required_product_count, description)
+                 fixed_price_x: float, description: str=None, *, exclusive: bool = False, priority: int = 0,
+                 rounding: Rounding = Rounding.HALF_UP, effective_from: float | datetime | None = None,
+                 effective_until: float | datetime | None = None):
+        super().__init__(target_product, required_product_count, description, exclusive=exclusive, priority=priority,
+                         rounding=rounding, effective_from=effective_from, effective_until=effective_until)
         self.fixed_price_x = fixed_price_x # e.g., 7.49 (the deal price)
         self.description = description
         if not description:
@@ -177,4 +211,18 @@ class BuyQuantityForAmountStrategy(OfferStrategy):
                 -discount_amount
             )]
             
-        return []
\ No newline at end of file
+        return []
+
+
+def _timestamp(value: float | datetime | date | str | None) -> float | None:
+    """Converts a window bound to a timestamp, dates are midnight and naive datetimes local time."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("is not a timestamp or an ISO 8601 date") from None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return value
@@ -1,17 +1,31 @@
+from dataclasses import dataclass, field
 from enum import Enum
 
 class ProductUnit(Enum):
     EACH = 1
     KILO = 2
 
+# frozen and slotted, millions of these are created when re-pricing batches so they
+# carry no per instance __dict__, and being immutable they are hashable by value
+@dataclass(frozen=True, slots=True)
 class Product:
-    def __init__(self, name: str, unit: ProductUnit | None=None) -> None:
-        self.name = name
-        self.unit = unit
+    name: str
+    unit: ProductUnit | None = None
+    # products are dict keys everywhere (registry, prices), the hash is computed once
+    _hash: int = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash((self.name, self.unit)))
 
-class ProductQuantity:
-    def __init__(self, product: Product, quantity: int | float) -> None:
-        self.product = product
-        self.quantity = quantity
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # string hashes differ between processes, the hash is recomputed when unpickled
+        return (Product, (self.name, self.unit))
 
+
+@dataclass(frozen=True, slots=True)
+class ProductQuantity:
+    product: Product
+    quantity: int | float
@@ -0,0 +1,48 @@
+from threading import Lock
+
+from models.products import Product
+
+
+class ProductRegistry:
+    """
+    Interns products and hands out dense integer ids (0, 1, 2, ...).
+    Products are told apart by name and unit, so two products sharing a name but not a unit
+    get different ids. The ids index the price tables and the cart and offer lookups.
+    Products are never released, a registry lives as long as the catalogs, tellers and carts using it.
+    """
+
+    def __init__(self) -> None:
+        self._ids = {}
+        self._products = []
+        self._lock = Lock()
+
+    def intern(self, product: Product) -> int:
+        """Returns the id of the product, registering it on first sight."""
+        product_id = self._ids.get(product)
+        if product_id is None:
+            with self._lock:
+                product_id = self._ids.get(product)
+                if product_id is None:
+                    # readers do not take the lock, an id is published once product() resolves it
+                    self._products.append(product)
+                    product_id = self._ids[product] = len(self._products) - 1
+        return product_id
+
+    def id_of(self, product: Product) -> int | None:
+        """Returns the id of the product, or None if it was never interned."""
+        return self._ids.get(product)
+
+    def product(self, product_id: int) -> Product:
+        return self._products[product_id]
+
+    def __contains__(self, product: Product) -> bool:
+        return product in self._ids
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+
+# shared by the carts, catalogs and tellers that are not given a registry of their own, it lives as
+# long as the process and keeps every product it ever interned: a long-lived process loading catalog
+# after catalog gives each one a registry of its own, the Teller takes the registry of its catalog
+default_registry = ProductRegistry()
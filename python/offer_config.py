@@ -0,0 +1,315 @@
+"""
+Declarative offer files, loaded into strategies for Teller.add_special_offers.
+
+Every offer is a record with a type and the fields of that type:
+
+    type                     fields
+    buy_n_get_m_free         product, required, charge
+    percent_discount         product, percentage
+    buy_quantity_for_amount  product, required, amount
+    fixed_bundle             products, amount
+    mix_and_match_bundle     products, required, amount
+
+and the optional description, exclusive, priority, rounding (a Rounding name, e.g. HALF_EVEN) and
+effective_from and effective_until, the window of a scheduled offer as timestamps or ISO 8601 dates.
+Products are given by name. JSON files hold a list of records, or {"offers": [...]}, TOML files an
+[[offers]] array of tables and CSV files a column per field, with the products of a bundle separated
+by "|" and the empty cells of the other types left out.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import tomllib
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+from models.bundles import FixedBundleStrategy, MixAndMatchBundleStrategy
+from models.money import Rounding
+from models.offers import (BuyNGetMFreeStrategy, BuyQuantityForAmountStrategy, OfferStrategy,
+                           PercentDiscountStrategy, _timestamp)
+from models.products import Product
+
+# bumped whenever OfferSpec changes, older caches are then rebuilt from the offer file
+_CACHE_VERSION = 3
+_BUNDLE_SEPARATOR = "|"
+_TRUE = {"true", "yes", "1"}
+_FALSE = {"false", "no", "0", ""}
+
+
+class OfferConfigError(ValueError):
+    """An offer file with invalid records, errors lists every problem found, not only the first."""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__(f"{len(errors)} invalid offer(s):\n" + "\n".join(errors))
+        self.errors = errors
+
+
+class OfferSpec(NamedTuple):
+    """A validated offer record, specs are hashable so identical offers can be dropped."""
+    type: str
+    products: tuple[Product, ...]
+    arguments: tuple
+    description: str | None
+    exclusive: bool
+    priority: int
+    rounding: Rounding
+    effective_from: float | None
+    effective_until: float | None
+
+    def build(self) -> OfferStrategy:
+        build, _ = _OFFER_TYPES[self.type]
+        return build(self.products, self.arguments, self.description, self.exclusive, self.priority, self.rounding,
+                     self.effective_from, self.effective_until)
+
+
+def _targeted(strategy_class: type) -> Callable[..., OfferStrategy]:
+    def build(products, arguments, description, exclusive, priority, rounding, effective_from, effective_until):
+        return strategy_class(products[0], *arguments, description, exclusive=exclusive, priority=priority,
+                              rounding=rounding, effective_from=effective_from, effective_until=effective_until)
+    return build
+
+
+def _bundle(strategy_class: type) -> Callable[..., OfferStrategy]:
+    def build(products, arguments, description, exclusive, priority, rounding, effective_from, effective_until):
+        return strategy_class(products, *arguments, description=description, priority=priority, rounding=rounding,
+                              effective_from=effective_from, effective_until=effective_until)
+    return build
+
+
+def _count(value) -> int | float:
+    number = _number(value)
+    if number <= 0:
+        raise ValueError("must be positive")
+    return int(number) if float(number).is_integer() else number
+
+
+def _charge(value) -> int | float:
+    number = _number(value)
+    if number < 0:
+        raise ValueError("must not be negative")
+    return int(number) if float(number).is_integer() else number
+
+
+def _number(value) -> int | float:
+    if isinstance(value, bool):
+        raise ValueError("is not a number")
+    try:
+        number = value if isinstance(value, (int, float)) else float(value)
+    except ValueError:
+        raise ValueError("is not a number") from None
+    if number != number or number in (float("inf"), float("-inf")):
+        raise ValueError("must be a finite number")
+    return number
+
+
+def _amount(value) -> float:
+    number = float(_number(value))
+    if number < 0:
+        raise ValueError("must not be negative")
+    return number
+
+
+def _percentage(value) -> float:
+    number = float(_number(value))
+    if not 0 < number <= 100:
+        raise ValueError("must be in (0, 100]")
+    return number
+
+
+def _bound(value) -> float:
+    # TOML has native dates and datetimes, the other formats give numbers or strings, CSV cells
+    # holding a timestamp included
+    if isinstance(value, date):
+        return _timestamp(value)
+    try:
+        return float(_number(value))
+    except ValueError:
+        if not isinstance(value, str):
+            raise
+    return _timestamp(value)
+
+
+# type -> (builder of the strategy, (field, parser) of the positional arguments after the products)
+_OFFER_TYPES = {
+    "buy_n_get_m_free": (_targeted(BuyNGetMFreeStrategy), (("required", _count), ("charge", _charge))),
+    "percent_discount": (_targeted(PercentDiscountStrategy), (("percentage", _percentage),)),
+    "buy_quantity_for_amount": (_targeted(BuyQuantityForAmountStrategy), (("required", _count), ("amount", _amount))),
+    "fixed_bundle": (_bundle(FixedBundleStrategy), (("amount", _amount),)),
+    "mix_and_match_bundle": (_bundle(MixAndMatchBundleStrategy), (("required", _count), ("amount", _amount))),
+}
+_BUNDLE_TYPES = {"fixed_bundle", "mix_and_match_bundle"}
+
+
+def read_offer_records(path: str | Path) -> Iterator[dict]:
+    """Yields the raw records of a .csv, .json or .toml offer file."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield {field: value for field, value in row.items() if value not in (None, "")}
+    elif suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        yield from records["offers"] if isinstance(records, dict) else records
+    elif suffix == ".toml":
+        with open(path, "rb") as f:
+            yield from tomllib.load(f).get("offers", [])
+    else:
+        raise ValueError(f"unknown offer file format {suffix!r}, expected .csv, .json or .toml")
+
+
+def validate_offers(records: Iterable[dict], products: Mapping[str, Product]) -> list[OfferSpec]:
+    """
+    Validates every record, products (name -> Product) resolves the product names so the strategies
+    share the catalog's products. Identical offers are kept once, at their first position.
+    Raises OfferConfigError listing all the invalid records.
+    """
+    specs = {}
+    errors = []
+    for number, record in enumerate(records, 1):
+        try:
+            spec = _validate(record, products)
+        except (KeyError, TypeError, ValueError) as e:
+            message = e.args[0] if e.args else type(e).__name__
+            errors.append(f"offer {number}: {message}")
+            continue
+        specs.setdefault(spec, None)
+    if errors:
+        raise OfferConfigError(errors)
+    return list(specs)
+
+
+def _validate(record: dict, products: Mapping[str, Product]) -> OfferSpec:
+    if not isinstance(record, dict):
+        raise ValueError(f"{record!r} is not an object")
+    offer_type = record.get("type")
+    if offer_type not in _OFFER_TYPES:
+        raise ValueError(f"unknown type {offer_type!r}")
+    _, fields = _OFFER_TYPES[offer_type]
+
+    if offer_type in _BUNDLE_TYPES:
+        names = record.get("products")
+        if isinstance(names, str):
+            names = names.split(_BUNDLE_SEPARATOR)
+        if not names:
+            raise ValueError("missing products")
+    else:
+        if "product" not in record:
+            raise ValueError("missing product")
+        if not isinstance(record["product"], str):
+            raise ValueError(f"product {record['product']!r} is not a name")
+        names = [record["product"]]
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError(f"products {names!r} are not names")
+    unknown = [name for name in names if name not in products]
+    if unknown:
+        raise ValueError(f"unknown product(s) {', '.join(map(repr, unknown))}")
+
+    arguments = []
+    for field, parse in fields:
+        if field not in record:
+            raise ValueError(f"missing {field}")
+        try:
+            arguments.append(parse(record[field]))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{field} {record[field]!r} {e.args[0] if e.args else 'is invalid'}") from None
+    if offer_type == "buy_n_get_m_free" and arguments[1] >= arguments[0]:
+        raise ValueError("charge must be less than required")
+
+    exclusive = record.get("exclusive", False)
+    if isinstance(exclusive, str):
+        if exclusive.lower() not in _TRUE | _FALSE:
+            raise ValueError(f"exclusive {exclusive!r} is not a boolean")
+        exclusive = exclusive.lower() in _TRUE
+    if offer_type in _BUNDLE_TYPES and exclusive:
+        raise ValueError("bundles cannot be exclusive")
+    priority = record.get("priority", 0)
+    if isinstance(priority, str):
+        try:
+            priority = int(priority)
+        except ValueError:
+            pass
+    # bools are ints too, they and floats are rejected rather than truncated
+    if type(priority) is not int:
+        raise ValueError(f"priority {record['priority']!r} is not an integer")
+    rounding = str(record.get("rounding", Rounding.HALF_UP.name)).upper()
+    if rounding not in Rounding.__members__:
+        raise ValueError(f"unknown rounding {record['rounding']!r}")
+    rounding = Rounding[rounding]
+    window = []
+    for field in ("effective_from", "effective_until"):
+        try:
+            window.append(_bound(record[field]) if field in record else None)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{field} {record[field]!r} {e.args[0] if e.args else 'is invalid'}") from None
+    if None not in window and window[0] >= window[1]:
+        raise ValueError("effective_from must be before effective_until")
+
+    return OfferSpec(offer_type, tuple(products[name] for name in names), tuple(arguments),
+                     record.get("description") or None, bool(exclusive), priority, rounding, *window)
+
+
+def load_offers(path: str | Path, products: Mapping[str, Product],
+                cache_path: str | Path | None = None) -> list[OfferStrategy]:
+    """
+    Reads, validates and builds the strategies of an offer file. With a cache_path the validated
+    offers are stored there as JSON and read back on the next load while the offer file is unchanged,
+    so worker processes skip parsing and validating. The cache is plain data, reading it never runs
+    code, but its offers are not validated again: keep it as private as the offer file.
+    """
+    source = _source_stamp(path)
+    if cache_path is not None:
+        offers = _read_cache(cache_path, source, products)
+        if offers is not None:
+            return offers
+    specs = validate_offers(read_offer_records(path), products)
+    if cache_path is not None:
+        _write_cache(cache_path, source, specs)
+    return [spec.build() for spec in specs]
+
+
+def _source_stamp(path: str | Path) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_cache(cache_path: str | Path, source: tuple[int, int],
+                products: Mapping[str, Product]) -> list[OfferStrategy] | None:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            version, stamp, names, rows = json.load(f)
+    except (OSError, ValueError, TypeError):
+        return None
+    if version != _CACHE_VERSION or tuple(stamp) != source:
+        return None
+    roundings = {rounding.name: rounding for rounding in Rounding}
+    builders = {offer_type: build for offer_type, (build, _) in _OFFER_TYPES.items()}
+    # the products are resolved again, a catalog that lost one of them needs a full validation,
+    # and so does a cache that does not hold the rows written by _write_cache
+    try:
+        table = [products[name] for name in names]
+        return [builders[offer_type]([table[index] for index in indexes], arguments, description, exclusive,
+                                     priority, roundings[rounding], effective_from, effective_until)
+                for offer_type, indexes, arguments, description, exclusive, priority, rounding, effective_from,
+                effective_until in rows]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: str | Path, source: tuple[int, int], specs: list[OfferSpec]) -> None:
+    # products are stored once by name and the offers refer to them by index, plain lists of
+    # strings and numbers load several times faster than validating the records again
+    indexes = {}
+    rows = [(spec.type, tuple(indexes.setdefault(product.name, len(indexes)) for product in spec.products),
+             spec.arguments, spec.description, spec.exclusive, spec.priority, spec.rounding.name,
+             spec.effective_from, spec.effective_until)
+            for spec in specs]
+    directory, name = os.path.split(os.path.abspath(cache_path))
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=f".{name}.", suffix=".tmp",
+                                     delete=False) as f:
+        json.dump([_CACHE_VERSION, source, list(indexes), rows], f)
+    os.replace(f.name, cache_path)
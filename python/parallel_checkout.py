@@ -0,0 +1,134 @@
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import PrefetchedCatalog, SupermarketCatalog
+from models.discounts import Discount
+from models.offers import OfferStrategy
+from models.products import Product
+from receipt import Receipt
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+# the state of a worker process, set once by _init_worker
+_worker_teller = None
+_worker_products = None
+_worker_product_index = None
+
+
+class _UnshippedPrice(KeyError):
+    """A strategy looked up a product the workers have no price for."""
+
+
+class _SnapshotCatalog(SupermarketCatalog):
+    """The unit prices of every product of the batch, shipped to the workers once."""
+
+    def __init__(self, prices: dict) -> None:
+        self._prices = prices
+
+    def get_unit_price(self, product):
+        try:
+            return self._prices[product]
+        except KeyError as e:
+            raise _UnshippedPrice("Missing product in prices list") from e
+
+    def get_unit_prices(self, products):
+        return {product: self.get_unit_price(product) for product in products}
+
+
+def _init_worker(products: list[Product], unit_prices: list[float], offers: Iterable[OfferStrategy],
+                 checked_out_at: float, money: bool) -> None:
+    global _worker_teller, _worker_products, _worker_product_index
+    _worker_products = products
+    _worker_product_index = {product: index for index, product in enumerate(products)}
+    # the whole batch is checked out at the time it was submitted, like a serial checkout of it
+    _worker_teller = Teller(_SnapshotCatalog(dict(zip(products, unit_prices))), money=money,
+                            clock=lambda: checked_out_at)
+    _worker_teller.add_special_offers(offers)
+
+
+def _check_out_chunk(carts: list[list[tuple[int, int | float]]]) -> list[tuple[list, list] | None]:
+    # carts and receipts travel as tuples of product indexes, pickling the model objects
+    # for every task would cost more than the checkout itself
+    results = []
+    for lines in carts:
+        cart = ShoppingCart(_worker_teller.registry)
+        for product_index, quantity in lines:
+            cart.add_item_quantity(_worker_products[product_index], quantity)
+        try:
+            receipt = _worker_teller.checks_out_articles_from(cart)
+        except _UnshippedPrice:
+            # a custom offer priced a product outside the batch, the cart is checked out by the caller
+            results.append(None)
+            continue
+
+        # Money lines travel in minor units
+        if receipt.money:
+            items = [(_worker_product_index[item.product], item.quantity, item.price_minor, item.total_minor)
+                     for item in receipt.items]
+        else:
+            items = [(_worker_product_index[item.product], item.quantity, item.price, item.total_price)
+                     for item in receipt.items]
+        discounts = []
+        for discount in receipt.discounts:
+            product_index = _worker_product_index.get(discount.product)
+            # a custom offer may discount a product outside the batch, it is sent as is
+            discounts.append(discount if product_index is None
+                             else (product_index, discount.description, discount.amount))
+        results.append((items, discounts))
+    return results
+
+
+def _rebuild_receipt(products: list[Product], items: list, discounts: list, money: bool = False) -> Receipt:
+    receipt = Receipt(money=money)
+    add_product = receipt.add_product_minor if money else receipt.add_product
+    for product_index, quantity, price, total_price in items:
+        add_product(products[product_index], quantity, price, total_price)
+    for discount in discounts:
+        if not isinstance(discount, Discount):
+            product_index, description, amount = discount
+            discount = Discount(products[product_index], description, amount)
+        receipt.add_discount(discount)
+    return receipt
+
+
+def parallel_checkout(teller: Teller, carts: Iterable[ShoppingCart], workers: int | None = None,
+                      chunk_size: int = 256) -> list[Receipt]:
+    """
+    Checks out a large batch of carts on a pool of worker processes, returning the receipts
+    in the order of the carts. The prices of every product in the batch are looked up with one
+    bulk catalog call and shipped with the offers to each worker once, at start up, only the
+    carts are sent per task. The receipts are the same as the serial checks_out_articles_from.
+    A cart whose custom offer prices a product outside the batch is checked out in this process.
+    The workers are not instrumented, the teller's metrics sink stays in this process.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    carts = list(carts)
+    product_index = {}
+    encoded_carts = []
+    for cart in carts:
+        encoded_carts.append([(product_index.setdefault(pq.product, len(product_index)), pq.quantity)
+                              for pq in cart.items])
+    if not encoded_carts:
+        return []
+
+    # the prices and the offers of the same registration, even if the teller is reloaded meanwhile
+    context = teller.pricing_context()
+    products = list(product_index)
+    prices = context.catalog.get_unit_prices(products)
+    unit_prices = [prices[product] for product in products]
+    chunks = [encoded_carts[start:start + chunk_size] for start in range(0, len(encoded_carts), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                             initargs=(products, unit_prices, context.snapshot.offers, teller.clock(), teller.money)) as executor:
+        results = [result for chunk_results in executor.map(_check_out_chunk, chunks) for result in chunk_results]
+
+    # the prices of the batch are only shipped for the products of the carts, the carts a custom offer
+    # needed another price for are checked out here, with the same snapshot and every price at hand
+    catalog = PrefetchedCatalog(context.catalog, prices)
+    return [context.check_out(cart, catalog) if result is None
+            else _rebuild_receipt(products, *result, teller.money)
+            for cart, result in zip(carts, results)]
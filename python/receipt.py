@@ -1,42 +1,211 @@
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import reduce
+from operator import add
+
 from receipt_printer import ReceiptFormatter
 from models.products import Product
 from models.discounts import Discount
+from models.money import Money, to_minor
 
 
+@dataclass(frozen=True, slots=True)
 class ReceiptItem:
-    def __init__(self, product, quantity, price, total_price):
-        self.product = product
-        self.quantity = quantity
-        self.price = price
-        self.total_price = total_price
+    product: Product
+    quantity: int | float
+    price: float
+    total_price: float
+
+
+@dataclass(frozen=True, slots=True)
+class MoneyReceiptItem:
+    """Receipt line of a Money receipt, the amounts are kept in minor units and read as Money."""
+    product: Product
+    quantity: int | float
+    price_minor: int
+    total_minor: int
+
+    @property
+    def price(self) -> Money:
+        return Money(self.price_minor)
+
+    @property
+    def total_price(self) -> Money:
+        return Money(self.total_minor)
+
+
+class ReceiptView(Sequence):
+    """
+    Read only view of the items or the discounts of a receipt, reading it copies nothing. Like the
+    dict views it reflects later changes to the receipt. It compares equal to a list or tuple with
+    the same elements, list(view) takes a snapshot.
+    """
+    __slots__ = ("_lines",)
+
+    def __init__(self, lines: list) -> None:
+        self._lines = lines
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        return self._lines[index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._lines)
+
+    def __contains__(self, value) -> bool:
+        return value in self._lines
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ReceiptView):
+            return self._lines == other._lines
+        if isinstance(other, (list, tuple)):
+            return len(self._lines) == len(other) and all(a == b for a, b in zip(self._lines, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self._lines)
 
 
 class Receipt:
-    def __init__(self):
+    def __init__(self, exact: bool = False, money: bool = False):
+        """
+        exact=True accumulates the running totals as Decimal (from the printed value of each
+        amount) so no floating point drift builds up, the totals are then returned as Decimal.
+        money=True is for Money amounts (float amounts are rounded half even to minor units), the
+        running totals are integer minor units and are returned as Money.
+        """
+        if exact and money:
+            raise ValueError("a receipt is either exact or in Money, not both")
         self._items = []
         self._discounts = []
+        # created once, reading the items or the discounts allocates nothing
+        self._items_view = ReceiptView(self._items)
+        self._discounts_view = ReceiptView(self._discounts)
+        # discount -> its positions in _discounts, built by the first remove_discount, a checkout never needs it
+        self._discount_positions = None
+        self.exact = exact
+        self.money = money
+        # running totals, kept up to date on every add so reading them is O(1)
+        zero = Decimal(0) if exact else 0
+        self._subtotal = zero
+        self._discount_total = zero
+        # accumulated in insertion order, items are added before discounts so this matches
+        # summing every item then every discount
+        self._total = zero
 
     def total_price(self):
-        total = 0
-        for item in self.items:
-            total += item.total_price
-        for discount in self.discounts:
-            total += discount.amount
-        return total
+        return Money(self._total) if self.money else self._total
+
+    @property
+    def subtotal(self):
+        """Sum of the item totals, before discounts."""
+        return Money(self._subtotal) if self.money else self._subtotal
+
+    @property
+    def discount_total(self):
+        """Sum of the discount amounts, negative when discounts apply."""
+        return Money(self._discount_total) if self.money else self._discount_total
 
     def add_product(self, product: Product, quantity: int | float, price: float, total_price: float) -> None:
         self._items.append(ReceiptItem(product, quantity, price, total_price))
+        amount = self._to_amount(total_price)
+        self._subtotal += amount
+        self._total += amount
+
+    def add_products(self, products: Sequence[Product], quantities: Sequence[int | float], prices: Sequence[float],
+                     total_prices: Sequence[float]) -> None:
+        """add_product for many lines given as columns, the totals are the same as adding the lines one by one."""
+        if self.money or self.exact:
+            for line in zip(products, quantities, prices, total_prices):
+                self.add_product(*line)
+            return
+        self._items.extend(map(ReceiptItem, products, quantities, prices, total_prices))
+        # reduce adds in order like add_product, sum may compensate the rounding and give another total
+        self._subtotal = reduce(add, total_prices, self._subtotal)
+        self._total = reduce(add, total_prices, self._total)
+
+    def add_product_minor(self, product: Product, quantity: int | float, price: int, total_price: int) -> None:
+        """add_product for Money receipts with the amounts in minor units, no Money is created per line."""
+        if not self.money:
+            raise TypeError("minor unit amounts need a Money receipt")
+        self._items.append(MoneyReceiptItem(product, quantity, price, total_price))
+        self._subtotal += total_price
+        self._total += total_price
+
+    def replace_product(self, index: int, product: Product, quantity: int | float, price: float,
+                        total_price: float) -> None:
+        """Replaces the item at index, the line of a product scanned again into an aggregated line, the totals follow."""
+        self._replace_item(index, ReceiptItem(product, quantity, price, total_price), self._to_amount(total_price))
+
+    def replace_product_minor(self, index: int, product: Product, quantity: int | float, price: int,
+                              total_price: int) -> None:
+        """replace_product for Money receipts with the amounts in minor units."""
+        if not self.money:
+            raise TypeError("minor unit amounts need a Money receipt")
+        self._replace_item(index, MoneyReceiptItem(product, quantity, price, total_price), total_price)
+
+    def _replace_item(self, index: int, item, amount) -> None:
+        change = amount - self._to_amount(self._items[index].total_price)
+        self._items[index] = item
+        self._subtotal += change
+        self._total += change
 
     def add_discount(self, discount: Discount) -> None:
+        if self._discount_positions is not None:
+            self._discount_positions.setdefault(discount, []).append(len(self._discounts))
         self._discounts.append(discount)
+        amount = self._to_amount(discount.amount)
+        self._discount_total += amount
+        self._total += amount
+
+    def remove_discount(self, discount: Discount) -> None:
+        """
+        Takes a discount back off the receipt in O(1), the last discount moves to its place. Raises
+        ValueError if it is not on the receipt.
+        """
+        discounts = self._discounts
+        positions = self._discount_positions
+        if positions is None:
+            positions = self._discount_positions = {}
+            for position, listed in enumerate(discounts):
+                positions.setdefault(listed, []).append(position)
+        listed_at = positions.get(discount)
+        if not listed_at:
+            raise ValueError("the discount is not on the receipt")
+        # equal discounts are interchangeable, any of their positions will do
+        position = listed_at.pop()
+        if not listed_at:
+            del positions[discount]
+        last = len(discounts) - 1
+        if position != last:
+            moved = discounts[last]
+            discounts[position] = moved
+            moved_at = positions[moved]
+            moved_at[moved_at.index(last)] = position
+        discounts.pop()
+        amount = self._to_amount(discount.amount)
+        self._discount_total -= amount
+        self._total -= amount
+
+    def _to_amount(self, value):
+        if self.money:
+            return value.minor if type(value) is Money else to_minor(value)
+        if self.exact:
+            return Decimal(str(value))
+        return value
 
     @property
-    def items(self):
-        return self._items[:]
+    def items(self) -> ReceiptView:
+        return self._items_view
 
     @property
-    def discounts(self):
-        return self._discounts[:]
+    def discounts(self) -> ReceiptView:
+        return self._discounts_view
 
     # NEW METHOD: Accept the formatter strategy
     def generate_output(self, formatter: ReceiptFormatter) -> str:
@@ -1,8 +1,14 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, TextIO
 
 from models.products import ProductUnit
 from models.discounts import Discount
-from receipt import Receipt, ReceiptItem
+
+if TYPE_CHECKING:
+    from receipt import Receipt, ReceiptItem
 
 class ReceiptFormatter(ABC):
     """
@@ -19,6 +25,24 @@ class ReceiptFormatter(ABC):
         """
         pass
 
+    def iter_lines(self, receipt) -> Iterator[str]:
+        """
+        Yields the formatted receipt piece by piece, joining the pieces gives format_receipt.
+        Formatters that can stream should override this, the default yields the whole output at once.
+        """
+        yield self.format_receipt(receipt)
+
+    def write_receipt(self, receipt, stream: TextIO) -> None:
+        """Writes the formatted receipt to a text stream without building the whole string."""
+        stream.writelines(self.iter_lines(receipt))
+
+    def format_many(self, receipts: Iterable, stream: TextIO, separator: str = "\n") -> None:
+        """Writes a batch of receipts to a single text stream, separated by the separator."""
+        for index, receipt in enumerate(receipts):
+            if index:
+                stream.write(separator)
+            self.write_receipt(receipt, stream)
+
 class TextReceiptFormatter(ReceiptFormatter):
     """
     Concrete Strategy for generating the plain-text, console-ready receipt format.
@@ -31,21 +55,24 @@ class TextReceiptFormatter(ReceiptFormatter):
         Orchestrates the printing process for the text format.
         This method replaces the old ReceiptPrinter.print_receipt.
         """
-        result = ""
-        
+        return "".join(self.iter_lines(receipt))
+
+    def iter_lines(self, receipt: Receipt) -> Iterator[str]:
+        """
+        Streams the text receipt line by line, the items and discounts are read through
+        the receipt views without copying them.
+        """
         # 1. Print Items
         for item in receipt.items:
-            result += self._print_receipt_item(item)
+            yield self._print_receipt_item(item)
 
         # 2. Print Discounts
         for discount in receipt.discounts:
-            result += self._print_discount(discount)
+            yield self._print_discount(discount)
 
         # 3. Print Total
-        result += "\n"
-        result += self._present_total(receipt)
-        
-        return str(result)
+        yield "\n"
+        yield self._present_total(receipt)
 
     # --- Private Helper Methods (Refactored from old class) ---
 
@@ -1,30 +1,80 @@
+from collections.abc import Callable
+
 from models.products import ProductQuantity, Product
+from models.registry import ProductRegistry, default_registry
 
 
 class ShoppingCart:
+    """
+    Items scanned by a customer. By default every scan is a line of its own, with aggregate=True the
+    scans of a product are summed into a single line, so the receipt has one line per distinct
+    product and the Teller prices each of them once. keep_scans retains the individual scans of an
+    aggregating cart, see ShoppingCart.scans.
+    """
 
-    def __init__(self):
+    def __init__(self, registry: ProductRegistry | None = None, aggregate: bool = False, keep_scans: bool = False):
         self._items = []
+        # product id -> total quantity, the ids come from the registry
+        self.registry = registry if registry is not None else default_registry
         self._product_quantities = {}
+        self._listeners = []
+        self.aggregate = aggregate
+        # product id -> index of its line in _items, only used when aggregating
+        self._lines = {}
+        self._scans = [] if aggregate and keep_scans else None
 
     @property
     def items(self):
         return self._items
 
+    @property
+    def scans(self) -> list[ProductQuantity]:
+        """Every item added to the cart, in scan order, even when the cart aggregates them into lines."""
+        if self._scans is not None:
+            return self._scans
+        if self.aggregate:
+            raise ValueError("Scans are only kept by an aggregating cart created with keep_scans=True")
+        return self._items
+
     def add_item(self, product: Product):
         self.add_item_quantity(product, 1.0)
 
     def get_product_quantity(self, product: Product):
-        return self._product_quantities.get(product.name, 0)
+        return self._product_quantities.get(self.registry.id_of(product), 0)
 
     @property
     def product_quantities(self):
+        """Total quantity per product id, see ShoppingCart.registry for the products."""
         return self._product_quantities
 
+    def subscribe(self, listener: Callable[[Product, int | float], None]) -> None:
+        """Registers a callback called with (product, quantity) after every item added to the cart."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Product, int | float], None]) -> None:
+        self._listeners.remove(listener)
+
     def add_item_quantity(self, product: Product, quantity: int | float):
-        self._items.append(ProductQuantity(product, quantity))
-        if product.name in self._product_quantities.keys():
+        product_id = self.registry.intern(product)
+        if product_id in self._product_quantities:
             # this will probably cause issues with float quantities
-            self._product_quantities[product.name] = self._product_quantities[product.name] + quantity
+            self._product_quantities[product_id] = self._product_quantities[product_id] + quantity
+        else:
+            self._product_quantities[product_id] = quantity
+
+        scan = ProductQuantity(product, quantity)
+        if not self.aggregate:
+            self._items.append(scan)
         else:
-            self._product_quantities[product.name] = quantity
+            if self._scans is not None:
+                self._scans.append(scan)
+            line = self._lines.get(product_id)
+            if line is None:
+                self._lines[product_id] = len(self._items)
+                self._items.append(scan)
+            else:
+                # the line holds the running total of the product, the same sum as product_quantities
+                self._items[line] = ProductQuantity(product, self._product_quantities[product_id])
+
+        for listener in self._listeners:
+            listener(product, quantity)
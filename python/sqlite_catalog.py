@@ -0,0 +1,65 @@
+import sqlite3
+from collections.abc import Iterable
+
+from catalog import SupermarketCatalog
+from models.products import Product
+
+# stay under SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+_MAX_QUERY_PARAMETERS = 900
+
+
+class SqliteCatalog(SupermarketCatalog):
+    """
+    Reference catalog backed by SQLite, bulk lookups are served with a single IN (...) query.
+    round_trips counts the queries sent to the database so the savings can be measured.
+    Products are keyed by name and unit, like the ProductRegistry.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS products (name TEXT NOT NULL, unit TEXT NOT NULL, price REAL NOT NULL, "
+            "PRIMARY KEY (name, unit))")
+        self.round_trips = 0
+
+    def add_product(self, product: Product, price: float) -> None:
+        self.add_products([(product, price)])
+
+    def add_products(self, products_with_prices: Iterable[tuple[Product, float]]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO products (name, unit, price) VALUES (?, ?, ?)",
+                ((*_key(product), price) for product, price in products_with_prices))
+
+    def get_unit_price(self, product: Product) -> float:
+        self.round_trips += 1
+        row = self._connection.execute("SELECT price FROM products WHERE name = ? AND unit = ?",
+                                       _key(product)).fetchone()
+        if row is None:
+            raise KeyError("Missing product in prices list")
+        return row[0]
+
+    def get_unit_prices(self, products: Iterable[Product]) -> dict:
+        products = list(products)
+        names = list(dict.fromkeys(product.name for product in products))
+
+        prices_by_key = {}
+        for start in range(0, len(names), _MAX_QUERY_PARAMETERS):
+            chunk = names[start:start + _MAX_QUERY_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            self.round_trips += 1
+            for name, unit, price in self._connection.execute(
+                    f"SELECT name, unit, price FROM products WHERE name IN ({placeholders})", chunk):
+                prices_by_key[name, unit] = price
+
+        try:
+            return {product: prices_by_key[_key(product)] for product in products}
+        except KeyError as e:
+            raise KeyError("Missing product in prices list") from e
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _key(product: Product) -> tuple[str, str]:
+    return product.name, product.unit.name if product.unit else ""
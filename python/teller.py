@@ -1,38 +1,522 @@
+import time
+from collections.abc import Callable, Iterable, Iterator
+from itertools import count
+from threading import Lock
+from typing import NamedTuple
+
 from receipt import Receipt
-from catalog import SupermarketCatalog
+from catalog import SupermarketCatalog, PrefetchedCatalog
+from instrumentation import InstrumentedCatalog, MetricsSink, NullSink
+from models.bundles import BundleMatch, BundleStrategy, match_bundles
+from models.discounts import Discount
+from models.money import Money, Rounding, multiply, to_minor
+from models.offer_plans import compile_offer, evaluate_plan, evaluate_plan_minor
+from models.offer_resolver import resolve_exclusive_offers
+from models.offer_schedule import OfferSchedule, is_scheduled
 from models.offers import OfferStrategy
+from models.products import Product
+from models.registry import ProductRegistry, default_registry
 from shopping_cart import ShoppingCart
 
+
+# scheduled indexes cached by a Teller, one per segment of the promotion timeline
+_SCHEDULED_INDEXES_KEPT = 8
+
+
+class _OfferIndex(NamedTuple):
+    """
+    The offers of a Teller keyed for checkout, the entries are (registration order, strategy, plan).
+    The plan is the strategy compiled at registration, None for custom strategies which are
+    evaluated with calculate_discount. An index is never changed once built, see updated.
+    """
+    # product id -> entries, so checkout only looks at the offers of the products actually in the cart
+    by_product: dict
+    # product id -> entries of the exclusive offers, resolved together at checkout instead of stacking
+    exclusive_by_product: dict
+    # product id -> entries of the bundles the product is part of
+    bundles_by_product: dict
+    # strategies without a target product can match anything, they are always evaluated
+    untargeted: list
+
+    @classmethod
+    def empty(cls) -> "_OfferIndex":
+        return cls({}, {}, {}, [])
+
+    def updated(self, registry: ProductRegistry, added: Iterable[tuple] = (),
+                removed: Iterable[OfferStrategy] = ()) -> "_OfferIndex":
+        """
+        Returns a copy of the index with the entries added and the strategies removed. Only the
+        dicts and lists the changes touch are copied, the others are shared with this index.
+        """
+        fields = self._asdict()
+        copied = set()
+
+        def entries_of(slot: tuple) -> list:
+            field, product_id = slot
+            if field not in copied:
+                copied.add(field)
+                fields[field] = fields[field].copy()
+            if product_id is None:
+                return fields[field]
+            if slot not in copied:
+                copied.add(slot)
+                fields[field][product_id] = list(fields[field].get(product_id, ()))
+            return fields[field][product_id]
+
+        for offer_strategy in removed:
+            for field, product_id in self._slots(offer_strategy, registry.id_of):
+                entries = entries_of((field, product_id))
+                for position, (_, strategy, _) in enumerate(entries):
+                    if strategy is offer_strategy:
+                        del entries[position]
+                        break
+                if product_id is not None and not entries:
+                    del fields[field][product_id]
+        for entry in added:
+            for slot in self._slots(entry[1], registry.intern):
+                entries_of(slot).append(entry)
+        return _OfferIndex(**fields)
+
+    @staticmethod
+    def _slots(offer_strategy: OfferStrategy, product_id_of: Callable[[Product], int]) -> list[tuple]:
+        """Returns the (field, product id) the strategy is keyed on, the product id is None for untargeted strategies."""
+        if isinstance(offer_strategy, BundleStrategy):
+            return [("bundles_by_product", product_id_of(product)) for product in offer_strategy.products]
+        target_product = getattr(offer_strategy, "target_product", None)
+        if target_product is None:
+            return [("untargeted", None)]
+        field = "exclusive_by_product" if getattr(offer_strategy, "exclusive", False) else "by_product"
+        return [(field, product_id_of(target_product))]
+
+
+class TellerSnapshot(NamedTuple):
+    """
+    Everything a checkout reads from the Teller. A snapshot is never changed once published, the
+    writers build the next one and swap it in, so a checkout reads the snapshot once and sees the
+    same offers and catalog to the end while other threads reload them.
+    """
+    catalog: SupermarketCatalog
+    # the registered strategies, in registration order
+    offers: tuple
+    # the offers that always apply
+    index: _OfferIndex
+    # the offers with an effective window, see OfferStrategy.effective_from
+    schedule: OfferSchedule
+    # segment of the schedule -> index of the offers active in it, built on first use, a cache only
+    # so two threads building the same segment at once are harmless
+    scheduled_indexes: dict
+
+
 class Teller:
 
-    def __init__(self, catalog: SupermarketCatalog) -> None:
-        self.catalog = catalog
-        self.offers = []
+    def __init__(self, catalog: SupermarketCatalog, registry: ProductRegistry | None = None,
+                 metrics: MetricsSink | None = None, money: bool = False,
+                 clock: Callable[[], float] = time.time) -> None:
+        # money=True prices in Money, integer minor units: the line totals are rounded with LINE_ROUNDING,
+        # the discounts once with the rounding of their offer, and the receipt totals are exact sums
+        self.money = money
+        # opt-in instrumentation, the default sink is disabled and checkout skips every timer
+        self.metrics = metrics if metrics is not None else NullSink()
+        # must be the registry of the carts checked out, the offer index is keyed on its ids,
+        # by default the registry of the catalog so a registry per catalog scopes the products
+        if registry is None:
+            registry = getattr(catalog, "registry", None)
+        self.registry = registry if registry is not None else default_registry
+        # the time of a checkout, which decides the scheduled offers that apply
+        self.clock = clock
+        # copy on write: the readers only load _snapshot, through _current, the writers take the lock to build the next one
+        self._snapshot = TellerSnapshot(catalog, (), _OfferIndex.empty(), OfferSchedule(), {})
+        # entries added by add_special_offer and not yet published, see _current
+        self._pending = []
+        self._lock = Lock()
+        self._sequence = count()
+
+    @property
+    def catalog(self) -> SupermarketCatalog:
+        return self._current().catalog
+
+    @catalog.setter
+    def catalog(self, catalog: SupermarketCatalog) -> None:
+        with self._lock:
+            self._snapshot = self._snapshot._replace(catalog=catalog)
+
+    @property
+    def offers(self) -> tuple[OfferStrategy, ...]:
+        """The registered strategies in registration order, a snapshot that later changes do not affect."""
+        return self._current().offers
+
+    def pricing_context(self, at: float | None = None) -> "PricingContext":
+        """Returns the offers and catalog currently registered, with the offers effective at the timestamp (now by default)."""
+        snapshot = self._current()
+        return PricingContext(self, snapshot, self._index_at(at, snapshot))
+
+    def snapshot(self) -> TellerSnapshot:
+        """
+        Returns the catalog and offers currently registered. Code pricing outside checks_out_articles_from
+        reads them from one snapshot, the catalog and offers properties may each see a different reload.
+        """
+        return self._current()
+
+    def _current(self) -> TellerSnapshot:
+        """Returns the published snapshot, after publishing the offers added since the last read."""
+        if self._pending:
+            with self._lock:
+                self._publish_pending()
+        return self._snapshot
 
     def add_special_offer(self, offer_strategy:OfferStrategy) -> None:
-        self.offers.append(offer_strategy)
+        """
+        Registers a strategy. The strategy is only queued, the next checkout or read of the offers
+        publishes every queued strategy in one swap, so adding n offers one at a time copies the
+        offer set once rather than n times.
+        """
+        with self._lock:
+            self._pending.append(self._entry(offer_strategy))
+
+    def add_special_offers(self, offer_strategies: Iterable[OfferStrategy]) -> None:
+        """Registers many strategies in order, checkouts see all of them or none."""
+        with self._lock:
+            self._pending.extend([self._entry(offer_strategy) for offer_strategy in offer_strategies])
+            self._publish_pending()
+
+    def remove_special_offer(self, offer_strategy: OfferStrategy) -> None:
+        """Unregisters a strategy, raises ValueError if it was never added."""
+        with self._lock:
+            self._publish_pending()
+            snapshot = self._snapshot
+            offers = list(snapshot.offers)
+            offers.remove(offer_strategy)
+            self._publish(snapshot, tuple(offers), removed=(offer_strategy,))
+
+    def reload_offers(self, offer_strategies: Iterable[OfferStrategy], catalog: SupermarketCatalog | None = None) -> None:
+        """
+        Replaces every registered strategy, and the catalog when one is given, in one swap: a checkout
+        sees either the old offers and prices or the new ones, never a mix.
+        """
+        with self._lock:
+            # the queued offers are replaced too
+            self._pending = []
+            snapshot = self._snapshot._replace(offers=(), index=_OfferIndex.empty(), schedule=OfferSchedule())
+            if catalog is not None:
+                snapshot = snapshot._replace(catalog=catalog)
+            entries = [self._entry(offer_strategy) for offer_strategy in offer_strategies]
+            self._publish(snapshot, tuple(entry[1] for entry in entries), added=entries)
+
+    def _entry(self, offer_strategy: OfferStrategy) -> tuple:
+        return next(self._sequence), offer_strategy, compile_offer(offer_strategy)
+
+    def _publish_pending(self) -> None:
+        # called with the lock held
+        if self._pending:
+            snapshot = self._snapshot
+            entries, self._pending = self._pending, []
+            self._publish(snapshot, snapshot.offers + tuple(entry[1] for entry in entries), added=entries)
+
+    def _publish(self, snapshot: TellerSnapshot, offers: tuple, added: list[tuple] = (),
+                 removed: Iterable[OfferStrategy] = ()) -> None:
+        # called with the lock held, the assignment is the atomic swap
+        added_always = [entry for entry in added if not is_scheduled(entry[1])]
+        added_scheduled = [entry for entry in added if is_scheduled(entry[1])]
+        removed_always = [strategy for strategy in removed if not is_scheduled(strategy)]
+        removed_scheduled = [strategy for strategy in removed if is_scheduled(strategy)]
+        index = snapshot.index
+        if added_always or removed_always:
+            index = index.updated(self.registry, added_always, removed_always)
+        schedule = snapshot.schedule
+        if added_scheduled or removed_scheduled:
+            schedule = schedule.updated(added_scheduled, removed_scheduled)
+        self._snapshot = TellerSnapshot(snapshot.catalog, offers, index, schedule, {})
+
+    def _index_at(self, at: float | None = None, snapshot: TellerSnapshot | None = None) -> _OfferIndex:
+        """Returns the index of the offers of the snapshot (the current one by default) effective at the timestamp, now by default."""
+        if snapshot is None:
+            snapshot = self._current()
+        schedule = snapshot.schedule
+        if not len(schedule):
+            return snapshot.index
+        if at is None:
+            at = self.clock()
+        segment = schedule.segment_at(at)
+        indexes = snapshot.scheduled_indexes
+        index = indexes.get(segment)
+        if index is None:
+            # promotions start and end in order, only the last few segments are worth keeping
+            if len(indexes) >= _SCHEDULED_INDEXES_KEPT:
+                indexes.clear()
+            index = indexes[segment] = snapshot.index.updated(self.registry, added=schedule.active_at(at))
+        return index
+
+    def next_offer_change(self, at: float | None = None) -> float | None:
+        """Returns when a scheduled offer next starts or ends after the timestamp (now by default), None if never."""
+        return self._current().schedule.next_change(self.clock() if at is None else at)
+
+    def offers_for(self, product: Product, at: float | None = None) -> list[OfferStrategy]:
+        """Returns the strategies targeting the given product effective at the timestamp (now by default), in registration order."""
+        index = self._index_at(at)
+        product_id = self.registry.id_of(product)
+        entries = index.by_product.get(product_id, []) + index.exclusive_by_product.get(product_id, [])
+        entries.sort(key=lambda entry: entry[0])
+        return [strategy for _, strategy, _ in entries]
+
+    def offers_affected_by(self, product: Product, at: float | None = None) -> list[OfferStrategy]:
+        """Returns every effective strategy whose discount can change with the product's quantity, in registration order."""
+        return [strategy for _, strategy, _ in self._affected_entries(self._index_at(at), self.registry.id_of(product))]
+
+    @staticmethod
+    def _affected_entries(index: _OfferIndex, product_id: int) -> list[tuple]:
+        entries = (index.untargeted + index.by_product.get(product_id, [])
+                   + index.exclusive_by_product.get(product_id, []) + index.bundles_by_product.get(product_id, []))
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def exclusive_offers_for(self, product_id: int, quantity: int | float, cart: ShoppingCart,
+                             catalog: SupermarketCatalog, at: float | None = None) -> list[tuple]:
+        """
+        Returns (registration order, strategy, plan, allotted quantity) of the exclusive offers of the
+        product, effective at the timestamp (now by default), that win for the quantity in the cart,
+        see resolve_exclusive_offers.
+        """
+        return self._exclusive_offers(self._index_at(at), product_id, quantity, cart, catalog)
+
+    def _exclusive_offers(self, index: _OfferIndex, product_id: int, quantity: int | float, cart: ShoppingCart,
+                          catalog: SupermarketCatalog) -> list[tuple]:
+        entries = index.exclusive_by_product.get(product_id)
+        if not entries:
+            return []
+        if len(entries) == 1:
+            return [entries[0] + (quantity,)]
+        unit_price = catalog.get_unit_price(self.registry.product(product_id))
+        return resolve_exclusive_offers(entries, quantity, unit_price, cart, catalog)
 
     def checks_out_articles_from(self, cart: ShoppingCart) -> Receipt:
-        receipt = Receipt()
+        snapshot = self._current()
+        return self._check_out(cart, snapshot.catalog, self._index_at(snapshot=snapshot))
+
+    def checkout_many(self, carts: Iterable[ShoppingCart]) -> Iterator[Receipt]:
+        """
+        Checks out a batch of carts, yielding one receipt per cart in order. The prices
+        of every product of the batch are fetched with one bulk lookup before the first
+        receipt, the receipts are the same as calling checks_out_articles_from on every
+        cart. The whole batch is checked out with the offers and catalog registered when
+        it starts. The offers are still evaluated cart by cart, a compiled offer costs
+        less than looking its discount up in a cache keyed on the quantity would.
+        """
+        snapshot = self._current()
+        carts = list(carts)
+        prices = snapshot.catalog.get_unit_prices(dict.fromkeys(pq.product for cart in carts for pq in cart.items))
+        # the strategies pricing products outside the batch still reach the catalog
+        catalog = PrefetchedCatalog(snapshot.catalog, prices)
+        for cart in carts:
+            yield self._check_out(cart, catalog, self._index_at(snapshot=snapshot), prices)
+
+    def _check_out(self, cart: ShoppingCart, catalog: SupermarketCatalog, index: _OfferIndex,
+                   prices: dict | None = None) -> Receipt:
+        # prices, when given, holds the price of every product of the cart and catalog serves them already
+        self._check_registry(cart)
+        metrics = self.metrics
+        # the clock of a disabled sink always reads 0 and its timings are dropped
+        clock = metrics.clock
+        if metrics.enabled:
+            catalog = InstrumentedCatalog(catalog, metrics)
+        started = clock()
+
+        receipt = self._new_receipt()
+        if prices is None:
+            # one bulk lookup for the whole cart, shared with the offer strategies
+            prices = catalog.get_unit_prices(dict.fromkeys(pq.product for pq in cart.items))
+            catalog = PrefetchedCatalog(catalog, prices)
+        self._add_items(receipt, cart, prices)
+        priced = clock()
+        metrics.timing("teller.checkout.pricing", priced - started)
+
+        # the_cart no longer needs the offers or catalog arguments
+        self._apply_offers(receipt, cart, catalog, index)
+        finished = clock()
+        metrics.timing("teller.checkout.offers", finished - priced)
+        metrics.timing("teller.checkout", finished - started)
+        metrics.increment("teller.checkouts")
+
+        return receipt
+
+    def _check_registry(self, cart: ShoppingCart) -> None:
+        if cart.registry is not self.registry:
+            # the cart's product ids would be looked up in an index keyed on other ids
+            raise ValueError("the cart and the teller must share the same ProductRegistry")
+
+    def _new_receipt(self) -> Receipt:
+        return Receipt(money=True) if self.money else Receipt()
+
+    def _add_items(self, receipt: Receipt, cart: ShoppingCart, prices: dict) -> None:
         product_quantities = cart.items
+        if self.money:
+            add_product = receipt.add_product_minor
+            for pq in product_quantities:
+                quantity = pq.quantity
+                unit_price = to_minor(prices[pq.product])
+                # whole quantities are exact, only weighed ones go through the rounding of multiply
+                total_price = unit_price * quantity if type(quantity) is int else multiply(unit_price, quantity)
+                add_product(pq.product, quantity, unit_price, total_price)
+            return
+
         for pq in product_quantities:
             p = pq.product
             quantity = pq.quantity
-            unit_price = self.catalog.get_unit_price(p)
+            unit_price = prices[p]
             price = quantity * unit_price
             receipt.add_product(p, quantity, unit_price, price)
 
-        # the_cart no longer needs the offers or catalog arguments
-        self._apply_offers(receipt, cart)
+    def bundle_offers_for(self, cart: ShoppingCart, catalog: SupermarketCatalog,
+                          at: float | None = None) -> list[tuple]:
+        """
+        Matches the bundles of the products in the cart effective at the timestamp (now by default)
+        together, returns (registration order, bundle, BundleMatch, None) of the bundles that apply,
+        in registration order.
+        """
+        return self._bundle_offers(self._index_at(at), cart, catalog)
 
-        return receipt
+    def _bundle_offers(self, index: _OfferIndex, cart: ShoppingCart, catalog: SupermarketCatalog) -> list[tuple]:
+        bundles_by_product = index.bundles_by_product
+        product_quantities = cart.product_quantities
+        entries = {}
+        for product_id in product_quantities:
+            for entry in bundles_by_product.get(product_id, ()):
+                entries[entry[0]] = entry
+        if not entries:
+            return []
+        return self._match_bundles(entries.values(), cart, catalog)
+
+    def _match_bundles(self, entries: Iterable[tuple], cart: ShoppingCart, catalog: SupermarketCatalog) -> list[tuple]:
+        """Matches the bundles of the entries together against the cart, returns them like bundle_offers_for."""
+        entries = sorted(entries, key=lambda entry: entry[0])
+        product_quantities = cart.product_quantities
+        available = {}
+        for _, bundle, _ in entries:
+            for product in bundle.products:
+                units = int(product_quantities.get(self.registry.id_of(product), 0))
+                if units > 0:
+                    available[product] = units
+        matches = match_bundles([bundle for _, bundle, _ in entries], available, catalog.get_unit_prices(available))
+        return [(sequence, bundle, matches[bundle], None) for sequence, bundle, _ in entries if bundle in matches]
+
+    def _applicable_offers(self, cart: ShoppingCart, catalog: SupermarketCatalog, index: _OfferIndex) -> list[tuple]:
+        """
+        Returns (registration order, strategy, plan, quantity) of the offers to evaluate, the plan of a
+        bundle is its BundleMatch.
+        """
+        # only the offers keyed on products in the cart, the cost scales with the basket not the promotions
+        entries = [entry + (None,) for entry in index.untargeted]
+        offers_by_product = index.by_product
+        exclusive_by_product = index.exclusive_by_product
+        for product_id, quantity in cart.product_quantities.items():
+            for entry in offers_by_product.get(product_id, ()):
+                entries.append(entry + (quantity,))
+            if product_id in exclusive_by_product:
+                entries.extend(self._exclusive_offers(index, product_id, quantity, cart, catalog))
+        if index.bundles_by_product:
+            entries.extend(self._bundle_offers(index, cart, catalog))
+
+        # keep the registration order so the discounts print the same way regardless of the cart order
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    @staticmethod
+    def _evaluate(strategy: OfferStrategy, plan, quantity, cart: ShoppingCart, catalog: SupermarketCatalog,
+                  money: bool = False) -> list:
+        if plan is None or isinstance(plan, BundleMatch):
+            discounts = strategy.calculate_discount(cart, catalog) if plan is None else strategy.discounts_for(plan)
+            if money:
+                # custom strategies and bundles compute in float, their amounts are rounded once here
+                rounding = getattr(strategy, "rounding", Rounding.HALF_UP)
+                discounts = [Discount(d.product, d.description, Money.of(d.amount, rounding)) for d in discounts]
+            return discounts
+        # compiled offers skip the strategy, the price is only looked up when the quantity can qualify
+        if not quantity or quantity < plan.threshold:
+            return []
+        if money:
+            # only the built-in strategies compile, they all have a rounding
+            amount = evaluate_plan_minor(plan, quantity, to_minor(catalog.get_unit_price(plan.product)),
+                                         strategy.rounding)
+            return [Discount(plan.product, plan.description, Money(-amount))] if amount else []
+        amount = evaluate_plan(plan, quantity, catalog.get_unit_price(plan.product))
+        return [Discount(plan.product, plan.description, -amount)] if amount else []
+
+    def _apply_offers(self, receipt: Receipt, cart: ShoppingCart, catalog: SupermarketCatalog,
+                      index: _OfferIndex) -> None:
+        metrics = self.metrics
+        enabled = metrics.enabled
+        started = metrics.clock()
+        entries = self._applicable_offers(cart, catalog, index)
+        metrics.timing("teller.apply_offers.lookup", metrics.clock() - started)
+
+        # this is the Context loop for the strategy pattern, over the compiled plans when there is one
+        for _, strategy, plan, quantity in entries:
+            # the per offer metrics are skipped with a local check, they would cost more than most offers
+            if enabled:
+                evaluation_started = metrics.clock()
+            # Each offer returns a list of Discount objects (or an empty list)
+            discounts = self._evaluate(strategy, plan, quantity, cart, catalog, self.money)
+            if enabled:
+                name = f"offers.{type(strategy).__name__}"
+                metrics.timing(name, metrics.clock() - evaluation_started)
+                metrics.increment(f"{name}.evaluations")
 
-    def _apply_offers(self, receipt: Receipt, cart: ShoppingCart) -> None:
-        # this is the Context loop for the strategy pattern 
-        for strategy in self.offers:
-            # Each strategy returns a list of Discount objects (or an empty list)
-            discounts = strategy.calculate_discount(cart, self.catalog)
-            
             # Add all resulting discounts to the receipt
             for discount in discounts:
                 receipt.add_discount(discount)
+
+
+class PricingContext:
+    """
+    The catalog and offers of one Teller snapshot, with the offers effective at one time, for the code
+    pricing carts outside checks_out_articles_from: checkout sessions, the batch, parallel and async
+    engines. Every method prices like the Teller's checkout, entries are (registration order, strategy,
+    plan) as in the offer index.
+    """
+    __slots__ = ("teller", "snapshot", "index")
+
+    def __init__(self, teller: Teller, snapshot: TellerSnapshot, index: _OfferIndex) -> None:
+        self.teller = teller
+        self.snapshot = snapshot
+        self.index = index
+
+    @property
+    def catalog(self) -> SupermarketCatalog:
+        return self.snapshot.catalog
+
+    @property
+    def registry(self) -> ProductRegistry:
+        return self.teller.registry
+
+    @property
+    def money(self) -> bool:
+        return self.teller.money
+
+    def check_registry(self, cart: ShoppingCart) -> None:
+        """Raises ValueError if the cart's product ids are not the ones the offers are keyed on."""
+        self.teller._check_registry(cart)
+
+    def check_out(self, cart: ShoppingCart, catalog: SupermarketCatalog | None = None) -> Receipt:
+        """Returns the receipt of the cart, priced by the given catalog or the one of the snapshot."""
+        return self.teller._check_out(cart, self.snapshot.catalog if catalog is None else catalog, self.index)
+
+    def affected_entries(self, product_id: int) -> list[tuple]:
+        """Returns the entries whose discount can change with the product's quantity, in registration order."""
+        return self.teller._affected_entries(self.index, product_id)
+
+    def exclusive_offers(self, product_id: int, quantity: int | float, cart: ShoppingCart,
+                         catalog: SupermarketCatalog) -> list[tuple]:
+        """Returns the winning exclusive offers of the product, see Teller.exclusive_offers_for."""
+        return self.teller._exclusive_offers(self.index, product_id, quantity, cart, catalog)
+
+    def bundle_offers(self, cart: ShoppingCart, catalog: SupermarketCatalog) -> list[tuple]:
+        """Matches the bundles of the products in the cart, see Teller.bundle_offers_for."""
+        return self.teller._bundle_offers(self.index, cart, catalog)
+
+    def match_bundles(self, entries: Iterable[tuple], cart: ShoppingCart, catalog: SupermarketCatalog) -> list[tuple]:
+        """Matches the bundles of the entries together against the cart, see Teller.bundle_offers_for."""
+        return self.teller._match_bundles(entries, cart, catalog)
+
+    def evaluate(self, strategy: OfferStrategy, plan, quantity, cart: ShoppingCart,
+                 catalog: SupermarketCatalog) -> list:
+        """Returns the discounts of one offer, the plan of a bundle is its BundleMatch."""
+        return self.teller._evaluate(strategy, plan, quantity, cart, catalog, self.teller.money)
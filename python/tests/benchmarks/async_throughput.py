@@ -0,0 +1,72 @@
+"""
+Compares concurrent AsyncTeller checkouts with and without request coalescing against a fake backend.
+
+Run from the python directory with:
+
+python -m tests.benchmarks.async_throughput --checkouts 2000 --concurrency 200 --latency 0.005 --connections 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from async_teller import AsyncTeller, CoalescingCatalog, FakeAsyncCatalog
+from catalog import InMemoryCatalog
+from tests.benchmarks.generators import make_carts, make_offers, make_products
+from models.registry import ProductRegistry
+from teller import Teller
+
+
+async def run_checkouts(teller: AsyncTeller, carts: list, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check_out(cart):
+        async with semaphore:
+            await teller.checks_out_articles_from(cart)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(check_out(cart) for cart in carts))
+    return time.perf_counter() - started
+
+
+async def main_async(options) -> None:
+    rng = random.Random(42)
+    registry = ProductRegistry()
+    products = make_products(options.products, rng)
+    offers = make_offers(products, options.offers, rng)
+    carts = make_carts(products, registry, options.lines, options.checkouts, rng)
+    prices = {product: round(rng.uniform(0.25, 25.0), 2) for product in products}
+    # the Teller's own catalog only answers the strategies pricing products outside the cart
+    local = InMemoryCatalog(registry)
+    for product, price in prices.items():
+        local.add_product(product, price)
+    teller = Teller(local, registry)
+    teller.add_special_offers(offers)
+
+    for label, coalesce in (("direct", False), ("coalescing", True)):
+        backend = FakeAsyncCatalog(latency=options.latency, connections=options.connections)
+        for product, price in prices.items():
+            backend.add_product(product, price)
+        catalog = CoalescingCatalog(backend, window=options.window) if coalesce else backend
+        async_teller = AsyncTeller(teller, catalog)
+
+        elapsed = await run_checkouts(async_teller, carts, options.concurrency)
+        print(f"{label:10}  {options.checkouts / elapsed:10.0f} checkouts/s  {backend.calls:6d} backend calls")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--offers", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=10)
+    parser.add_argument("--checkouts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per backend call")
+    parser.add_argument("--connections", type=int, default=10, help="concurrent backend calls allowed")
+    parser.add_argument("--window", type=float, default=0.001, help="coalescing window in seconds")
+    asyncio.run(main_async(parser.parse_args(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Synthetic catalogs, offers and carts for the benchmarks, seeded so every run is the same."""
+
+import random
+from dataclasses import dataclass
+
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy, OfferStrategy
+from models.products import Product, ProductUnit
+from models.registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+@dataclass
+class Scenario:
+    registry: ProductRegistry
+    products: list[Product]
+    catalog: FakeCatalog
+    offers: list[OfferStrategy]
+    teller: Teller
+    carts: list[ShoppingCart]
+
+
+def make_products(count: int, rng: random.Random) -> list[Product]:
+    return [Product(f"product-{index:06d}", ProductUnit.KILO if rng.random() < 0.2 else ProductUnit.EACH)
+            for index in range(count)]
+
+
+def make_catalog(products: list[Product], registry: ProductRegistry, rng: random.Random) -> FakeCatalog:
+    catalog = FakeCatalog(registry)
+    for product in products:
+        catalog.add_product(product, round(rng.uniform(0.25, 25.0), 2))
+    return catalog
+
+
+def make_offers(products: list[Product], count: int, rng: random.Random) -> list[OfferStrategy]:
+    """Spreads the offers over the products, a product can have more than one offer."""
+    offers = []
+    for index in range(count):
+        product = products[index % len(products)] if index < len(products) else rng.choice(products)
+        kind = index % 3
+        if kind == 0:
+            offers.append(BuyNGetMFreeStrategy(product, 3, 2))
+        elif kind == 1:
+            offers.append(PercentDiscountStrategy(product, rng.choice((5.0, 10.0, 20.0))))
+        else:
+            offers.append(BuyQuantityForAmountStrategy(product, 5, round(rng.uniform(1.0, 50.0), 2)))
+    return offers
+
+
+def make_carts(products: list[Product], registry: ProductRegistry, lines: int, count: int,
+               rng: random.Random) -> list[ShoppingCart]:
+    carts = []
+    for _ in range(count):
+        cart = ShoppingCart(registry)
+        for _ in range(lines):
+            product = rng.choice(products)
+            if product.unit == ProductUnit.KILO:
+                cart.add_item_quantity(product, round(rng.uniform(0.1, 3.0), 3))
+            else:
+                cart.add_item_quantity(product, rng.randint(1, 12))
+        carts.append(cart)
+    return carts
+
+
+def make_scenario(products: int, offers: int, lines: int, carts: int = 10, seed: int = 42) -> Scenario:
+    rng = random.Random(seed)
+    registry = ProductRegistry()
+    product_list = make_products(products, rng)
+    catalog = make_catalog(product_list, registry, rng)
+    offer_list = make_offers(product_list, offers, rng)
+    teller = Teller(catalog, registry)
+    teller.add_special_offers(offer_list)
+    cart_list = make_carts(product_list, registry, lines, carts, rng)
+    return Scenario(registry, product_list, catalog, offer_list, teller, cart_list)
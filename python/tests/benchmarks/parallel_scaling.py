@@ -0,0 +1,46 @@
+"""
+Measures how parallel_checkout scales with the number of worker processes against the serial teller.
+
+Run from the python directory with:
+
+python -m tests.benchmarks.parallel_scaling --carts 20000 --lines 50 --max-workers 16
+"""
+
+import argparse
+import os
+import time
+
+from parallel_checkout import parallel_checkout
+from tests.benchmarks.generators import make_scenario
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--offers", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=50)
+    parser.add_argument("--carts", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    options = parser.parse_args(args)
+
+    scenario = make_scenario(options.products, options.offers, options.lines, options.carts)
+
+    started = time.perf_counter()
+    for cart in scenario.carts:
+        scenario.teller.checks_out_articles_from(cart)
+    serial = time.perf_counter() - started
+    print(f"serial      {serial:8.2f}s  {options.carts / serial:10.0f} carts/s")
+
+    workers = 1
+    while workers <= options.max_workers:
+        started = time.perf_counter()
+        parallel_checkout(scenario.teller, scenario.carts, workers=workers, chunk_size=options.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"{workers:2d} workers  {elapsed:8.2f}s  {options.carts / elapsed:10.0f} carts/s  "
+              f"speed-up x{serial / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
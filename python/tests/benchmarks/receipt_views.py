@@ -0,0 +1,90 @@
+"""
+Measures the memory allocated when reading receipts through the read only views of Receipt.items
+and Receipt.discounts against the previous properties returning a copy of the lists.
+
+Run from the python directory with:
+
+python -m tests.benchmarks.receipt_views --lines 300 --receipts 1000
+"""
+
+import argparse
+import tracemalloc
+
+from models.discounts import Discount
+from models.products import Product, ProductUnit
+from receipt import Receipt
+from receipt_printer import TextReceiptFormatter
+
+
+class CopyingReceipt(Receipt):
+    """The receipt as it was before, every read of items or discounts copies the list."""
+
+    @property
+    def items(self):
+        return self._items[:]
+
+    @property
+    def discounts(self):
+        return self._discounts[:]
+
+
+def build_receipts(receipt_class, receipts, lines):
+    built = []
+    for receipt_index in range(receipts):
+        receipt = receipt_class()
+        for line in range(lines):
+            product = Product(f"product-{receipt_index}-{line}", ProductUnit.EACH)
+            receipt.add_product(product, line % 5 + 1, 1.25, (line % 5 + 1) * 1.25)
+            if line % 10 == 0:
+                receipt.add_discount(Discount(product, "3 for 2", -1.25))
+        built.append(receipt)
+    return built
+
+
+def peak_bytes(function):
+    """Peak of the memory allocated while function runs, the memory it returns included."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - before
+
+
+def read_lines(receipt):
+    # the loops of TextReceiptFormatter.iter_lines without the formatting
+    for _ in receipt.items:
+        pass
+    for _ in receipt.discounts:
+        pass
+
+
+def measure(receipt_class, receipts, lines):
+    built = build_receipts(receipt_class, receipts, lines)
+    formatter = TextReceiptFormatter()
+    read = peak_bytes(lambda: read_lines(built[0]))
+    # the copies are freed before the output is joined, so they hardly move the peak of a whole format
+    formatted = peak_bytes(lambda: formatter.format_receipt(built[0]))
+    # keeping the lines of a batch, e.g. to export them
+    kept = peak_bytes(lambda: [(receipt.items, receipt.discounts) for receipt in built]) / receipts
+    return read, formatted, kept
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=300, help="receipt lines per receipt")
+    parser.add_argument("--receipts", type=int, default=1000, help="number of receipts read")
+    options = parser.parse_args(args)
+
+    copying = measure(CopyingReceipt, options.receipts, options.lines)
+    views = measure(Receipt, options.receipts, options.lines)
+    print(f"{options.lines} lines per receipt, {options.receipts} receipts")
+    labels = ("read by the formatter", "format_receipt peak", "kept per receipt")
+    for label, before, after in zip(labels, copying, views):
+        print(f"{label:22} copies: {before:10,.0f} bytes  views: {after:10,.0f} bytes  saved: {1 - after / before:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
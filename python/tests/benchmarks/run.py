@@ -0,0 +1,239 @@
+"""
+Timing benchmarks for checkout, the offer strategies, receipt totals, money arithmetic, catalog loading and receipt formatting.
+
+Run from the python directory, results are written as JSON so two commits can be compared:
+
+python -m tests.benchmarks.run --products 10000 --offers 5000 --lines 100 --output after.json --compare before.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable
+from decimal import ROUND_HALF_UP, Decimal
+
+from mmap_catalog import MmapCatalog, write_snapshot
+from models.money import Money, multiply, to_minor
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from receipt_printer import TextReceiptFormatter
+from teller import Teller
+from tests.benchmarks.generators import Scenario, make_scenario
+from vectorized_pricing import VectorizedPricingEngine, np
+
+# name -> function building the zero argument callable that is timed
+BENCHMARKS: dict[str, Callable[[Scenario], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("teller.checks_out_articles_from")
+def checkout(scenario: Scenario):
+    teller, carts = scenario.teller, scenario.carts
+    return lambda: [teller.checks_out_articles_from(cart) for cart in carts]
+
+
+@benchmark("teller.checkout_many")
+def checkout_many(scenario: Scenario):
+    teller, carts = scenario.teller, scenario.carts
+    return lambda: list(teller.checkout_many(carts))
+
+
+if np is not None:
+    # compare with teller.checks_out_articles_from, the same carts priced one by one
+    @benchmark("vectorized_pricing_engine.price_carts")
+    def vectorized_checkout(scenario: Scenario):
+        engine, carts = VectorizedPricingEngine(scenario.teller), scenario.carts
+        return lambda: engine.price_carts(carts)
+
+
+@benchmark("teller.checks_out_articles_from[money]")
+def checkout_money(scenario: Scenario):
+    teller = Teller(scenario.catalog, scenario.registry, money=True)
+    teller.add_special_offers(scenario.offers)
+    carts = scenario.carts
+    return lambda: [teller.checks_out_articles_from(cart) for cart in carts]
+
+
+def _lines(scenario: Scenario) -> list[tuple]:
+    """(quantity, unit price) of every cart line."""
+    lines = [(pq.quantity, pq.product) for cart in scenario.carts for pq in cart.items]
+    prices = scenario.catalog.get_unit_prices(dict.fromkeys(product for _, product in lines))
+    return [(quantity, prices[product]) for quantity, product in lines]
+
+
+# the same line totals summed with each money representation
+@benchmark("line_totals[float]")
+def line_totals_float(scenario: Scenario):
+    lines = _lines(scenario)
+    return lambda: sum(quantity * unit_price for quantity, unit_price in lines)
+
+
+@benchmark("line_totals[money]")
+def line_totals_money(scenario: Scenario):
+    lines = [(quantity, to_minor(unit_price)) for quantity, unit_price in _lines(scenario)]
+    return lambda: Money(sum(multiply(unit_price, quantity) for quantity, unit_price in lines))
+
+
+@benchmark("line_totals[decimal]")
+def line_totals_decimal(scenario: Scenario):
+    lines = [(Decimal(str(quantity)), Decimal(str(unit_price))) for quantity, unit_price in _lines(scenario)]
+    cent = Decimal("0.01")
+    return lambda: sum((quantity * unit_price).quantize(cent, ROUND_HALF_UP) for quantity, unit_price in lines)
+
+
+def _catalog_files(scenario: Scenario) -> tuple[tempfile.TemporaryDirectory, str, str]:
+    """Writes the scenario catalog as a CSV file and as a snapshot, the directory is removed once collected."""
+    directory = tempfile.TemporaryDirectory()
+    prices = scenario.catalog.get_unit_prices(scenario.products)
+    csv_path = os.path.join(directory.name, "catalog.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "unit", "price"))
+        writer.writerows((product.name, product.unit.name, price) for product, price in prices.items())
+    snapshot_path = os.path.join(directory.name, "catalog.snapshot")
+    write_snapshot(snapshot_path, prices.items())
+    return directory, csv_path, snapshot_path
+
+
+# startup cost of a pricing worker, loading the catalog from CSV or mapping its snapshot
+@benchmark("catalog.open[csv]")
+def open_csv_catalog(scenario: Scenario):
+    directory, csv_path, _ = _catalog_files(scenario)
+
+    def load():
+        with open(csv_path, "r", encoding="utf-8") as f:
+            return {Product(row["name"], ProductUnit[row["unit"]]): float(row["price"]) for row in csv.DictReader(f)}
+    load.directory = directory
+    return load
+
+
+@benchmark("catalog.open[mmap]")
+def open_mmap_catalog(scenario: Scenario):
+    directory, _, snapshot_path = _catalog_files(scenario)
+
+    def load():
+        MmapCatalog(snapshot_path).close()
+    load.directory = directory
+    return load
+
+
+@benchmark("mmap_catalog.get_unit_prices")
+def mmap_lookups(scenario: Scenario):
+    directory, _, snapshot_path = _catalog_files(scenario)
+    catalog = MmapCatalog(snapshot_path)
+    products = [pq.product for cart in scenario.carts for pq in cart.items]
+
+    def lookup():
+        return catalog.get_unit_prices(products)
+    lookup.directory = directory
+    return lookup
+
+
+def _strategy_benchmark(strategy_class):
+    def setup(scenario: Scenario):
+        strategies = [offer for offer in scenario.offers if type(offer) is strategy_class]
+        catalog, carts = scenario.catalog, scenario.carts
+        return lambda: [strategy.calculate_discount(cart, catalog) for cart in carts for strategy in strategies]
+    return setup
+
+
+for _strategy_class in (BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy):
+    benchmark(f"{_strategy_class.__name__}.calculate_discount")(_strategy_benchmark(_strategy_class))
+
+
+@benchmark("receipt.total_price")
+def total_price(scenario: Scenario):
+    receipts = [scenario.teller.checks_out_articles_from(cart) for cart in scenario.carts]
+    return lambda: [receipt.total_price() for receipt in receipts]
+
+
+@benchmark("text_receipt_formatter.format_receipt")
+def format_receipt(scenario: Scenario):
+    receipts = [scenario.teller.checks_out_articles_from(cart) for cart in scenario.carts]
+    formatter = TextReceiptFormatter()
+    return lambda: [formatter.format_receipt(receipt) for receipt in receipts]
+
+
+def time_callable(function: Callable[[], object], repeat: int, min_time: float) -> dict:
+    timer = timeit.Timer(function)
+    # calibrate with a single call, then run enough calls to last min_time per measurement
+    single = timer.timeit(number=1)
+    number = max(1, int(min_time / single)) if single > 0 else 1
+    timings = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(timings), "mean": sum(timings) / len(timings), "number": number, "repeat": repeat}
+
+
+def run(products: int, offers: int, lines: int, carts: int, repeat: int = 5, min_time: float = 0.2,
+        only: list[str] | None = None) -> dict:
+    scenario = make_scenario(products, offers, lines, carts)
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if only and not any(selected in name for selected in only):
+            continue
+        results[name] = time_callable(setup(scenario), repeat, min_time)
+    return {
+        "scale": {"products": products, "offers": offers, "lines": lines, "carts": carts},
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the benchmarks whose best time regressed by more than threshold (0.1 = 10%)."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["best"] / before["best"]
+        print(f"{name:50} {before['best'] * 1e3:10.3f}ms -> {result['best'] * 1e3:10.3f}ms  x{ratio:.2f}")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--offers", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=20, help="lines per cart")
+    parser.add_argument("--carts", type=int, default=10, help="carts per timed call")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per measurement")
+    parser.add_argument("--only", nargs="*", help="run the benchmarks whose name contains one of these")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing")
+    options = parser.parse_args(args)
+
+    results = run(options.products, options.offers, options.lines, options.carts,
+                  options.repeat, options.min_time, options.only)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if options.compare:
+        with open(options.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), options.threshold)
+        if regressions:
+            print(f"regressed by more than {options.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    else:
+        for name, result in results["results"].items():
+            print(f"{name:50} {result['best'] * 1e3:10.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,10 @@
 import unittest
 
 from models.products import Product, ProductUnit
-from models.offers import PercentDiscountStrategy
+from models.offers import PercentDiscountStrategy, BuyNGetMFreeStrategy
 from shopping_cart import ShoppingCart
 from teller import Teller
-from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_catalog import CountingCatalog, FakeCatalog
 
 
 class SupermarketTest(unittest.TestCase):
@@ -32,3 +32,36 @@ class SupermarketTest(unittest.TestCase):
         self.assertEqual(1.99, receipt_item.price)
         self.assertAlmostEqual(receipt_item.total_price, 2.5 * 1.99, places=2)
         self.assertEqual(2.5, receipt_item.quantity)
+
+    def test_checkout_many_matches_single_cart_checkout(self):
+        catalog = CountingCatalog()
+        toothbrush = Product("toothbrush", ProductUnit.EACH)
+        apples = Product("apples", ProductUnit.KILO)
+        catalog.add_product(toothbrush, 0.99)
+        catalog.add_product(apples, 1.99)
+
+        teller = Teller(catalog)
+        teller.add_special_offer(BuyNGetMFreeStrategy(toothbrush, 3, 2))
+        teller.add_special_offer(PercentDiscountStrategy(apples, 10.0))
+
+        carts = []
+        for quantity in (1, 3, 7):
+            cart = ShoppingCart()
+            cart.add_item_quantity(toothbrush, quantity)
+            cart.add_item_quantity(apples, quantity * 0.5)
+            carts.append(cart)
+
+        expected = [teller.checks_out_articles_from(cart) for cart in carts]
+        catalog.lookups = catalog.bulk_lookups = 0
+        receipts = list(teller.checkout_many(carts))
+
+        self.assertEqual((catalog.lookups, catalog.bulk_lookups), (2, 1))
+        self.assertEqual(len(receipts), len(expected))
+        for receipt, single in zip(receipts, expected):
+            self.assertEqual(receipt.total_price(), single.total_price())
+            self.assertEqual(
+                [(i.product, i.quantity, i.price, i.total_price) for i in receipt.items],
+                [(i.product, i.quantity, i.price, i.total_price) for i in single.items])
+            self.assertEqual(
+                [(d.product, d.description, d.amount) for d in receipt.discounts],
+                [(d.product, d.description, d.amount) for d in single.discounts])
@@ -1,7 +1,11 @@
+from models.registry import default_registry
+
+
 # FakeCart implementing the expected interface
 class FakeCart:
     def __init__(self):
         self._quantities = {}
+        self.registry = default_registry
 
     def add_item_quantity(self, product, quantity):
         self._quantities[product] = self._quantities.get(product, 0) + quantity
@@ -11,3 +15,7 @@ class FakeCart:
 
     def get_product_quantity(self, product):
         return self._quantities.get(product, 0)
+
+    @property
+    def product_quantities(self):
+        return {default_registry.intern(product): quantity for product, quantity in self._quantities.items()}
@@ -1,18 +1,41 @@
-from catalog import SupermarketCatalog
+from catalog import InMemoryCatalog, SupermarketCatalog
 
 
 class FakeCatalog(SupermarketCatalog):
-    def __init__(self):
+    """InMemoryCatalog that also keeps the products by name, for the tests looking them up."""
+
+    def __init__(self, registry=None):
+        self._catalog = InMemoryCatalog(registry)
         self.products = {}
-        self.prices = {}
+
+    @property
+    def registry(self):
+        return self._catalog.registry
 
     def add_product(self, product, price):
         self.products[product.name] = product
-        self.prices[product.name] = price
+        self._catalog.add_product(product, price)
+
+    def get_unit_price(self, product):
+        return self._catalog.get_unit_price(product)
+
+    def get_unit_prices(self, products):
+        return self._catalog.get_unit_prices(products)
+
+
+class CountingCatalog(FakeCatalog):
+    """Counts the products looked up and the bulk lookups."""
+    def __init__(self, registry=None):
+        super().__init__(registry)
+        self.lookups = 0
+        self.bulk_lookups = 0
 
     def get_unit_price(self, product):
-        try:
-            return self.prices[product.name]
-        except KeyError as e:
-            raise KeyError("Missing product in prices list") from e
+        self.lookups += 1
+        return super().get_unit_price(product)
 
+    def get_unit_prices(self, products):
+        products = list(products)
+        self.lookups += len(products)
+        self.bulk_lookups += 1
+        return super().get_unit_prices(products)
@@ -0,0 +1,7 @@
+class FakeClock:
+    """Clock reading whatever time the test sets."""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,34 @@
+from models.discounts import Discount
+from models.offers import OfferStrategy
+
+
+class FlatOffStrategy(OfferStrategy):
+    """Custom offer taking a fixed amount off once the cart holds the required quantity."""
+    def __init__(self, target_product, required_product_count, amount, **options):
+        self.amount = amount
+        super().__init__(target_product, required_product_count, **options)
+        self.description = self.generate_description()
+
+    def generate_description(self) -> str:
+        return f"flat {self.amount:.2f} off"
+
+    def calculate_discount(self, cart, catalog):
+        if cart.get_product_quantity(self.target_product) < self.required_product_count:
+            return []
+        return [Discount(self.target_product, self.description, -self.amount)]
+
+
+class FreeGiftStrategy(OfferStrategy):
+    """Gives away a product that is not in the cart, its price is looked up in the catalog."""
+    def __init__(self, target_product, gift):
+        super().__init__(target_product, 1)
+        self.gift = gift
+        self.description = self.generate_description()
+
+    def generate_description(self) -> str:
+        return "free gift"
+
+    def calculate_discount(self, cart, catalog):
+        if cart.get_product_quantity(self.target_product) < self.required_product_count:
+            return []
+        return [Discount(self.gift, self.description, -catalog.get_unit_price(self.gift))]
@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+
+from async_teller import AsyncTeller, CoalescingCatalog, FakeAsyncCatalog
+from models.discounts import Discount
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_offers import FreeGiftStrategy
+
+
+class TestAsyncTeller(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.backend = FakeAsyncCatalog(latency=0.01)
+        self.backend.add_product(self.toothbrush, 0.99)
+        self.backend.add_product(self.apples, 1.99)
+        self.offers = [BuyNGetMFreeStrategy(self.toothbrush, 3, 2), PercentDiscountStrategy(self.apples, 10.0)]
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller = Teller(self.catalog)
+        self.teller.add_special_offers(self.offers)
+
+    def make_teller(self, catalog):
+        return AsyncTeller(self.teller, catalog)
+
+    def make_cart(self, toothbrushes=3, apples=2.5):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, toothbrushes)
+        cart.add_item_quantity(self.apples, apples)
+        return cart
+
+    async def test_receipt_matches_the_sync_teller(self):
+        cart = self.make_cart()
+
+        receipt = await self.make_teller(self.backend).checks_out_articles_from(cart)
+        expected = self.teller.checks_out_articles_from(cart)
+
+        self.assertEqual(receipt.items, expected.items)
+        self.assertEqual(receipt.discounts, expected.discounts)
+        self.assertEqual(receipt.total_price(), expected.total_price())
+
+    async def test_products_outside_the_cart_are_priced_by_the_teller_catalog(self):
+        gift = Product("toothpaste", ProductUnit.EACH)
+        self.catalog.add_product(gift, 1.79)
+        self.teller.add_special_offer(FreeGiftStrategy(self.apples, gift))
+
+        receipt = await self.make_teller(self.backend).checks_out_articles_from(self.make_cart())
+
+        self.assertEqual(receipt.discounts[-1], Discount(gift, "free gift", -1.79))
+        self.assertEqual(self.backend.calls, 1)
+
+    async def test_concurrent_checkouts_share_one_lookup(self):
+        catalog = CoalescingCatalog(self.backend, window=0.005)
+        teller = self.make_teller(catalog)
+
+        receipts = await asyncio.gather(*(teller.checks_out_articles_from(self.make_cart(n)) for n in range(1, 51)))
+
+        self.assertEqual(len(receipts), 50)
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(catalog.batches, 1)
+        self.assertEqual(catalog.coalesced, 98)
+
+    async def test_lookups_are_split_by_max_batch(self):
+        catalog = CoalescingCatalog(self.backend, window=0.005, max_batch=1)
+        prices = await catalog.get_unit_prices([self.toothbrush, self.apples])
+        self.assertEqual(prices, {self.toothbrush: 0.99, self.apples: 1.99})
+        self.assertEqual(self.backend.calls, 2)
+
+    async def test_missing_price_raises_key_error(self):
+        teller = self.make_teller(CoalescingCatalog(self.backend))
+        cart = self.make_cart()
+        cart.add_item(Product("unknown_item", ProductUnit.EACH))
+        with self.assertRaises(KeyError):
+            await teller.checks_out_articles_from(cart)
+
+    async def test_backend_failure_reaches_every_waiter(self):
+        class BrokenCatalog:
+            async def get_unit_prices(self, products):
+                raise ConnectionError("database is down")
+
+        catalog = CoalescingCatalog(BrokenCatalog())
+        teller = self.make_teller(catalog)
+        results = await asyncio.gather(teller.checks_out_articles_from(self.make_cart()),
+                                       teller.checks_out_articles_from(self.make_cart()),
+                                       return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+
+    async def test_checkout_many(self):
+        teller = self.make_teller(self.backend)
+        receipts = [receipt async for receipt in teller.checkout_many([self.make_cart(), self.make_cart(6)])]
+        self.assertEqual(len(receipts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import contextlib
+import io
+import unittest
+
+from tests.benchmarks import run
+from tests.benchmarks.generators import make_scenario
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_scenario_has_the_requested_scale(self):
+        scenario = make_scenario(products=50, offers=80, lines=7, carts=3)
+        self.assertEqual(len(scenario.products), 50)
+        self.assertEqual(len(scenario.teller.offers), 80)
+        self.assertEqual([len(cart.items) for cart in scenario.carts], [7, 7, 7])
+
+    def test_run_covers_every_benchmark(self):
+        results = run.run(products=20, offers=10, lines=3, carts=2, repeat=1, min_time=0.001)
+        self.assertEqual(set(results["results"]), set(run.BENCHMARKS))
+        self.assertEqual(results["scale"], {"products": 20, "offers": 10, "lines": 3, "carts": 2})
+        for result in results["results"].values():
+            self.assertGreater(result["best"], 0)
+
+    def test_compare_reports_regressions(self):
+        baseline = {"results": {"fast": {"best": 1.0}, "slow": {"best": 1.0}}}
+        current = {"results": {"fast": {"best": 1.05}, "slow": {"best": 1.5}, "new": {"best": 1.0}}}
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run.compare(current, baseline, threshold=0.1), ["slow"])
+
+
+if __name__ == "__main__":
+    unittest.main()
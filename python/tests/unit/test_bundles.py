@@ -0,0 +1,239 @@
+import random
+import time
+import unittest
+from unittest.mock import patch
+
+import models.bundles as bundles_module
+from checkout_session import CheckoutSession
+from models.bundles import BundleMatch, FixedBundleStrategy, MixAndMatchBundleStrategy, match_bundles
+from models.offers import PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from receipt_printer import TextReceiptFormatter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+class TestBundleStrategies(unittest.TestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.yogurts = [Product(f"yogurt-{flavour}", ProductUnit.EACH) for flavour in ("plain", "cherry", "mango")]
+        self.prices = {self.toothbrush: 0.99, self.toothpaste: 1.79,
+                       self.yogurts[0]: 0.50, self.yogurts[1]: 0.80, self.yogurts[2]: 1.00}
+
+    def test_fixed_bundle(self):
+        bundle = FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.49)
+
+        match = match_bundles([bundle], {self.toothbrush: 3, self.toothpaste: 2}, self.prices)[bundle]
+
+        self.assertEqual(match.count, 2)
+        self.assertAlmostEqual(match.amount, 2 * (0.99 + 1.79 - 2.49))
+        self.assertEqual((bundle.product.name, bundle.description), ("toothbrush + toothpaste", "bundle for 2.49"))
+
+    def test_fixed_bundle_needs_every_product(self):
+        bundle = FixedBundleStrategy([self.toothbrush, self.toothbrush, self.toothpaste], 3.00)
+
+        self.assertEqual(match_bundles([bundle], {self.toothbrush: 1, self.toothpaste: 4}, self.prices), {})
+
+    def test_mix_and_match_bundles_the_most_expensive_units(self):
+        bundle = MixAndMatchBundleStrategy(self.yogurts, 3, 2.00, "yogurts")
+        available = {self.yogurts[0]: 3, self.yogurts[1]: 1, self.yogurts[2]: 2}
+
+        match = match_bundles([bundle], available, self.prices)[bundle]
+
+        # 1.00 + 1.00 + 0.80 for 2.00, the second bundle of three 0.50 would cost more than 1.50
+        self.assertEqual(match.count, 1)
+        self.assertAlmostEqual(match.amount, 0.80)
+        self.assertEqual(available[self.yogurts[0]], 3)
+
+    def test_overlapping_bundles_are_matched_together(self):
+        mouthwash = Product("mouthwash", ProductUnit.EACH)
+        floss = Product("floss", ProductUnit.EACH)
+        prices = {self.toothbrush: 1.0, self.toothpaste: 1.0, mouthwash: 1.0, floss: 1.0}
+        best_alone = FixedBundleStrategy([self.toothbrush, self.toothpaste], 0.80)
+        brush_and_wash = FixedBundleStrategy([self.toothbrush, mouthwash], 1.20)
+        paste_and_floss = FixedBundleStrategy([self.toothpaste, floss], 1.20)
+
+        matches = match_bundles([best_alone, brush_and_wash, paste_and_floss],
+                                dict.fromkeys(prices, 1), prices)
+
+        # a greedy pick of the biggest bundle discount gives 1.20, the two others give 1.60
+        self.assertEqual(set(matches), {brush_and_wash, paste_and_floss})
+
+    def test_priority_breaks_ties(self):
+        low = FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.00, "low")
+        high = FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.00, "high", priority=1)
+        available = {self.toothbrush: 1, self.toothpaste: 1}
+
+        self.assertEqual(list(match_bundles([low, high], available, self.prices)), [high])
+
+    def test_large_cart(self):
+        yogurts = [Product(f"yogurt-{index}", ProductUnit.EACH) for index in range(20)]
+        prices = {yogurt: 0.40 + index * 0.06 for index, yogurt in enumerate(yogurts)}
+        bundle = MixAndMatchBundleStrategy(yogurts, 3, 1.50, "yogurts")
+
+        match = match_bundles([bundle], dict.fromkeys(yogurts, 15), prices)[bundle]
+
+        # only the bundles of three yogurts worth more than 1.50 together are made
+        self.assertEqual(match.count, sum(15 for price in prices.values() if price > 0.50) // 3)
+        self.assertIsInstance(match, BundleMatch)
+
+    def test_units_go_to_the_bundle_that_saves_the_most_on_them(self):
+        cheap, dear = self.yogurts[0], self.yogurts[2]
+        prices = {dear: 3.00, cheap: 2.50, self.toothbrush: 3.00}
+        any_two = MixAndMatchBundleStrategy([dear, cheap], 2, 1.00, "yogurts")
+        with_brush = FixedBundleStrategy([dear, self.toothbrush], 1.00, "yogurt and brush")
+
+        matches = match_bundles([any_two, with_brush], {dear: 1, cheap: 2, self.toothbrush: 1}, prices)
+
+        # the dearest yogurt in the mix and match bundle would give 5.00, leaving it to the fixed one 9.00
+        self.assertAlmostEqual(matches[any_two].amount, 4.00)
+        self.assertAlmostEqual(matches[with_brush].amount, 5.00)
+
+    def test_mix_and_match_bundles_sharing_products(self):
+        prices = dict(zip(self.yogurts, (1.00, 2.00, 3.00)))
+        plain_or_cherry = MixAndMatchBundleStrategy(self.yogurts[:2], 2, 2.00, "plain or cherry")
+        cherry_or_mango = MixAndMatchBundleStrategy(self.yogurts[1:], 2, 2.00, "cherry or mango")
+
+        matches = match_bundles([plain_or_cherry, cherry_or_mango], dict.fromkeys(self.yogurts, 2), prices)
+
+        # the cherries go with the plain ones, the mangoes make a bundle on their own
+        self.assertEqual(matches[plain_or_cherry], BundleMatch(2, 2.00))
+        self.assertEqual(matches[cherry_or_mango], BundleMatch(1, 4.00))
+
+    def test_long_chain_of_overlapping_bundles(self):
+        products = [Product(f"product-{index}", ProductUnit.EACH) for index in range(2001)]
+        bundles = [FixedBundleStrategy(products[index:index + 2], 1.00, f"bundle {index}") for index in range(2000)]
+
+        matches = match_bundles(bundles, dict.fromkeys(products, 1), dict.fromkeys(products, 1.00))
+
+        # one group of 2000 bundles, every other one applies
+        self.assertEqual(list(matches), bundles[::2])
+
+    def test_overlapping_mix_and_match_bundles_on_large_carts(self):
+        yogurts = [Product(f"yogurt-{index}", ProductUnit.EACH) for index in range(20)]
+        prices = {yogurt: round(0.40 + index * 0.07, 2) for index, yogurt in enumerate(yogurts)}
+        rng = random.Random(5)
+        for bundle_count, units in ((3, 20), (3, 300), (3, 500), (4, 300)):
+            with self.subTest(bundles=bundle_count, units=units):
+                bundles = [MixAndMatchBundleStrategy(rng.sample(yogurts, 12), 3, 2.00, f"yogurts {index}")
+                           for index in range(bundle_count)]
+                available = {yogurt: units // 20 for yogurt in yogurts}
+
+                started = time.perf_counter()
+                matches = match_bundles(bundles, available, prices)
+                elapsed = time.perf_counter() - started
+
+                # the search gives up after its budget, a tenth of a second, and matches greedily
+                self.assertLess(elapsed, 1.0)
+                bundled = sum(match.count for match in matches.values()) * 3
+                self.assertLessEqual(bundled, units)
+                self.assertGreater(bundled, units // 2)
+
+    def test_search_out_of_budget_matches_greedily(self):
+        cheap, dear = self.yogurts[0], self.yogurts[2]
+        prices = {dear: 3.00, cheap: 2.50, self.toothbrush: 3.00}
+        any_two = MixAndMatchBundleStrategy([dear, cheap], 2, 1.00, "yogurts")
+        with_brush = FixedBundleStrategy([dear, self.toothbrush], 1.00, "yogurt and brush")
+
+        with patch.object(bundles_module, "_SEARCH_BUDGET", 0):
+            matches = match_bundles([any_two, with_brush], {dear: 3, cheap: 2, self.toothbrush: 1}, prices)
+
+        # the biggest discount first: the brush bundle, then the two dearest yogurts left, then the cheap ones
+        self.assertEqual(matches[with_brush], BundleMatch(1, 5.00))
+        self.assertEqual(matches[any_two].count, 2)
+        self.assertAlmostEqual(matches[any_two].amount, 3.00 + 3.00 - 1.00 + 2.50 + 2.50 - 1.00)
+
+
+class CountingBundle(FixedBundleStrategy):
+    def __init__(self, products, bundle_price):
+        super().__init__(products, bundle_price)
+        self.matched = 0
+
+    def discounts_for(self, match):
+        self.matched += 1
+        return super().discounts_for(match)
+
+
+class TestTellerBundles(unittest.TestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.toothpaste, 1.79)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller = Teller(self.catalog)
+        self.bundle = FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.49)
+
+    def test_bundle_discount_on_the_receipt(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.apples, 10.0))
+        self.teller.add_special_offer(self.bundle)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.apples, 1.0)
+        cart.add_item_quantity(self.toothbrush, 1)
+        cart.add_item_quantity(self.toothpaste, 1)
+
+        receipt = self.teller.checks_out_articles_from(cart)
+
+        self.assertEqual([d.description for d in receipt.discounts], ["10.0% off", "bundle for 2.49"])
+        self.assertAlmostEqual(receipt.discounts[1].amount, -0.29)
+        self.assertIn("bundle for 2.49 (toothbrush + toothpaste)", TextReceiptFormatter().format_receipt(receipt))
+
+    def test_bundle_and_calculate_discount_agree(self):
+        self.teller.add_special_offer(self.bundle)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 2)
+        cart.add_item_quantity(self.toothpaste, 3)
+
+        receipt = self.teller.checks_out_articles_from(cart)
+
+        self.assertEqual(receipt.discounts, self.bundle.calculate_discount(cart, self.catalog))
+
+    def test_removed_bundle(self):
+        self.teller.add_special_offer(self.bundle)
+        self.teller.remove_special_offer(self.bundle)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 1)
+        cart.add_item_quantity(self.toothpaste, 1)
+
+        self.assertEqual(self.teller.checks_out_articles_from(cart).discounts, [])
+        self.assertEqual(self.teller.offers_affected_by(self.toothbrush), [])
+
+    def test_checkout_session_matches_the_teller(self):
+        self.teller.add_special_offer(self.bundle)
+        self.teller.add_special_offer(FixedBundleStrategy([self.toothbrush, self.toothbrush], 1.50))
+        session = CheckoutSession(self.teller)
+
+        for product in (self.toothbrush, self.toothbrush, self.toothpaste, self.toothpaste, self.toothbrush):
+            session.cart.add_item_quantity(product, 1)
+            expected = self.teller.checks_out_articles_from(session.cart)
+            self.assertAlmostEqual(session.total, expected.total_price())
+            self.assertEqual(sorted(d.description for d in session.discounts),
+                             sorted(d.description for d in expected.discounts))
+
+
+    def test_checkout_session_rematches_only_the_bundles_sharing_products_with_the_scan(self):
+        brush_and_paste = CountingBundle([self.toothbrush, self.toothpaste], 2.49)
+        two_brushes = CountingBundle([self.toothbrush, self.toothbrush], 1.50)
+        apples = CountingBundle([self.apples, self.apples], 3.00)
+        self.teller.add_special_offers([brush_and_paste, two_brushes, apples])
+        session = CheckoutSession(self.teller)
+        session.cart.add_item_quantity(self.apples, 2)
+        session.cart.add_item_quantity(self.toothpaste, 1)
+
+        session.cart.add_item_quantity(self.toothbrush, 3)
+
+        # the toothbrush links both toothbrush bundles, the apples bundle is left alone
+        self.assertEqual((brush_and_paste.matched, two_brushes.matched, apples.matched), (1, 1, 1))
+        expected = self.teller.checks_out_articles_from(session.cart)
+        self.assertAlmostEqual(session.total, expected.total_price())
+        self.assertEqual(sorted(d.description for d in session.discounts),
+                         sorted(d.description for d in expected.discounts))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from caching_catalog import CachingCatalog
+from tests.mockers.fake_catalog import CountingCatalog
+from tests.mockers.fake_clock import FakeClock
+from tests.mockers.fake_product import ProductStub
+
+
+class TestCachingCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = CountingCatalog()
+        self.apples = ProductStub("apples")
+        self.rice = ProductStub("rice")
+        self.milk = ProductStub("milk")
+        self.backend.add_product(self.apples, 1.99)
+        self.backend.add_product(self.rice, 2.49)
+        self.backend.add_product(self.milk, 0.89)
+        self.clock = FakeClock()
+
+    def test_repeated_lookups_are_served_from_the_cache(self):
+        catalog = CachingCatalog(self.backend)
+        self.assertEqual(catalog.get_unit_price(self.apples), 1.99)
+        self.assertEqual(catalog.get_unit_price(self.apples), 1.99)
+        self.assertEqual(self.backend.lookups, 1)
+        self.assertEqual((catalog.hits, catalog.misses, catalog.evictions), (1, 1, 0))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        catalog = CachingCatalog(self.backend, max_size=2)
+        catalog.get_unit_price(self.apples)
+        catalog.get_unit_price(self.rice)
+        catalog.get_unit_price(self.apples)  # rice is now the oldest entry
+        catalog.get_unit_price(self.milk)
+
+        self.assertEqual(catalog.evictions, 1)
+        self.assertEqual(len(catalog), 2)
+        catalog.get_unit_price(self.apples)
+        self.assertEqual(self.backend.lookups, 3)
+        catalog.get_unit_price(self.rice)
+        self.assertEqual(self.backend.lookups, 4)
+
+    def test_entries_expire_after_ttl(self):
+        catalog = CachingCatalog(self.backend, ttl=10, clock=self.clock)
+        catalog.get_unit_price(self.apples)
+        self.clock.now = 9.9
+        catalog.get_unit_price(self.apples)
+        self.assertEqual(self.backend.lookups, 1)
+
+        self.clock.now = 10.0
+        catalog.get_unit_price(self.apples)
+        self.assertEqual(self.backend.lookups, 2)
+        self.assertEqual(catalog.expirations, 1)
+
+    def test_price_change_invalidates_the_entry(self):
+        catalog = CachingCatalog(self.backend)
+        catalog.get_unit_price(self.apples)
+        catalog.add_product(self.apples, 2.49)
+        self.assertEqual(catalog.get_unit_price(self.apples), 2.49)
+
+    def test_invalidate_everything(self):
+        catalog = CachingCatalog(self.backend)
+        catalog.get_unit_price(self.apples)
+        catalog.get_unit_price(self.rice)
+        catalog.invalidate()
+        self.assertEqual(len(catalog), 0)
+
+    def test_missing_products_are_not_cached(self):
+        catalog = CachingCatalog(self.backend)
+        unknown = ProductStub("unknown")
+        with self.assertRaises(KeyError):
+            catalog.get_unit_price(unknown)
+        self.assertEqual(len(catalog), 0)
+
+    def test_bulk_lookup_fetches_all_misses_in_one_call(self):
+        catalog = CachingCatalog(self.backend)
+        catalog.get_unit_price(self.apples)
+
+        prices = catalog.get_unit_prices([self.apples, self.rice, self.milk])
+
+        self.assertEqual(prices, {self.apples: 1.99, self.rice: 2.49, self.milk: 0.89})
+        self.assertEqual(self.backend.bulk_lookups, 1)
+        self.assertEqual((catalog.hits, catalog.misses), (1, 3))
+
+    def test_max_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            CachingCatalog(self.backend, max_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from unittest.mock import patch
+
+from checkout_session import CheckoutSession
+from models.bundles import FixedBundleStrategy, MixAndMatchBundleStrategy
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import PricingContext, Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+class CountingStrategy(PercentDiscountStrategy):
+    def __init__(self, target_product, percentage):
+        super().__init__(target_product, percentage)
+        self.calls = 0
+
+    def calculate_discount(self, cart, catalog):
+        self.calls += 1
+        return super().calculate_discount(cart, catalog)
+
+
+class TestCheckoutSession(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.toothpaste, 1.79)
+        self.catalog.add_product(self.apples, 1.99)
+
+        self.teller = Teller(self.catalog)
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2))
+        self.teller.add_special_offer(BuyQuantityForAmountStrategy(self.toothpaste, 5, 7.49))
+        self.apple_offer = CountingStrategy(self.apples, 10.0)
+        self.teller.add_special_offer(self.apple_offer)
+
+    def test_total_follows_every_scan(self):
+        session = CheckoutSession(self.teller)
+        cart = session.cart
+
+        for _ in range(3):
+            cart.add_item(self.toothbrush)
+        self.assertAlmostEqual(session.total, 1.98)
+        self.assertEqual([d.description for d in session.discounts], ["3 for 2"])
+
+        for _ in range(6):
+            cart.add_item(self.toothbrush)
+        self.assertEqual(len(session.discounts), 1)
+        self.assertAlmostEqual(session.discounts[0].amount, -2.97)
+
+        cart.add_item_quantity(self.toothpaste, 6)
+        cart.add_item_quantity(self.apples, 2.5)
+        expected = self.teller.checks_out_articles_from(cart)
+        self.assertAlmostEqual(session.total, expected.total_price())
+        self.assertEqual(sorted(d.description for d in session.discounts),
+                         sorted(d.description for d in expected.discounts))
+
+    def test_only_offers_of_the_scanned_product_are_evaluated(self):
+        session = CheckoutSession(self.teller)
+        session.cart.add_item_quantity(self.apples, 1.0)
+        self.assertEqual(self.apple_offer.calls, 1)
+
+        for _ in range(10):
+            session.cart.add_item(self.toothbrush)
+        self.assertEqual(self.apple_offer.calls, 1)
+
+    def test_items_already_in_the_cart_are_priced(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 3)
+        session = CheckoutSession(self.teller, cart)
+        self.assertAlmostEqual(session.total, 1.98)
+
+    def test_aggregating_cart_keeps_one_line_per_product(self):
+        cart = ShoppingCart(aggregate=True)
+        cart.add_item(self.apples)
+        session = CheckoutSession(self.teller, cart)
+        for product in (self.toothbrush, self.toothpaste, self.toothbrush, self.apples, self.toothbrush):
+            cart.add_item(product)
+
+        expected = self.teller.checks_out_articles_from(cart)
+        self.assertEqual(session.receipt.items, expected.items)
+        self.assertEqual([item.quantity for item in session.receipt.items], [2.0, 3.0, 1.0])
+        self.assertAlmostEqual(session.total, expected.total_price())
+        self.assertEqual(sorted(d.description for d in session.discounts),
+                         sorted(d.description for d in expected.discounts))
+
+    def test_bundles_are_matched_again_only_when_the_scan_can_change_them(self):
+        self.teller.add_special_offer(FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.5))
+        session = CheckoutSession(self.teller)
+        cart = session.cart
+
+        with patch.object(PricingContext, "match_bundles", autospec=True,
+                          side_effect=PricingContext.match_bundles) as match_bundles:
+            cart.add_item(self.toothpaste)
+            for _ in range(4):
+                cart.add_item(self.toothbrush)
+            # the second toothbrush and later have no toothpaste to go with
+            self.assertEqual(match_bundles.call_count, 2)
+            cart.add_item(self.toothpaste)
+            cart.add_item_quantity(self.toothpaste, 0.5)
+            self.assertEqual(match_bundles.call_count, 3)
+
+        expected = self.teller.checks_out_articles_from(cart)
+        self.assertAlmostEqual(session.total, expected.total_price())
+        self.assertEqual(sorted(d.amount for d in session.discounts), sorted(d.amount for d in expected.discounts))
+
+    def test_mix_and_match_bundles_are_matched_on_every_scan(self):
+        self.teller.add_special_offer(FixedBundleStrategy([self.toothbrush, self.toothpaste], 2.5))
+        self.teller.add_special_offer(MixAndMatchBundleStrategy([self.toothbrush, self.toothpaste], 3, 2.0))
+        session = CheckoutSession(self.teller)
+        for product in (self.toothpaste, self.toothbrush, self.toothbrush, self.toothbrush, self.toothpaste):
+            session.cart.add_item(product)
+            expected = self.teller.checks_out_articles_from(session.cart)
+            self.assertAlmostEqual(session.total, expected.total_price())
+
+    def test_close_stops_following_the_cart(self):
+        session = CheckoutSession(self.teller)
+        session.cart.add_item(self.toothbrush)
+        receipt = session.close()
+        session.cart.add_item(self.toothbrush)
+        self.assertEqual(len(receipt.items), 1)
+        self.assertAlmostEqual(receipt.total_price(), 0.99)
+
+
+if __name__ == "__main__":
+    unittest.main()
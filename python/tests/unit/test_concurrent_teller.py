@@ -0,0 +1,173 @@
+import sys
+import threading
+import time
+import unittest
+
+from checkout_session import CheckoutSession
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from models.registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from vectorized_pricing import np, VectorizedPricingEngine
+
+GENERATIONS = 200
+CHECKOUT_THREADS = 8
+
+
+class TestConcurrentTeller(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ProductRegistry()
+        self.products = [Product(f"product-{index}", ProductUnit.EACH) for index in range(12)]
+
+    def generation(self, number):
+        """The catalog and offers of a reload, every price and description tells which reload it is."""
+        catalog = FakeCatalog(self.registry)
+        for product in self.products:
+            catalog.add_product(product, float(number))
+        # a different set of products is discounted by each reload
+        discounted = self.products[number % 4::2]
+        offers = [PercentDiscountStrategy(product, 10.0, f"generation {number}") for product in discounted]
+        offers.append(BuyNGetMFreeStrategy(self.products[number % 12], 3, 2, f"generation {number} 3 for 2"))
+        return catalog, offers
+
+    def cart(self, seed):
+        cart = ShoppingCart(self.registry)
+        for index in range(seed % 5, len(self.products), 3):
+            cart.add_item_quantity(self.products[index], 3)
+        return cart
+
+    def assert_one_generation(self, receipt, cart):
+        prices = {item.price for item in receipt.items}
+        self.assertEqual(len(prices), 1, "items priced by different catalogs")
+        number = int(prices.pop())
+        _, offers = self.generation(number)
+        if number % 10 == 0 and any(discount.description == "extra" for discount in receipt.discounts):
+            # checked out between the add and the remove of the extra offer of this reload
+            offers.append(PercentDiscountStrategy(self.products[0], 50.0, "extra"))
+        in_cart = {pq.product for pq in cart.items}
+        expected = sorted((offer.target_product.name, offer.description) for offer in offers
+                          if offer.target_product in in_cart)
+        self.assertEqual(sorted((discount.product.name, discount.description) for discount in receipt.discounts),
+                         expected)
+
+    def test_checkouts_during_hot_reloads_see_a_single_snapshot(self):
+        # switch threads as often as possible so checkouts interleave with the reloads
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        catalog, offers = self.generation(1)
+        teller = Teller(catalog, self.registry)
+        teller.add_special_offers(offers)
+        engine = VectorizedPricingEngine(teller) if np is not None else None
+        reloaded = threading.Event()
+        results = [[] for _ in range(CHECKOUT_THREADS)]
+        errors = []
+
+        def check_out(results, seed):
+            try:
+                while not reloaded.is_set():
+                    cart = self.cart(seed)
+                    results.append((cart, teller.checks_out_articles_from(cart)))
+                    carts = [self.cart(seed + 1), self.cart(seed + 2)]
+                    results.extend(zip(carts, teller.checkout_many(carts)))
+                    # a session prices the items scanned before it started with one snapshot
+                    cart = self.cart(seed + 3)
+                    results.append((cart, CheckoutSession(teller, cart).close()))
+                    if engine is not None:
+                        carts = [self.cart(seed + 4), self.cart(seed + 5)]
+                        results.extend(zip(carts, engine.price_carts(carts)))
+                    seed += 1
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=check_out, args=(results[index], index)) for index in range(CHECKOUT_THREADS)]
+        for thread in threads:
+            thread.start()
+        for number in range(2, GENERATIONS + 1):
+            teller.reload_offers(*reversed(self.generation(number)))
+            if number % 10 == 0:
+                # single adds and removes publish whole snapshots too
+                extra = PercentDiscountStrategy(self.products[0], 50.0, "extra")
+                teller.add_special_offer(extra)
+                teller.remove_special_offer(extra)
+        reloaded.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        receipts = [result for thread_results in results for result in thread_results]
+        self.assertGreater(len(receipts), CHECKOUT_THREADS)
+        for cart, receipt in receipts:
+            self.assert_one_generation(receipt, cart)
+
+    def test_offers_are_an_immutable_snapshot(self):
+        catalog, offers = self.generation(1)
+        teller = Teller(catalog, self.registry)
+        teller.add_special_offers(offers)
+        before = teller.offers
+
+        teller.remove_special_offer(offers[0])
+
+        self.assertEqual(before, tuple(offers))
+        self.assertEqual(teller.offers, tuple(offers[1:]))
+
+    def test_offers_added_one_at_a_time_are_published_together(self):
+        catalog, _ = self.generation(1)
+        teller = Teller(catalog, self.registry)
+        offers = [PercentDiscountStrategy(self.products[index % 12], 1.0, f"offer {index}") for index in range(20000)]
+
+        started = time.perf_counter()
+        for offer in offers:
+            teller.add_special_offer(offer)
+        elapsed = time.perf_counter() - started
+
+        # queued, not copied into a new snapshot each
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(teller.offers, tuple(offers))
+        before = teller.offers
+        teller.add_special_offer(offers[0])
+        teller.remove_special_offer(offers[1])
+        self.assertEqual(teller.offers, tuple(offers[:1] + offers[2:] + offers[:1]))
+        self.assertEqual(before, tuple(offers))
+        teller.add_special_offer(offers[1])
+        teller.reload_offers(offers[:2])
+        self.assertEqual(teller.offers, tuple(offers[:2]))
+        self.assertEqual(len(teller.checks_out_articles_from(self.cart(0)).discounts), 1)
+
+    def test_pricing_context_keeps_the_offers_and_catalog_it_was_taken_with(self):
+        catalog, offers = self.generation(1)
+        teller = Teller(catalog, self.registry)
+        teller.add_special_offers(offers)
+        cart = self.cart(0)
+        context = teller.pricing_context()
+
+        reloaded_catalog, reloaded_offers = self.generation(2)
+        teller.reload_offers(reloaded_offers, reloaded_catalog)
+
+        self.assertIs(context.catalog, catalog)
+        self.assert_one_generation(context.check_out(cart), cart)
+        self.assertEqual(int(context.check_out(cart).items[0].price), 1)
+        with self.assertRaises(ValueError):
+            context.check_registry(ShoppingCart())
+
+    def test_reload_replaces_the_offers_and_the_catalog_together(self):
+        catalog, offers = self.generation(1)
+        teller = Teller(catalog, self.registry)
+        teller.add_special_offers(offers)
+        catalog, offers = self.generation(2)
+        cart = self.cart(0)
+
+        teller.reload_offers(offers, catalog)
+
+        self.assertIs(teller.catalog, catalog)
+        self.assertEqual(teller.offers, tuple(offers))
+        self.assert_one_generation(teller.checks_out_articles_from(cart), cart)
+        self.assertEqual(int(teller.checks_out_articles_from(cart).items[0].price), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
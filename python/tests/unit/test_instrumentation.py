@@ -0,0 +1,92 @@
+import socket
+import unittest
+
+from instrumentation import InMemorySink, NullSink, StatsdSink
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+        self.cart = ShoppingCart()
+        self.cart.add_item_quantity(self.toothbrush, 3)
+        self.cart.add_item_quantity(self.apples, 1.5)
+
+    def make_teller(self, metrics=None):
+        teller = Teller(self.catalog, metrics=metrics)
+        teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2))
+        teller.add_special_offer(PercentDiscountStrategy(self.apples, 10.0))
+        return teller
+
+    def test_default_sink_is_disabled(self):
+        teller = self.make_teller()
+        self.assertIsInstance(teller.metrics, NullSink)
+        self.assertFalse(teller.metrics.enabled)
+
+    def test_checkout_phases_strategies_and_catalog_calls_are_recorded(self):
+        sink = InMemorySink()
+        teller = self.make_teller(sink)
+
+        receipt = teller.checks_out_articles_from(self.cart)
+        teller.checks_out_articles_from(self.cart)
+
+        self.assertEqual(len(receipt.discounts), 2)
+        self.assertEqual(sink.counters["teller.checkouts"], 2)
+        self.assertEqual(sink.counters["offers.BuyNGetMFreeStrategy.evaluations"], 2)
+        self.assertEqual(sink.counters["offers.PercentDiscountStrategy.evaluations"], 2)
+        self.assertEqual(sink.counters["catalog.get_unit_prices.calls"], 2)
+        for phase in ("teller.checkout", "teller.checkout.pricing", "teller.checkout.offers",
+                      "teller.apply_offers.lookup", "offers.BuyNGetMFreeStrategy"):
+            self.assertEqual(len(sink.timings[phase]), 2, phase)
+
+    def test_instrumented_receipt_matches_plain_receipt(self):
+        plain = self.make_teller().checks_out_articles_from(self.cart)
+        instrumented = self.make_teller(InMemorySink()).checks_out_articles_from(self.cart)
+        self.assertEqual(plain.items, instrumented.items)
+        self.assertEqual(plain.discounts, instrumented.discounts)
+
+    def test_histogram_buckets(self):
+        sink = InMemorySink()
+        for seconds in (0.000005, 0.0005, 0.0005, 5.0):
+            sink.timing("phase", seconds)
+        self.assertEqual(sink.histogram("phase", buckets=(0.00001, 0.001, 1.0)), [1, 2, 0, 1])
+        self.assertEqual(sink.histogram("unknown", buckets=(1.0,)), [0, 0])
+
+    def test_in_memory_sink_keeps_the_last_timings(self):
+        sink = InMemorySink(max_samples=3)
+        for seconds in (5.0, 0.5, 0.5, 0.0005):
+            sink.timing("phase", seconds)
+        self.assertEqual(list(sink.timings["phase"]), [0.5, 0.5, 0.0005])
+        self.assertEqual(sink.histogram("phase", buckets=(0.001, 1.0)), [1, 2, 0])
+
+    def test_null_sink_clock_is_stopped(self):
+        teller = self.make_teller(NullSink())
+        self.assertEqual(teller.metrics.clock(), 0.0)
+        self.assertEqual(len(teller.checks_out_articles_from(self.cart).discounts), 2)
+
+    def test_statsd_sink_sends_udp_packets(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        sink = StatsdSink("127.0.0.1", receiver.getsockname()[1], prefix="test")
+        try:
+            sink.increment("teller.checkouts")
+            sink.timing("teller.checkout", 0.0125)
+            self.assertEqual(receiver.recv(512), b"test.teller.checkouts:1|c")
+            self.assertEqual(receiver.recv(512), b"test.teller.checkout:12.500|ms")
+        finally:
+            sink.close()
+            receiver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import contextlib
+import gzip
+import io
+import itertools
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import journal_replay
+from journal_replay import Transaction, parse_csv, parse_jsonl, price, replay
+from models.products import Product, ProductUnit
+from receipt_printer import TextReceiptFormatter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from texttest_fixture import read_basket, read_catalog, read_offers
+from tests.mockers.fake_catalog import FakeCatalog
+
+CATALOG_CSV = "name,unit,price\ntoothbrush,EACH,0.99\napples,KILO,1.99\n"
+OFFERS_CSV = "name,offer,argument\ntoothbrush,THREE_FOR_TWO,0\napples,TEN_PERCENT_DISCOUNT,20.0\n"
+OFFERS_TOML = """
+[[offers]]
+type = "buy_n_get_m_free"
+product = "toothbrush"
+required = 3
+charge = 2
+"""
+
+
+class TestJournalReplay(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller = Teller(self.catalog)
+        self.carts = [Transaction("1", [("toothbrush", 3.0), ("apples", 1.5)]),
+                      Transaction("2", [("apples", 0.5)]),
+                      Transaction("3", [("toothbrush", 1.0), ("toothbrush", 2.0)])]
+
+    def write(self, name, text, compress=False):
+        path = self.directory / name
+        with (gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8")) as f:
+            f.write(text)
+        return path
+
+    def jsonl(self):
+        return "".join(json.dumps({"cart": cart, "items": [{"name": name, "quantity": quantity}
+                                                           for name, quantity in items]}) + "\n"
+                       for cart, items in self.carts)
+
+    def expected_output(self):
+        formatter = TextReceiptFormatter()
+        receipts = []
+        for transaction in self.carts:
+            cart = ShoppingCart()
+            for name, quantity in transaction.items:
+                cart.add_item_quantity(self.catalog.products[name], quantity)
+            receipts.append(formatter.format_receipt(self.teller.checks_out_articles_from(cart)))
+        return "\n".join(receipts)
+
+    def test_replays_jsonl_journal(self):
+        output = io.StringIO()
+        report = replay(self.write("journal.jsonl", self.jsonl()), self.teller, self.catalog.products, output)
+        self.assertEqual(output.getvalue(), self.expected_output())
+        self.assertEqual((report.carts, report.items), (3, 5))
+
+    def test_replays_gzip_csv_journal(self):
+        rows = "".join(f"{cart},{name},{quantity}\n" for cart, items in self.carts for name, quantity in items)
+        path = self.write("journal.csv.gz", "cart,name,quantity\n" + rows, compress=True)
+        output = io.StringIO()
+        replay(path, self.teller, self.catalog.products, output)
+        self.assertEqual(output.getvalue(), self.expected_output())
+
+    def test_compression_is_detected_from_the_content(self):
+        path = self.write("journal", self.jsonl(), compress=True)
+        output = io.StringIO()
+        replay(path, self.teller, self.catalog.products, output, journal_format="jsonl")
+        self.assertEqual(output.getvalue(), self.expected_output())
+
+    def test_report_counts_carts_per_second(self):
+        ticks = iter([10.0, 12.0])
+        report = replay(self.write("journal.jsonl", self.jsonl()), self.teller, self.catalog.products,
+                        io.StringIO(), clock=lambda: next(ticks))
+        self.assertEqual(report.seconds, 2.0)
+        self.assertEqual(report.carts_per_second, 1.5)
+        self.assertIn("1.5 carts/s", str(report))
+
+    def test_pipeline_is_lazy(self):
+        # an endless journal, only the carts that are consumed are parsed and priced
+        lines = (json.dumps({"cart": index, "items": [{"name": "apples", "quantity": 1}]}) for index in itertools.count())
+        priced = price(parse_jsonl(lines), self.teller, self.catalog.products)
+        carts = [transaction.cart for transaction, _ in itertools.islice(priced, 3)]
+        self.assertEqual(carts, ["0", "1", "2"])
+
+    def test_csv_rows_of_a_cart_are_grouped(self):
+        transactions = list(parse_csv(["cart,name,quantity", "a,apples,1", "a,toothbrush,2", "b,apples,0.5"]))
+        self.assertEqual(transactions, [Transaction("a", [("apples", 1.0), ("toothbrush", 2.0)]),
+                                        Transaction("b", [("apples", 0.5)])])
+
+    def test_unknown_product_names_the_cart(self):
+        with self.assertRaisesRegex(KeyError, "cart 7: unknown product 'pears'"):
+            list(price([Transaction("7", [("pears", 1.0)])], self.teller, self.catalog.products))
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            replay(self.write("journal.txt", ""), self.teller, self.catalog.products, io.StringIO())
+
+    def test_command_line(self):
+        catalog = self.write("catalog.csv", CATALOG_CSV)
+        offers = self.write("offers.toml", OFFERS_TOML)
+        journal = self.write("journal.jsonl.gz", self.jsonl(), compress=True)
+        output = self.directory / "receipts.txt"
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            journal_replay.main([str(journal), "--catalog", str(catalog), "--offers", str(offers),
+                                 "--output", str(output)])
+        self.assertIn("replayed 3 carts", errors.getvalue())
+        self.assertIn("3 for 2", output.read_text(encoding="utf-8"))
+
+
+class TestTexttestFixture(unittest.TestCase):
+
+    def test_loaders_build_a_priced_basket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            (directory / "catalog.csv").write_text(CATALOG_CSV, encoding="utf-8")
+            (directory / "offers.csv").write_text(OFFERS_CSV, encoding="utf-8")
+            (directory / "cart.csv").write_text("name,quantity\ntoothbrush,3\napples,2\n", encoding="utf-8")
+
+            catalog = read_catalog(directory / "catalog.csv")
+            teller = Teller(catalog)
+            read_offers(directory / "offers.csv", teller, catalog)
+            receipt = teller.checks_out_articles_from(read_basket(directory / "cart.csv", catalog))
+
+        self.assertEqual(len(teller.offers), 2)
+        self.assertAlmostEqual(receipt.total_price(), 2 * 0.99 + 2 * 1.99 * 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import pickle
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import mmap_catalog
+from mmap_catalog import MmapCatalog, write_snapshot
+from models.offers import BuyNGetMFreeStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class TestMmapCatalog(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.snapshot")
+        self.products = [Product(f"product-{index}", ProductUnit.EACH) for index in range(2000)]
+        write_snapshot(self.path, ((product, 1.0 + index / 100) for index, product in enumerate(self.products)))
+        self.catalog = MmapCatalog(self.path)
+        self.addCleanup(self.catalog.close)
+
+    def test_get_unit_price(self):
+        self.assertEqual(len(self.catalog), 2000)
+        self.assertEqual(self.catalog.get_unit_price(self.products[5]), 1.05)
+        self.assertEqual(self.catalog.get_unit_price(self.products[1999]), 20.99)
+        self.assertEqual(self.catalog.get_unit_prices(self.products[:50])[self.products[49]], 1.49)
+
+    def test_same_name_with_another_unit_is_another_product(self):
+        write_snapshot(self.path, [(Product("apples", ProductUnit.KILO), 1.99),
+                                   (Product("apples", ProductUnit.EACH), 0.45),
+                                   (Product("äpfel", None), 2.5)])
+        with MmapCatalog(self.path) as catalog:
+            self.assertEqual(catalog.get_unit_price(Product("apples", ProductUnit.KILO)), 1.99)
+            self.assertEqual(catalog.get_unit_price(Product("apples", ProductUnit.EACH)), 0.45)
+            self.assertEqual(catalog.get_unit_price(Product("äpfel")), 2.5)
+            self.assertEqual(len(list(catalog.items())), 3)
+
+    def test_missing_product_raises_key_error(self):
+        with self.assertRaisesRegex(KeyError, "Missing product in prices list"):
+            self.catalog.get_unit_prices([self.products[0], Product("unknown", ProductUnit.EACH)])
+        with self.assertRaises(KeyError):
+            self.catalog.get_unit_price(Product("product-5", ProductUnit.KILO))
+
+    def test_last_price_of_a_duplicate_wins(self):
+        count = write_snapshot(self.path, [(self.products[0], 1.0), (self.products[0], 2.0)])
+        with MmapCatalog(self.path) as catalog:
+            self.assertEqual(count, 1)
+            self.assertEqual(catalog.get_unit_price(self.products[0]), 2.0)
+
+    def test_items_round_trip(self):
+        write_snapshot(self.path + ".copy", self.catalog.items())
+        with MmapCatalog(self.path + ".copy") as copy:
+            self.assertEqual(list(copy.items()), list(self.catalog.items()))
+
+    def test_empty_snapshot(self):
+        write_snapshot(self.path, [])
+        with MmapCatalog(self.path) as catalog:
+            self.assertEqual(len(catalog), 0)
+            with self.assertRaises(KeyError):
+                catalog.get_unit_price(self.products[0])
+
+    def test_arrays_are_little_endian_on_every_host(self):
+        write_snapshot(self.path, [(Product("apples", ProductUnit.KILO), 1.99)])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        # header, then offsets 0 and 6, then the price
+        self.assertEqual(struct.unpack_from("<2Qd", data, 16), (0, 6, 1.99))
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["catalog.snapshot"])
+
+        # a big-endian host swaps the arrays both ways
+        with patch.object(mmap_catalog, "_SWAP", True):
+            write_snapshot(self.path, [(Product("apples", ProductUnit.KILO), 1.99)])
+            with MmapCatalog(self.path) as catalog:
+                self.assertEqual(catalog.get_unit_price(Product("apples", ProductUnit.KILO)), 1.99)
+
+    @unittest.skipIf(os.name != "posix", "file modes are POSIX")
+    def test_snapshot_is_readable_by_other_users(self):
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+
+        write_snapshot(self.path, [(self.products[0], 1.0)])
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+    def test_snapshot_is_read_only(self):
+        with self.assertRaises(TypeError):
+            self.catalog.add_product(self.products[0], 9.99)
+
+    def test_other_files_are_rejected(self):
+        for content in (b"", b"name,unit,price\napples,KILO,1.99\n"):
+            with open(self.path, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                MmapCatalog(self.path)
+
+    def test_pickling_maps_the_file_again(self):
+        catalog = pickle.loads(pickle.dumps(self.catalog))
+        self.addCleanup(catalog.close)
+        self.assertEqual(catalog.get_unit_price(self.products[7]), 1.07)
+
+    def test_checkout(self):
+        teller = Teller(self.catalog)
+        teller.add_special_offer(BuyNGetMFreeStrategy(self.products[0], 3, 2))
+        cart = ShoppingCart()
+        for product in self.products[:20]:
+            cart.add_item_quantity(product, 3)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertEqual(len(receipt.items), 20)
+        self.assertAlmostEqual(receipt.discounts[0].amount, -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import dataclasses
+import unittest
+
+from models.discounts import Discount
+from models.products import Product, ProductQuantity, ProductUnit
+from receipt import ReceiptItem
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def setUp(self):
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.models = [
+            self.apples,
+            ProductQuantity(self.apples, 2.5),
+            ReceiptItem(self.apples, 2.5, 1.99, 4.975),
+            Discount(self.apples, "10.0% off", -0.50),
+        ]
+
+    def test_models_have_no_instance_dict(self):
+        for model in self.models:
+            self.assertFalse(hasattr(model, "__dict__"), type(model).__name__)
+
+    def test_models_are_immutable(self):
+        for model in self.models:
+            with self.assertRaises(dataclasses.FrozenInstanceError):
+                setattr(model, dataclasses.fields(model)[0].name, None)
+
+    def test_products_are_hashable_by_value(self):
+        same = Product("apples", ProductUnit.KILO)
+        self.assertEqual(self.apples, same)
+        self.assertEqual(hash(self.apples), hash(same))
+        self.assertNotEqual(self.apples, Product("apples", ProductUnit.EACH))
+        self.assertEqual(len({self.apples, same}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
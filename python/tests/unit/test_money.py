@@ -0,0 +1,177 @@
+import random
+import unittest
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP
+
+from checkout_session import CheckoutSession
+from models.bundles import FixedBundleStrategy
+from models.money import Money, Rounding, divide, multiply, ratio, to_minor
+from models.offer_plans import compile_offer, evaluate_plan_minor
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from parallel_checkout import parallel_checkout
+from receipt import Receipt
+from receipt_printer import TextReceiptFormatter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_offers import FlatOffStrategy
+from vectorized_pricing import np, VectorizedPricingEngine
+
+DECIMAL_ROUNDING = {Rounding.HALF_UP: ROUND_HALF_UP, Rounding.HALF_EVEN: ROUND_HALF_EVEN,
+                    Rounding.DOWN: ROUND_DOWN, Rounding.UP: ROUND_UP}
+
+
+class TestMoneyArithmetic(unittest.TestCase):
+
+    def test_divide_matches_decimal_rounding(self):
+        rng = random.Random(3)
+        for _ in range(2000):
+            numerator, denominator = rng.randint(-10 ** 6, 10 ** 6), rng.choice([1, 2, 3, 8, 10, 1000])
+            for rounding, decimal_rounding in DECIMAL_ROUNDING.items():
+                expected = (Decimal(numerator) / Decimal(denominator)).quantize(Decimal(1), rounding=decimal_rounding)
+                self.assertEqual(divide(numerator, denominator, rounding), int(expected))
+
+    def test_amounts_are_read_as_printed(self):
+        self.assertEqual(ratio(0.1), (1, 10))
+        self.assertEqual(ratio(3.0), (3, 1))
+        self.assertEqual(Money.of(0.1) + Money.of(0.2), Money.of(0.3))
+        self.assertEqual(to_minor(1.005), 100)
+        self.assertEqual(to_minor(1.005, Rounding.HALF_UP), 101)
+
+    def test_weighed_quantities_round_with_the_policy(self):
+        # 1.99 * 0.125 = 0.24875
+        self.assertEqual(multiply(199, 0.125), 25)
+        self.assertEqual(multiply(199, 0.125, Rounding.DOWN), 24)
+        self.assertEqual(Money(199).times(3), Money(597))
+
+    def test_money_prints_like_the_float_amounts(self):
+        self.assertEqual(str(Money(-657)), "-6.57")
+        self.assertEqual(str(Money(5)), "0.05")
+        self.assertEqual("%.2f" % Money(1999), "19.99")
+        self.assertLess(Money(-1), Money(0))
+
+
+class TestMoneyOfferPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.product = Product("toothbrush", ProductUnit.EACH)
+
+    def test_plans_match_the_exact_amount(self):
+        strategies = [BuyNGetMFreeStrategy(self.product, 3, 2), PercentDiscountStrategy(self.product, 12.5),
+                      BuyQuantityForAmountStrategy(self.product, 5, 7.49)]
+        for strategy in strategies:
+            for quantity in (1, 3, 5, 7, 11, 2.5):
+                price = Decimal("1.79")
+                q = Decimal(str(quantity))
+                if q < strategy.required_product_count:
+                    expected = Decimal(0)
+                elif isinstance(strategy, BuyNGetMFreeStrategy):
+                    expected = (q // 3) * price
+                elif isinstance(strategy, PercentDiscountStrategy):
+                    expected = q * price * Decimal("0.125")
+                else:
+                    expected = (q // 5) * (5 * price - Decimal("7.49"))
+                expected = int((expected * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+                self.assertEqual(evaluate_plan_minor(compile_offer(strategy), quantity, 179, Rounding.HALF_UP),
+                                 max(expected, 0))
+
+    def test_each_offer_has_its_rounding(self):
+        # 10% of 0.25 is 2.5 cents
+        plans = {rounding: compile_offer(PercentDiscountStrategy(self.product, 10.0, rounding=rounding))
+                 for rounding in Rounding}
+        amounts = {rounding: evaluate_plan_minor(plan, 1, 25, rounding) for rounding, plan in plans.items()}
+        self.assertEqual(amounts, {Rounding.HALF_UP: 3, Rounding.HALF_EVEN: 2, Rounding.DOWN: 2, Rounding.UP: 3})
+
+
+class TestMoneyTeller(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.products = [Product(f"money-{index}", ProductUnit.KILO if index % 3 == 0 else ProductUnit.EACH)
+                         for index in range(9)]
+        rng = random.Random(11)
+        for product in self.products:
+            self.catalog.add_product(product, round(rng.uniform(0.2, 9.0), 2))
+        self.teller = Teller(self.catalog, money=True)
+        p = self.products
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(p[1], 3, 2))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[0], 12.5, rounding=Rounding.DOWN))
+        self.teller.add_special_offer(BuyQuantityForAmountStrategy(p[2], 5, 3.99))
+        self.teller.add_special_offer(FlatOffStrategy(p[4], 1, 1 / 3))
+        self.carts = []
+        for _ in range(100):
+            cart = ShoppingCart()
+            for _ in range(rng.randint(1, 8)):
+                product = rng.choice(self.products)
+                quantity = round(rng.uniform(0.1, 3.0), 3) if product.unit == ProductUnit.KILO else rng.randint(1, 7)
+                cart.add_item_quantity(product, quantity)
+            self.carts.append(cart)
+
+    def test_totals_reconcile_with_the_lines(self):
+        for cart in self.carts:
+            receipt = self.teller.checks_out_articles_from(cart)
+
+            self.assertIsInstance(receipt.total_price(), Money)
+            lines = sum(item.total_price.minor for item in receipt.items)
+            discounts = sum(discount.amount.minor for discount in receipt.discounts)
+            self.assertEqual(receipt.subtotal.minor, lines)
+            self.assertEqual(receipt.total_price().minor, lines + discounts)
+
+    def test_receipt_prints_like_the_float_receipt(self):
+        float_teller = Teller(self.catalog)
+        for offer in self.teller.offers:
+            float_teller.add_special_offer(offer)
+        formatter = TextReceiptFormatter()
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.products[1], 3)
+        cart.add_item_quantity(self.products[5], 2)
+
+        self.assertEqual(formatter.format_receipt(self.teller.checks_out_articles_from(cart)),
+                         formatter.format_receipt(float_teller.checks_out_articles_from(cart)))
+
+    def test_custom_strategy_amounts_are_rounded_once(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.products[4], 1)
+
+        [discount] = self.teller.checks_out_articles_from(cart).discounts
+
+        self.assertEqual(discount.amount, Money(-33))
+
+    def assert_same_receipt(self, receipt, expected):
+        self.assertTrue(receipt.money)
+        self.assertEqual(receipt.items, expected.items)
+        self.assertEqual(sorted((d.description, d.amount.minor) for d in receipt.discounts),
+                         sorted((d.description, d.amount.minor) for d in expected.discounts))
+        self.assertEqual(receipt.total_price(), expected.total_price())
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_vectorized_pricing_rounds_like_the_teller(self):
+        receipts = VectorizedPricingEngine(self.teller).price_carts(self.carts)
+
+        for receipt, cart in zip(receipts, self.carts):
+            self.assert_same_receipt(receipt, self.teller.checks_out_articles_from(cart))
+
+    def test_checkout_session_rounds_like_the_teller(self):
+        self.teller.add_special_offer(FixedBundleStrategy([self.products[5], self.products[6]], 4.99))
+        for cart in self.carts[:20]:
+            session = CheckoutSession(self.teller)
+            for pq in cart.items:
+                session.cart.add_item_quantity(pq.product, pq.quantity)
+
+            self.assert_same_receipt(session.close(), self.teller.checks_out_articles_from(cart))
+
+    def test_parallel_checkout_rounds_like_the_teller(self):
+        receipts = parallel_checkout(self.teller, self.carts, workers=2, chunk_size=16)
+
+        for receipt, cart in zip(receipts, self.carts):
+            self.assert_same_receipt(receipt, self.teller.checks_out_articles_from(cart))
+
+    def test_exact_and_money_are_exclusive(self):
+        with self.assertRaises(ValueError):
+            Receipt(exact=True, money=True)
+        with self.assertRaises(TypeError):
+            Receipt().add_product_minor(self.products[1], 1, 100, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from models.bundles import FixedBundleStrategy
+from models.money import Rounding
+from models.offers import BuyNGetMFreeStrategy, BuyQuantityForAmountStrategy, PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from offer_config import OfferConfigError, load_offers, validate_offers
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+OFFERS_CSV = """type,product,products,required,charge,percentage,amount,exclusive,priority,rounding
+buy_n_get_m_free,toothbrush,,3,2,,,,,
+percent_discount,apples,,,,10,,true,2,HALF_EVEN
+buy_quantity_for_amount,toothpaste,,5,,,7.49,,,
+fixed_bundle,,toothbrush|toothpaste,,,,2.5,,,
+buy_n_get_m_free,toothbrush,,3,2,,,,,
+"""
+
+OFFERS_TOML = """
+[[offers]]
+type = "buy_n_get_m_free"
+product = "toothbrush"
+required = 3
+charge = 2
+
+[[offers]]
+type = "percent_discount"
+product = "apples"
+percentage = 10.0
+exclusive = true
+priority = 2
+rounding = "HALF_EVEN"
+
+[[offers]]
+type = "buy_quantity_for_amount"
+product = "toothpaste"
+required = 5
+amount = 7.49
+
+[[offers]]
+type = "fixed_bundle"
+products = ["toothbrush", "toothpaste"]
+amount = 2.5
+"""
+
+
+class TestOfferConfig(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(Product("toothbrush", ProductUnit.EACH), 0.99)
+        self.catalog.add_product(Product("toothpaste", ProductUnit.EACH), 1.79)
+        self.catalog.add_product(Product("apples", ProductUnit.KILO), 1.99)
+        self.products = self.catalog.products
+
+    def write(self, name, text):
+        path = self.directory / name
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def assert_offers(self, offers):
+        self.assertEqual([type(offer) for offer in offers],
+                         [BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy,
+                          FixedBundleStrategy])
+        brush, percent, paste, bundle = offers
+        self.assertIs(brush.target_product, self.products["toothbrush"])
+        self.assertEqual(brush.description, "3 for 2")
+        self.assertTrue(percent.exclusive)
+        self.assertEqual((percent.priority, percent.rounding), (2, Rounding.HALF_EVEN))
+        self.assertEqual(paste.description, "5 for 7.49")
+        self.assertEqual(bundle.products, (self.products["toothbrush"], self.products["toothpaste"]))
+
+    def test_formats_load_the_same_offers(self):
+        records = [{"type": "buy_n_get_m_free", "product": "toothbrush", "required": 3, "charge": 2},
+                   {"type": "percent_discount", "product": "apples", "percentage": 10, "exclusive": True,
+                    "priority": 2, "rounding": "half_even"},
+                   {"type": "buy_quantity_for_amount", "product": "toothpaste", "required": 5, "amount": 7.49},
+                   {"type": "fixed_bundle", "products": ["toothbrush", "toothpaste"], "amount": 2.5}]
+        for path in (self.write("offers.csv", OFFERS_CSV), self.write("offers.toml", OFFERS_TOML),
+                     self.write("offers.json", json.dumps({"offers": records}))):
+            with self.subTest(path.suffix):
+                self.assert_offers(load_offers(path, self.products))
+
+    def test_identical_offers_are_kept_once(self):
+        offers = load_offers(self.write("offers.csv", OFFERS_CSV), self.products)
+        self.assertEqual(len(offers), 4)
+
+    def test_every_invalid_record_is_reported(self):
+        records = [{"type": "buy_n_get_m_free", "product": "toothbrush", "required": 3, "charge": 2},
+                   {"type": "buy_n_get_m_free", "product": "toothbrush", "required": 2, "charge": 3},
+                   {"type": "percent_discount", "product": "pears", "percentage": 10},
+                   {"type": "percent_discount", "product": "apples", "percentage": "lots"},
+                   {"type": "buy_quantity_for_amount", "product": "toothpaste", "required": 5},
+                   {"type": "free_lunch"},
+                   {"type": "mix_and_match_bundle", "products": ["apples"], "required": 2, "amount": 1,
+                    "rounding": "sideways"}]
+        with self.assertRaises(OfferConfigError) as raised:
+            validate_offers(records, self.products)
+        self.assertEqual(raised.exception.errors, [
+            "offer 2: charge must be less than required",
+            "offer 3: unknown product(s) 'pears'",
+            "offer 4: percentage 'lots' is not a number",
+            "offer 5: missing amount",
+            "offer 6: unknown type 'free_lunch'",
+            "offer 7: unknown rounding 'sideways'",
+        ])
+
+    def test_priority_must_be_an_integer(self):
+        records = [{"type": "percent_discount", "product": "apples", "percentage": 10, "priority": priority}
+                   for priority in (True, 2.5, 2.0, "high", "3")]
+        with self.assertRaises(OfferConfigError) as raised:
+            validate_offers(records, self.products)
+        self.assertEqual(raised.exception.errors, [
+            "offer 1: priority True is not an integer",
+            "offer 2: priority 2.5 is not an integer",
+            "offer 3: priority 2.0 is not an integer",
+            "offer 4: priority 'high' is not an integer",
+        ])
+
+    def test_malformed_records_are_reported(self):
+        records = [[1], "apples", {"type": "percent_discount", "product": ["apples"], "percentage": 10},
+                   {"type": "fixed_bundle", "products": ["apples", 3], "amount": 1}]
+        with self.assertRaises(OfferConfigError) as raised:
+            validate_offers(records, self.products)
+        self.assertEqual(raised.exception.errors, [
+            "offer 1: [1] is not an object",
+            "offer 2: 'apples' is not an object",
+            "offer 3: product ['apples'] is not a name",
+            "offer 4: products ['apples', 3] are not names",
+        ])
+
+    def test_unknown_file_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load_offers(self.write("offers.xml", ""), self.products)
+
+    def test_cache_skips_parsing_while_the_file_is_unchanged(self):
+        path = self.write("offers.csv", OFFERS_CSV)
+        cache = self.directory / "offers.cache"
+        self.assert_offers(load_offers(path, self.products, cache))
+        # plain data, loading it cannot run code
+        self.assertEqual(json.loads(cache.read_text(encoding="utf-8"))[2], ["toothbrush", "apples", "toothpaste"])
+
+        # a cache hit does not read the offer file, make it unreadable without changing its stamp
+        stat = os.stat(path)
+        path.write_text(OFFERS_CSV.replace("type,", "kind,"), encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assert_offers(load_offers(path, self.products, cache))
+
+        self.write("offers.csv", "type,product,percentage\npercent_discount,apples,20\n")
+        offers = load_offers(path, self.products, cache)
+        self.assertEqual([offer.description for offer in offers], ["20.0% off"])
+
+    def test_corrupt_cache_is_rebuilt(self):
+        path = self.write("offers.csv", OFFERS_CSV)
+        cache = self.write("offers.cache", "not a pickle")
+        self.assert_offers(load_offers(path, self.products, cache))
+        self.assert_offers(load_offers(path, self.products, cache))
+
+    def test_loaded_offers_price_a_cart(self):
+        teller = Teller(self.catalog)
+        teller.add_special_offers(load_offers(self.write("offers.toml", OFFERS_TOML), self.products))
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.products["toothbrush"], 3)
+        cart.add_item_quantity(self.products["apples"], 2)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertEqual(len(teller.offers), 4)
+        self.assertEqual([discount.description for discount in receipt.discounts], ["3 for 2", "10.0% off"])
+
+
+if __name__ == "__main__":
+    unittest.main()
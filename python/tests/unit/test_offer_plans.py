@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from models.offer_plans import (
+    BUY_N_GET_M_FREE, BUY_QUANTITY_FOR_AMOUNT, PERCENT_DISCOUNT, OfferPlan, compile_offer, evaluate_plan,
+)
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_cart import FakeCart
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_product import ProductStub
+
+
+class CustomPercentStrategy(PercentDiscountStrategy):
+    pass
+
+
+class TestOfferPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.product = ProductStub("toothpaste")
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.product, 1.79)
+
+    def test_compile_built_in_strategies(self):
+        self.assertEqual(compile_offer(BuyNGetMFreeStrategy(self.product, 3, 2)),
+                         OfferPlan(BUY_N_GET_M_FREE, self.product, 3, 1, 0.0, 0.0, "3 for 2"))
+        self.assertEqual(compile_offer(PercentDiscountStrategy(self.product, 10.0)),
+                         OfferPlan(PERCENT_DISCOUNT, self.product, 1, 0, 0.1, 0.0, "10.0% off"))
+        self.assertEqual(compile_offer(BuyQuantityForAmountStrategy(self.product, 5, 7.49)),
+                         OfferPlan(BUY_QUANTITY_FOR_AMOUNT, self.product, 5, 0, 0.0, 7.49, "5 for 7.49"))
+
+    def test_subclasses_are_not_compiled(self):
+        self.assertIsNone(compile_offer(CustomPercentStrategy(self.product, 10.0)))
+
+    def test_plans_give_the_strategy_amounts(self):
+        strategies = [BuyNGetMFreeStrategy(self.product, 3, 2), PercentDiscountStrategy(self.product, 12.5),
+                      BuyQuantityForAmountStrategy(self.product, 5, 7.49), BuyQuantityForAmountStrategy(self.product, 2, 9.0)]
+        for strategy in strategies:
+            for quantity in (0, 1, 2, 3, 5, 6, 7, 11, 2.5):
+                cart = FakeCart()
+                cart.set_item_quantity(self.product, quantity)
+                discounts = strategy.calculate_discount(cart, self.catalog)
+                expected = -discounts[0].amount if discounts else 0
+                self.assertEqual(evaluate_plan(compile_offer(strategy), quantity, 1.79), expected)
+
+    def test_teller_evaluates_the_compiled_plan(self):
+        toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(toothbrush, 0.99)
+        teller = Teller(self.catalog)
+        teller.add_special_offer(BuyNGetMFreeStrategy(toothbrush, 3, 2))
+        cart = ShoppingCart()
+        cart.add_item_quantity(toothbrush, 6)
+
+        with patch.object(BuyNGetMFreeStrategy, "calculate_discount") as calculate_discount:
+            receipt = teller.checks_out_articles_from(cart)
+
+        calculate_discount.assert_not_called()
+        self.assertEqual(len(receipt.discounts), 1)
+        self.assertEqual(receipt.discounts[0].description, "3 for 2")
+        self.assertAlmostEqual(receipt.discounts[0].amount, -1.98)
+
+
+if __name__ == "__main__":
+    unittest.main()
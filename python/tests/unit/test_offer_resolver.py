@@ -0,0 +1,147 @@
+import unittest
+from itertools import product as cartesian
+
+from checkout_session import CheckoutSession
+from models.offer_plans import compile_offer, evaluate_plan
+from models.offer_resolver import resolve_exclusive_offers
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_offers import FlatOffStrategy
+
+
+def entries_of(*strategies):
+    return [(sequence, strategy, compile_offer(strategy)) for sequence, strategy in enumerate(strategies)]
+
+
+def brute_force(strategies, quantity, unit_price):
+    """Tries every split of the quantity, the reference for the resolver."""
+    plans = [compile_offer(strategy) for strategy in strategies]
+    best = 0
+    for split in cartesian(range(quantity + 1), repeat=len(plans)):
+        if sum(split) <= quantity:
+            best = max(best, sum(evaluate_plan(plan, units, unit_price) for plan, units in zip(plans, split)))
+    return best
+
+
+class TestResolveExclusiveOffers(unittest.TestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 1.0)
+        self.catalog.add_product(self.apples, 1.99)
+        self.cart = ShoppingCart()
+
+    def resolve(self, strategies, quantity, unit_price=1.0):
+        resolved = resolve_exclusive_offers(entries_of(*strategies), quantity, unit_price, self.cart, self.catalog)
+        return [(strategy, allotted) for _, strategy, _, allotted in resolved]
+
+    def test_deals_then_the_percentage_on_the_rest(self):
+        three_for_two = BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True)
+        ten_percent = PercentDiscountStrategy(self.toothbrush, 10.0, exclusive=True)
+
+        self.assertEqual(self.resolve([three_for_two, ten_percent], 7), [(three_for_two, 6), (ten_percent, 1)])
+
+    def test_finds_the_split_a_greedy_choice_misses(self):
+        three_for_two = BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True)
+        # 1.80 off every 5, the best ratio, but 6 units give more as two 3 for 2
+        five_for = BuyQuantityForAmountStrategy(self.toothbrush, 5, 3.20, exclusive=True)
+
+        self.assertEqual(self.resolve([three_for_two, five_for], 6), [(three_for_two, 6)])
+        self.assertEqual(self.resolve([three_for_two, five_for], 8), [(three_for_two, 3), (five_for, 5)])
+
+    def test_matches_every_split(self):
+        strategies = [BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True),
+                      BuyQuantityForAmountStrategy(self.toothbrush, 5, 3.20, exclusive=True),
+                      BuyQuantityForAmountStrategy(self.toothbrush, 4, 2.90, exclusive=True),
+                      PercentDiscountStrategy(self.toothbrush, 20.0, exclusive=True)]
+        entries = entries_of(*strategies)
+        for quantity in range(13):
+            resolved = resolve_exclusive_offers(entries, quantity, 1.0, self.cart, self.catalog)
+            amount = sum(evaluate_plan(plan, allotted, 1.0) for _, _, plan, allotted in resolved)
+            self.assertAlmostEqual(amount, brute_force(strategies, quantity, 1.0))
+            self.assertLessEqual(sum(allotted for *_, allotted in resolved), quantity)
+
+    def test_priority_breaks_ties(self):
+        low = PercentDiscountStrategy(self.toothbrush, 10.0, "low", exclusive=True)
+        high = PercentDiscountStrategy(self.toothbrush, 10.0, "high", exclusive=True, priority=5)
+
+        self.assertEqual(self.resolve([low, high], 4), [(high, 4)])
+        self.assertEqual(self.resolve([high, low], 4), [(high, 4)])
+
+    def test_weighed_quantities_go_to_a_single_offer(self):
+        ten_percent = PercentDiscountStrategy(self.apples, 10.0, exclusive=True)
+        two_for = BuyQuantityForAmountStrategy(self.apples, 2, 3.0, exclusive=True)
+
+        self.assertEqual(self.resolve([ten_percent, two_for], 2.5, 1.99), [(two_for, 2.5)])
+
+    def test_custom_strategy_competes_for_the_whole_quantity(self):
+        three_for_two = BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True)
+        flat = FlatOffStrategy(self.toothbrush, 1, 5.0, exclusive=True)
+        self.cart.add_item_quantity(self.toothbrush, 6)
+
+        self.assertEqual(self.resolve([three_for_two, flat], 6), [(flat, 6)])
+        self.assertEqual(self.resolve([three_for_two, flat], 30), [(three_for_two, 30)])
+
+
+class TestTellerExclusiveOffers(unittest.TestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.teller = Teller(self.catalog)
+
+    def cart_of(self, quantity):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, quantity)
+        return cart
+
+    def test_offers_stack_unless_exclusive(self):
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2))
+        self.teller.add_special_offer(PercentDiscountStrategy(self.toothbrush, 10.0))
+
+        receipt = self.teller.checks_out_articles_from(self.cart_of(3))
+
+        self.assertEqual([d.description for d in receipt.discounts], ["3 for 2", "10.0% off"])
+
+    def test_exclusive_offers_do_not_stack(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.toothbrush, 10.0, exclusive=True))
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True))
+
+        receipt = self.teller.checks_out_articles_from(self.cart_of(7))
+
+        self.assertEqual([d.description for d in receipt.discounts], ["10.0% off", "3 for 2"])
+        self.assertAlmostEqual(receipt.discounts[0].amount, -0.099)
+        self.assertAlmostEqual(receipt.discounts[1].amount, -1.98)
+        self.assertAlmostEqual(receipt.total_price(), 7 * 0.99 - 0.099 - 1.98)
+
+    def test_removed_exclusive_offer_no_longer_competes(self):
+        percent = PercentDiscountStrategy(self.toothbrush, 10.0, exclusive=True)
+        self.teller.add_special_offer(percent)
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True))
+        self.assertEqual(self.teller.offers_for(self.toothbrush)[0], percent)
+
+        self.teller.remove_special_offer(percent)
+        receipt = self.teller.checks_out_articles_from(self.cart_of(7))
+
+        self.assertEqual([d.description for d in receipt.discounts], ["3 for 2"])
+
+    def test_checkout_session_matches_the_teller(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.toothbrush, 10.0, exclusive=True))
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2, exclusive=True))
+        session = CheckoutSession(self.teller)
+
+        for _ in range(7):
+            session.cart.add_item_quantity(self.toothbrush, 1)
+            expected = self.teller.checks_out_articles_from(session.cart)
+            self.assertAlmostEqual(session.total, expected.total_price())
+        self.assertEqual(len(session.discounts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime, timezone
+
+from models.bundles import FixedBundleStrategy
+from models.offer_schedule import OfferSchedule, is_effective, is_scheduled
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy
+from models.products import Product, ProductUnit
+from offer_config import OfferConfigError, validate_offers
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_clock import FakeClock
+from vectorized_pricing import np, VectorizedPricingEngine
+
+
+class TestOfferSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog = FakeCatalog()
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.toothpaste, 1.79)
+        self.catalog.add_product(self.apples, 1.99)
+        self.clock = FakeClock()
+        self.teller = Teller(self.catalog, clock=self.clock)
+
+    def check_out(self, at):
+        self.clock.now = at
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 3)
+        cart.add_item_quantity(self.apples, 2)
+        return [discount.description for discount in self.teller.checks_out_articles_from(cart).discounts]
+
+    def test_window_is_half_open(self):
+        offer = PercentDiscountStrategy(self.apples, 10.0, effective_from=100, effective_until=200)
+
+        self.assertTrue(is_scheduled(offer))
+        self.assertFalse(is_scheduled(PercentDiscountStrategy(self.apples, 10.0)))
+        self.assertEqual([is_effective(offer, at) for at in (99, 100, 199, 200)], [False, True, True, False])
+
+    def test_datetimes_are_converted_to_timestamps(self):
+        start = datetime(2026, 11, 27, tzinfo=timezone.utc)
+        offer = PercentDiscountStrategy(self.apples, 10.0, effective_from=start)
+
+        self.assertEqual(offer.effective_from, start.timestamp())
+        self.assertIsNone(offer.effective_until)
+
+    def test_empty_window_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PercentDiscountStrategy(self.apples, 10.0, effective_from=200, effective_until=200)
+
+    def test_offers_switch_on_and_off_without_registering_again(self):
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2))
+        self.teller.add_special_offer(PercentDiscountStrategy(self.apples, 10.0, effective_from=100,
+                                                              effective_until=200))
+
+        self.assertEqual(self.check_out(50), ["3 for 2"])
+        self.assertEqual(self.check_out(100), ["3 for 2", "10.0% off"])
+        self.assertEqual(self.check_out(150), ["3 for 2", "10.0% off"])
+        self.assertEqual(self.check_out(200), ["3 for 2"])
+        self.assertEqual(self.teller.next_offer_change(50), 100)
+        self.assertIsNone(self.teller.next_offer_change(200))
+
+    def test_scheduled_offers_keep_the_registration_order(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.toothbrush, 20.0, effective_until=100))
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(self.toothbrush, 3, 2))
+        self.teller.add_special_offer(PercentDiscountStrategy(self.toothbrush, 5.0, effective_from=50))
+
+        self.assertEqual(self.check_out(75), ["20.0% off", "3 for 2", "5.0% off"])
+        self.assertEqual([offer.description for offer in self.teller.offers_for(self.toothbrush, at=10)],
+                         ["20.0% off", "3 for 2"])
+
+    def test_exclusive_offers_compete_only_while_effective(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.apples, 10.0, exclusive=True))
+        self.teller.add_special_offer(PercentDiscountStrategy(self.apples, 30.0, exclusive=True,
+                                                              effective_from=100, effective_until=200))
+
+        self.assertEqual(self.check_out(0), ["10.0% off"])
+        self.assertEqual(self.check_out(150), ["30.0% off"])
+
+    def test_scheduled_bundle(self):
+        self.teller.add_special_offer(FixedBundleStrategy([self.toothbrush, self.apples], 2.00, "brush and apples",
+                                                          effective_from=100))
+
+        self.assertEqual(self.check_out(0), [])
+        self.assertEqual(self.check_out(100), ["bundle for 2.00"])
+
+    def test_segment_index_is_reused_until_the_offers_change(self):
+        offer = PercentDiscountStrategy(self.apples, 10.0, effective_from=100, effective_until=200)
+        self.teller.add_special_offer(offer)
+
+        index = self.teller._index_at(120)
+        self.assertIs(self.teller._index_at(180), index)
+        self.assertIsNot(self.teller._index_at(250), index)
+
+        self.teller.remove_special_offer(offer)
+        self.assertEqual(self.check_out(150), [])
+        self.assertEqual(len(self.teller.offers), 0)
+
+    def test_removing_an_offer_registered_twice_keeps_the_other_registration(self):
+        offer = PercentDiscountStrategy(self.apples, 10.0, effective_from=100)
+        self.teller.add_special_offers([offer, offer])
+        self.assertEqual(self.check_out(100), ["10.0% off", "10.0% off"])
+
+        self.teller.remove_special_offer(offer)
+
+        self.assertEqual(self.teller.offers, (offer,))
+        self.assertEqual(self.check_out(100), ["10.0% off"])
+        self.assertEqual(self.teller.offers_for(self.apples, at=100), [offer])
+
+    def test_schedule_caches_the_active_entries_per_segment(self):
+        early = PercentDiscountStrategy(self.apples, 10.0, effective_until=100)
+        late = PercentDiscountStrategy(self.apples, 20.0, effective_from=50, effective_until=150)
+        schedule = OfferSchedule([(0, early, None), (1, late, None)])
+
+        self.assertEqual([entry[1] for entry in schedule.active_at(75)], [early, late])
+        self.assertIs(schedule.active_at(60), schedule.active_at(75))
+        self.assertEqual(schedule.active_at(120), ((1, late, None),))
+        self.assertEqual(schedule.active_at(150), ())
+        self.assertEqual(schedule.next_change(75), 100)
+
+        updated = schedule.updated(removed=[early])
+        self.assertEqual(updated.active_at(20), ())
+        self.assertEqual(len(schedule.active_at(20)), 1)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_vectorized_pricing_applies_the_offers_effective_for_the_batch(self):
+        self.teller.add_special_offer(PercentDiscountStrategy(self.apples, 10.0, effective_from=100))
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.apples, 2)
+        engine = VectorizedPricingEngine(self.teller)
+
+        self.assertEqual(engine.price_carts([cart])[0].discounts, [])
+        self.clock.now = 100
+        self.assertEqual([discount.description for discount in engine.price_carts([cart])[0].discounts],
+                         ["10.0% off"])
+
+    def test_offer_files_give_windows_as_iso_dates_or_timestamps(self):
+        products = self.catalog.products
+        specs = validate_offers([{"type": "percent_discount", "product": "apples", "percentage": 10,
+                                  "effective_from": "2026-11-27T00:00:00+00:00", "effective_until": 1796000000}],
+                                products)
+        offer = specs[0].build()
+
+        self.assertEqual(offer.effective_from, datetime(2026, 11, 27, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(offer.effective_until, 1796000000)
+        with self.assertRaises(OfferConfigError) as raised:
+            validate_offers([{"type": "percent_discount", "product": "apples", "percentage": 10,
+                              "effective_from": "black friday"},
+                             {"type": "percent_discount", "product": "apples", "percentage": 10,
+                              "effective_from": 200, "effective_until": 100}], products)
+        self.assertEqual(raised.exception.errors, [
+            "offer 1: effective_from 'black friday' is not a timestamp or an ISO 8601 date",
+            "offer 2: effective_from must be before effective_until",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
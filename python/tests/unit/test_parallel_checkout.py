@@ -0,0 +1,57 @@
+import pickle
+import unittest
+
+from models.discounts import Discount
+from models.products import Product, ProductUnit
+from parallel_checkout import parallel_checkout
+from tests.benchmarks.generators import make_scenario
+from tests.mockers.fake_offers import FreeGiftStrategy
+
+GIFT = Product("gift", ProductUnit.EACH)
+
+
+class TestParallelCheckout(unittest.TestCase):
+
+    def test_receipts_match_serial_checkout_in_input_order(self):
+        scenario = make_scenario(products=40, offers=60, lines=6, carts=25)
+
+        receipts = parallel_checkout(scenario.teller, scenario.carts, workers=2, chunk_size=4)
+
+        self.assertEqual(len(receipts), len(scenario.carts))
+        for receipt, cart in zip(receipts, scenario.carts):
+            expected = scenario.teller.checks_out_articles_from(cart)
+            self.assertEqual(receipt.items, expected.items)
+            self.assertEqual(receipt.discounts, expected.discounts)
+            self.assertEqual(receipt.total_price(), expected.total_price())
+
+    def test_custom_offer_pricing_a_product_outside_the_batch(self):
+        scenario = make_scenario(products=40, offers=60, lines=6, carts=25)
+        scenario.catalog.add_product(GIFT, 4.99)
+        scenario.teller.add_special_offer(FreeGiftStrategy(scenario.carts[0].items[0].product, GIFT))
+
+        receipts = parallel_checkout(scenario.teller, scenario.carts, workers=2, chunk_size=4)
+
+        self.assertIn(Discount(GIFT, "free gift", -4.99), receipts[0].discounts)
+        for receipt, cart in zip(receipts, scenario.carts):
+            expected = scenario.teller.checks_out_articles_from(cart)
+            self.assertEqual(receipt.items, expected.items)
+            self.assertEqual(receipt.discounts, expected.discounts)
+
+    def test_empty_batch(self):
+        scenario = make_scenario(products=5, offers=0, lines=1, carts=0)
+        self.assertEqual(parallel_checkout(scenario.teller, []), [])
+
+    def test_chunk_size_must_be_positive(self):
+        scenario = make_scenario(products=5, offers=0, lines=1, carts=1)
+        with self.assertRaises(ValueError):
+            parallel_checkout(scenario.teller, scenario.carts, chunk_size=0)
+
+    def test_products_recompute_their_hash_when_unpickled(self):
+        apples = Product("apples", ProductUnit.KILO)
+        copy = pickle.loads(pickle.dumps(apples))
+        self.assertEqual(copy, apples)
+        self.assertEqual(hash(copy), hash(("apples", ProductUnit.KILO)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import math
+from decimal import Decimal
 
 
 import receipt 
@@ -53,6 +54,32 @@ class TestReceipt(unittest.TestCase):
         self.assertEqual(d.description, "Milk special")
         self.assertEqual(d.amount, -0.50)
         
+    def test_items_and_discounts_are_read_only_views(self):
+        """Reading the items or the discounts copies nothing and they cannot be changed from outside."""
+        items = self.reciept.items
+        self.assertIs(items, self.reciept.items)
+        with self.assertRaises(TypeError):
+            items[0] = None
+        with self.assertRaises(AttributeError):
+            items.append(None)
+
+        # the view follows the receipt, list() takes a snapshot
+        snapshot = list(self.reciept.discounts)
+        extra = Discount(self.bread, "Bread special", amount=-0.25)
+        self.reciept.add_discount(extra)
+        self.assertEqual(self.reciept.discounts, [self.discount, extra])
+        self.assertEqual(snapshot, [self.discount])
+        self.assertIn(extra, self.reciept.discounts)
+
+    def test_views_compare_equal_to_sequences_with_the_same_elements(self):
+        empty = receipt.Receipt()
+        self.assertEqual([], empty.discounts)
+        self.assertEqual(empty.items, ())
+        self.assertEqual(empty.items, receipt.Receipt().items)
+        self.assertNotEqual(self.reciept.discounts, [])
+        self.assertNotEqual(self.reciept.discounts, "not a sequence of discounts")
+        self.assertEqual(self.reciept.discounts[:], [self.discount])
+
     def test_total_price_calculates_correctly_with_discounts(self):
         """Verifies the final total price calculation."""
         # Expected calculation: (3.00 + 2.00) + (-0.50) = 4.50
@@ -61,6 +88,84 @@ class TestReceipt(unittest.TestCase):
         
         self.assertTrue(math.isclose(actual_total, expected_total, rel_tol=1e-9))
 
+    def test_running_totals_are_kept_up_to_date(self):
+        """Verifies the subtotal and discount total follow every add."""
+        self.assertTrue(math.isclose(self.reciept.subtotal, 5.00))
+        self.assertEqual(self.reciept.discount_total, -0.50)
+
+        self.reciept.add_product(self.bread, 1.0, 2.00, 2.00)
+        self.assertTrue(math.isclose(self.reciept.subtotal, 7.00))
+        self.assertTrue(math.isclose(self.reciept.total_price(), 6.50))
+
+    def test_replaced_product_updates_the_totals(self):
+        """A product scanned again into its aggregated line replaces the line in place."""
+        self.reciept.replace_product(0, self.milk, 3.0, 1.50, 4.50)
+        self.assertEqual(self.reciept.items[0].quantity, 3.0)
+        self.assertEqual([item.product for item in self.reciept.items], [self.milk, self.bread])
+        self.assertTrue(math.isclose(self.reciept.subtotal, 6.50))
+        self.assertTrue(math.isclose(self.reciept.total_price(), 6.00))
+
+        money = receipt.Receipt(money=True)
+        money.add_product_minor(self.milk, 1, 150, 150)
+        money.replace_product_minor(0, self.milk, 2, 150, 300)
+        self.assertEqual(money.total_price().minor, 300)
+        with self.assertRaises(TypeError):
+            self.reciept.replace_product_minor(0, self.milk, 2, 150, 300)
+
+    def test_removed_discounts_leave_the_others_and_the_totals(self):
+        """Removing swaps the last discount in, equal discounts are removed one at a time."""
+        extra = Discount(self.bread, "Bread special", amount=-0.25)
+        for discount in (extra, self.discount, extra):
+            self.reciept.add_discount(discount)
+
+        self.reciept.remove_discount(self.discount)
+        self.reciept.remove_discount(extra)
+        self.assertEqual(sorted(d.description for d in self.reciept.discounts), ["Bread special", "Milk special"])
+        self.assertTrue(math.isclose(self.reciept.discount_total, -0.75))
+
+        self.reciept.add_discount(self.discount)
+        for discount in (self.discount, extra, self.discount):
+            self.reciept.remove_discount(discount)
+        self.assertEqual(self.reciept.discounts, [])
+        self.assertTrue(math.isclose(self.reciept.total_price(), 5.00))
+        with self.assertRaises(ValueError):
+            self.reciept.remove_discount(self.discount)
+
+    def test_empty_receipt_totals_are_zero(self):
+        empty = receipt.Receipt()
+        self.assertEqual(empty.total_price(), 0)
+        self.assertEqual(empty.subtotal, 0)
+        self.assertEqual(empty.discount_total, 0)
+
+    def test_exact_receipt_accumulates_without_float_drift(self):
+        """0.1 added ten times drifts with floats, not with the exact option."""
+        exact = receipt.Receipt(exact=True)
+        floating = receipt.Receipt()
+        for _ in range(10):
+            exact.add_product(self.milk, 1, 0.1, 0.1)
+            floating.add_product(self.milk, 1, 0.1, 0.1)
+
+        self.assertNotEqual(floating.total_price(), 1.0)
+        self.assertEqual(exact.total_price(), Decimal("1.0"))
+
+        exact.add_discount(Discount(self.milk, "Milk special", amount=-0.3))
+        self.assertEqual(exact.discount_total, Decimal("-0.3"))
+        self.assertEqual(exact.total_price(), Decimal("0.7"))
+
+    def test_added_columns_match_lines_added_one_by_one(self):
+        columns = ([self.milk, self.bread, self.milk], [1, 0.1, 3], [0.1, 0.2, 0.7], [0.1, 0.02, 2.1])
+        for options in ({}, {"exact": True}, {"money": True}):
+            with self.subTest(**options):
+                one_by_one = receipt.Receipt(**options)
+                for line in zip(*columns):
+                    one_by_one.add_product(*line)
+                added = receipt.Receipt(**options)
+                added.add_products(*columns)
+
+                self.assertEqual(added.items, one_by_one.items)
+                self.assertEqual(added.total_price(), one_by_one.total_price())
+                self.assertEqual(added.subtotal, one_by_one.subtotal)
+
     def test_generate_output_executes_single_formatter_strategy(self):
         """Verifies that a single formatter is correctly executed."""
         formatter = TextFormatter()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 # Import the class under test (assuming the file is named receipt_formatter.py or similar)
@@ -125,6 +126,36 @@ class TestTextReceiptFormatter(unittest.TestCase):
         expected = name + (" " * 28) + value + "\n"
         self.assertEqual(self.formatter._present_total(receipt_mock), expected)
 
+    # --- Test Streaming ---
+
+    def _receipt(self):
+        items = [ReceiptItemStub(self.banana, 1, 0.50, 0.50), ReceiptItemStub(self.apples, 2.0, 2.00, 4.00)]
+        discounts = [DiscountStub(self.apples, "10.0% off", -0.40)]
+        return ReceiptStub(items, discounts, 4.10)
+
+    def test_iter_lines_joins_to_format_receipt(self):
+        receipt = self._receipt()
+        expected = ("banana" + (" " * 30) + "0.50\n"
+                    + "apples" + (" " * 30) + "4.00\n" + "  2.00 * 2.000\n"
+                    + "10.0% off (apples)" + (" " * 17) + "-0.40\n"
+                    + "\n"
+                    + "Total: " + (" " * 29) + "4.10\n")
+        self.assertEqual(self.formatter.format_receipt(receipt), expected)
+        self.assertEqual("".join(self.formatter.iter_lines(receipt)), expected)
+
+    def test_write_receipt_streams_the_same_output(self):
+        receipt = self._receipt()
+        stream = io.StringIO()
+        self.formatter.write_receipt(receipt, stream)
+        self.assertEqual(stream.getvalue(), self.formatter.format_receipt(receipt))
+
+    def test_format_many_separates_receipts(self):
+        receipts = [self._receipt(), ReceiptStub([], [], 0.0)]
+        stream = io.StringIO()
+        self.formatter.format_many(receipts, stream)
+        expected = self.formatter.format_receipt(receipts[0]) + "\n" + self.formatter.format_receipt(receipts[1])
+        self.assertEqual(stream.getvalue(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
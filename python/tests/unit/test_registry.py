@@ -0,0 +1,90 @@
+import unittest
+
+from catalog import InMemoryCatalog
+from models.products import Product, ProductUnit
+from models.registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+class TestProductRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ProductRegistry()
+
+    def test_ids_are_dense_and_stable(self):
+        apples = Product("apples", ProductUnit.KILO)
+        rice = Product("rice", ProductUnit.EACH)
+        self.assertEqual(self.registry.intern(apples), 0)
+        self.assertEqual(self.registry.intern(rice), 1)
+        self.assertEqual(self.registry.intern(Product("apples", ProductUnit.KILO)), 0)
+        self.assertEqual(len(self.registry), 2)
+        self.assertIs(self.registry.product(1), rice)
+
+    def test_id_of_does_not_register(self):
+        apples = Product("apples", ProductUnit.KILO)
+        self.assertIsNone(self.registry.id_of(apples))
+        self.assertNotIn(apples, self.registry)
+        self.assertEqual(len(self.registry), 0)
+
+    def test_same_name_with_another_unit_is_another_product(self):
+        by_weight = Product("apples", ProductUnit.KILO)
+        by_piece = Product("apples", ProductUnit.EACH)
+        self.assertNotEqual(self.registry.intern(by_weight), self.registry.intern(by_piece))
+
+    def test_cart_and_catalog_no_longer_collide_on_names(self):
+        by_weight = Product("apples", ProductUnit.KILO)
+        by_piece = Product("apples", ProductUnit.EACH)
+        catalog = FakeCatalog(self.registry)
+        catalog.add_product(by_weight, 1.99)
+        catalog.add_product(by_piece, 0.45)
+        cart = ShoppingCart(self.registry)
+        cart.add_item_quantity(by_weight, 1.5)
+        cart.add_item_quantity(by_piece, 4)
+
+        self.assertEqual(cart.get_product_quantity(by_weight), 1.5)
+        self.assertEqual(cart.get_product_quantity(by_piece), 4)
+        self.assertEqual(catalog.get_unit_price(by_weight), 1.99)
+        self.assertEqual(catalog.get_unit_price(by_piece), 0.45)
+
+    def test_in_memory_catalog_indexes_prices_by_id(self):
+        by_weight = Product("apples", ProductUnit.KILO)
+        by_piece = Product("apples", ProductUnit.EACH)
+        rice = Product("rice", ProductUnit.EACH)
+        self.registry.intern(rice)
+        catalog = InMemoryCatalog(self.registry)
+        catalog.add_product(by_weight, 1.99)
+        catalog.add_product(by_piece, 0.45)
+
+        self.assertEqual(catalog.get_unit_prices([by_weight, by_piece]), {by_weight: 1.99, by_piece: 0.45})
+        self.assertEqual(list(catalog.products()), [by_weight, by_piece])
+        self.assertEqual(len(catalog), 2)
+        with self.assertRaisesRegex(KeyError, "Missing product in prices list"):
+            catalog.get_unit_price(rice)
+
+    def test_cart_of_another_registry_is_rejected(self):
+        apples = Product("apples", ProductUnit.KILO)
+        catalog = InMemoryCatalog(self.registry)
+        catalog.add_product(apples, 1.99)
+        teller = Teller(catalog, self.registry)
+        cart = ShoppingCart()
+        cart.add_item_quantity(apples, 1)
+
+        with self.assertRaises(ValueError):
+            teller.checks_out_articles_from(cart)
+
+    def test_teller_takes_the_registry_of_its_catalog(self):
+        apples = Product("apples", ProductUnit.KILO)
+        catalog = InMemoryCatalog(self.registry)
+        catalog.add_product(apples, 1.99)
+        teller = Teller(catalog)
+        cart = ShoppingCart(teller.registry)
+        cart.add_item_quantity(apples, 2)
+
+        self.assertIs(teller.registry, self.registry)
+        self.assertAlmostEqual(teller.checks_out_articles_from(cart).total_price(), 3.98)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from models.offers import BuyNGetMFreeStrategy
+from models.products import Product, ProductQuantity, ProductUnit
+from models.registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+
+
+class TestShoppingCartAggregation(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ProductRegistry()
+        self.cans = Product("cans", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog = FakeCatalog(self.registry)
+        self.catalog.add_product(self.cans, 0.89)
+        self.catalog.add_product(self.apples, 1.99)
+
+    def scan(self, cart):
+        for _ in range(24):
+            cart.add_item(self.cans)
+        cart.add_item_quantity(self.apples, 0.5)
+        cart.add_item_quantity(self.apples, 1.25)
+        return cart
+
+    def test_repeated_scans_collapse_into_one_line(self):
+        cart = self.scan(ShoppingCart(self.registry, aggregate=True))
+        self.assertEqual(cart.items, [ProductQuantity(self.cans, 24.0), ProductQuantity(self.apples, 1.75)])
+        self.assertEqual(cart.get_product_quantity(self.cans), 24.0)
+
+    def test_aggregated_receipt_has_one_line_per_product_and_the_same_total(self):
+        teller = Teller(self.catalog, self.registry)
+        teller.add_special_offer(BuyNGetMFreeStrategy(self.cans, 3, 2))
+        per_scan = teller.checks_out_articles_from(self.scan(ShoppingCart(self.registry)))
+        aggregated = teller.checks_out_articles_from(self.scan(ShoppingCart(self.registry, aggregate=True)))
+
+        self.assertEqual(len(per_scan.items), 26)
+        self.assertEqual([(item.product, item.quantity) for item in aggregated.items],
+                         [(self.cans, 24.0), (self.apples, 1.75)])
+        self.assertAlmostEqual(aggregated.total_price(), per_scan.total_price())
+        self.assertEqual(aggregated.discounts, per_scan.discounts)
+
+    def test_scans_are_kept_for_the_audit_trail(self):
+        cart = ShoppingCart(self.registry, aggregate=True, keep_scans=True)
+        cart.add_item(self.cans)
+        cart.add_item_quantity(self.apples, 0.5)
+        cart.add_item(self.cans)
+        self.assertEqual(cart.scans, [ProductQuantity(self.cans, 1.0), ProductQuantity(self.apples, 0.5),
+                                      ProductQuantity(self.cans, 1.0)])
+        self.assertEqual(len(cart.items), 2)
+
+    def test_scans_of_a_cart_that_does_not_aggregate_are_its_items(self):
+        cart = self.scan(ShoppingCart(self.registry))
+        self.assertIs(cart.scans, cart.items)
+
+    def test_aggregating_cart_without_keep_scans_has_no_scans(self):
+        cart = ShoppingCart(self.registry, aggregate=True)
+        with self.assertRaises(ValueError):
+            cart.scans
+
+    def test_listeners_are_called_for_every_scan(self):
+        cart = ShoppingCart(self.registry, aggregate=True)
+        calls = []
+        cart.subscribe(lambda product, quantity: calls.append((product, quantity)))
+        cart.add_item(self.cans)
+        cart.add_item(self.cans)
+        self.assertEqual(calls, [(self.cans, 1.0), (self.cans, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
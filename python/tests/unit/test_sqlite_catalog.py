@@ -0,0 +1,67 @@
+import unittest
+
+from models.offers import BuyNGetMFreeStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from sqlite_catalog import SqliteCatalog
+from teller import Teller
+
+
+class TestSqliteCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = SqliteCatalog()
+        self.products = [Product(f"product-{index}", ProductUnit.EACH) for index in range(2000)]
+        self.catalog.add_products((product, 1.0 + index / 100) for index, product in enumerate(self.products))
+        self.catalog.round_trips = 0
+
+    def tearDown(self):
+        self.catalog.close()
+
+    def test_get_unit_price(self):
+        self.assertEqual(self.catalog.get_unit_price(self.products[5]), 1.05)
+        self.assertEqual(self.catalog.round_trips, 1)
+
+    def test_bulk_lookup_uses_one_query_per_chunk(self):
+        prices = self.catalog.get_unit_prices(self.products[:50])
+        self.assertEqual(self.catalog.round_trips, 1)
+        self.assertEqual(prices[self.products[49]], 1.49)
+
+        self.catalog.round_trips = 0
+        prices = self.catalog.get_unit_prices(self.products)
+        self.assertEqual(len(prices), 2000)
+        self.assertEqual(self.catalog.round_trips, 3)
+
+    def test_missing_product_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.catalog.get_unit_prices([self.products[0], Product("unknown", ProductUnit.EACH)])
+
+    def test_same_name_with_another_unit_is_another_product(self):
+        kilo = Product("product-0", ProductUnit.KILO)
+        self.catalog.add_product(kilo, 4.99)
+
+        self.assertEqual(self.catalog.get_unit_price(kilo), 4.99)
+        self.assertEqual(self.catalog.get_unit_prices([self.products[0], kilo]), {self.products[0]: 1.0, kilo: 4.99})
+        with self.assertRaises(KeyError):
+            self.catalog.get_unit_price(Product("product-1", ProductUnit.KILO))
+
+    def test_price_change_replaces_the_row(self):
+        self.catalog.add_product(self.products[0], 9.99)
+        self.assertEqual(self.catalog.get_unit_price(self.products[0]), 9.99)
+
+    def test_checkout_prices_the_cart_in_one_round_trip(self):
+        teller = Teller(self.catalog)
+        teller.add_special_offer(BuyNGetMFreeStrategy(self.products[0], 3, 2))
+        cart = ShoppingCart()
+        for product in self.products[:20]:
+            cart.add_item_quantity(product, 3)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertEqual(self.catalog.round_trips, 1)
+        self.assertEqual(len(receipt.items), 20)
+        self.assertAlmostEqual(receipt.discounts[0].amount, -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
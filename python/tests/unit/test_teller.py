@@ -20,6 +20,17 @@ class InlineFakeStrategy:
         return self._discounts
 
 
+class TargetedFakeStrategy(InlineFakeStrategy):
+    def __init__(self, target_product, discounts_to_return):
+        super().__init__(discounts_to_return)
+        self.target_product = target_product
+        self.calls = 0
+
+    def calculate_discount(self, cart, catalog):
+        self.calls += 1
+        return super().calculate_discount(cart, catalog)
+
+
 class TestTeller(unittest.TestCase):
 
     def test_add_special_offer_appends(self):
@@ -84,5 +95,66 @@ class TestTeller(unittest.TestCase):
             self.assertEqual(d.amount, -1.25)
 
 
+    def test_offers_for_products_not_in_cart_are_not_evaluated(self):
+        with patch.object(teller, "Receipt", FakeReceipt):
+            soap = ProductStub(name="soap")
+            rice = ProductStub(name="rice")
+            cart = FakeCart()
+            cart.items = [ProductQuantityStub(soap, 1)]
+            cart.set_item_quantity(soap, 1)
+
+            catalog = FakeCatalog()
+            catalog.add_product(soap, 1.25)
+
+            soap_offer = TargetedFakeStrategy(soap, [])
+            rice_offer = TargetedFakeStrategy(rice, [])
+            t = teller.Teller(catalog)
+            t.add_special_offer(rice_offer)
+            t.add_special_offer(soap_offer)
+
+            t.checks_out_articles_from(cart)
+
+            self.assertEqual(soap_offer.calls, 1)
+            self.assertEqual(rice_offer.calls, 0)
+
+    def test_discounts_keep_offer_registration_order(self):
+        with patch.object(teller, "Receipt", FakeReceipt):
+            soap = ProductStub(name="soap")
+            rice = ProductStub(name="rice")
+            cart = FakeCart()
+            cart.items = [ProductQuantityStub(soap, 1), ProductQuantityStub(rice, 1)]
+            cart.set_item_quantity(soap, 1)
+            cart.set_item_quantity(rice, 1)
+
+            catalog = FakeCatalog()
+            catalog.add_product(soap, 1.25)
+            catalog.add_product(rice, 2.00)
+
+            rice_discount = Discount(product=rice, description="rice special", amount=-0.5)
+            soap_discount = Discount(product=soap, description="soap special", amount=-0.25)
+            t = teller.Teller(catalog)
+            t.add_special_offer(TargetedFakeStrategy(rice, [rice_discount]))
+            t.add_special_offer(TargetedFakeStrategy(soap, [soap_discount]))
+
+            receipt = t.checks_out_articles_from(cart)
+
+            self.assertEqual(receipt.discounts, [rice_discount, soap_discount])
+
+    def test_remove_special_offer_drops_it_from_the_index(self):
+        catalog = FakeCatalog()
+        soap = ProductStub(name="soap")
+        strat = TargetedFakeStrategy(soap, [])
+        t = teller.Teller(catalog)
+        t.add_special_offer(strat)
+        self.assertEqual(t.offers_for(soap), [strat])
+
+        t.remove_special_offer(strat)
+
+        self.assertEqual(t.offers, ())
+        self.assertEqual(t.offers_for(soap), [])
+        with self.assertRaises(ValueError):
+            t.remove_special_offer(strat)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from models.bundles import FixedBundleStrategy, MixAndMatchBundleStrategy
+from models.offers import BuyNGetMFreeStrategy, PercentDiscountStrategy, BuyQuantityForAmountStrategy
+from models.products import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.mockers.fake_catalog import FakeCatalog
+from tests.mockers.fake_offers import FlatOffStrategy
+import vectorized_pricing
+
+
+def receipt_rows(receipt):
+    return (
+        [(i.product, i.quantity, i.price, i.total_price) for i in receipt.items],
+        [(d.product, d.description, d.amount) for d in receipt.discounts],
+        receipt.total_price(),
+    )
+
+
+@unittest.skipIf(vectorized_pricing.np is None, "numpy is not installed")
+class VectorizedPricingEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.products = []
+        for index in range(12):
+            unit = ProductUnit.KILO if index % 3 == 0 else ProductUnit.EACH
+            product = Product(f"product-{index}", unit)
+            self.catalog.add_product(product, round(0.49 + index * 0.37, 2))
+            self.products.append(product)
+
+        self.teller = Teller(self.catalog)
+        p = self.products
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(p[1], 3, 2))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[0], 10.0))
+        self.teller.add_special_offer(BuyQuantityForAmountStrategy(p[2], 5, 1.99))
+        self.teller.add_special_offer(FlatOffStrategy(p[4], 2, 0.10))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[1], 5.0))
+        self.teller.add_special_offer(BuyQuantityForAmountStrategy(p[11], 2, 100.0))  # never a discount
+
+    def random_carts(self, count):
+        rng = random.Random(7)
+        carts = []
+        for _ in range(count):
+            cart = ShoppingCart()
+            for _ in range(rng.randint(0, 8)):
+                product = rng.choice(self.products)
+                quantity = round(rng.uniform(0.1, 3.0), 3) if product.unit == ProductUnit.KILO else rng.randint(1, 7)
+                cart.add_item_quantity(product, quantity)
+            carts.append(cart)
+        return carts
+
+    def test_receipts_match_scalar_checkout(self):
+        carts = self.random_carts(200)
+        engine = vectorized_pricing.VectorizedPricingEngine(self.teller)
+
+        receipts = engine.price_carts(carts)
+
+        self.assertEqual(len(receipts), len(carts))
+        for receipt, cart in zip(receipts, carts):
+            self.assertEqual(receipt_rows(receipt), receipt_rows(self.teller.checks_out_articles_from(cart)))
+
+    def test_exclusive_offers_match_scalar_checkout(self):
+        p = self.products
+        self.teller.add_special_offer(BuyNGetMFreeStrategy(p[5], 3, 2, exclusive=True))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[5], 20.0, exclusive=True))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[6], 15.0, exclusive=True))
+        self.teller.add_special_offer(BuyQuantityForAmountStrategy(p[6], 2, 1.00, exclusive=True))
+        carts = self.random_carts(200)
+        engine = vectorized_pricing.VectorizedPricingEngine(self.teller)
+
+        for receipt, cart in zip(engine.price_carts(carts), carts):
+            self.assertEqual(receipt_rows(receipt), receipt_rows(self.teller.checks_out_articles_from(cart)))
+
+    def test_bundles_match_scalar_checkout(self):
+        p = self.products
+        self.teller.add_special_offer(FixedBundleStrategy([p[7], p[8]], 3.50))
+        self.teller.add_special_offer(MixAndMatchBundleStrategy([p[8], p[10], p[1]], 3, 4.00))
+        carts = self.random_carts(200)
+        engine = vectorized_pricing.VectorizedPricingEngine(self.teller)
+
+        for receipt, cart in zip(engine.price_carts(carts), carts):
+            self.assertEqual(receipt_rows(receipt), receipt_rows(self.teller.checks_out_articles_from(cart)))
+
+    def test_discount_order_matches_scalar_checkout_after_removing_offers(self):
+        p = self.products
+        removed = PercentDiscountStrategy(p[5], 50.0)
+        self.teller.add_special_offer(removed)
+        self.teller.add_special_offer(FixedBundleStrategy([p[5], p[1]], 1.00))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[5], 20.0, exclusive=True))
+        self.teller.remove_special_offer(removed)
+        self.teller.add_special_offer(FlatOffStrategy(p[5], 1, 0.10))
+        self.teller.add_special_offer(PercentDiscountStrategy(p[5], 10.0))
+        cart = ShoppingCart()
+        cart.add_item_quantity(p[5], 2)
+        cart.add_item_quantity(p[1], 3)
+        engine = vectorized_pricing.VectorizedPricingEngine(self.teller)
+
+        receipt = engine.price_carts([cart])[0]
+
+        self.assertEqual(receipt_rows(receipt), receipt_rows(self.teller.checks_out_articles_from(cart)))
+        self.assertEqual([d.description for d in receipt.discounts][-4:],
+                         ["bundle for 1.00", "20.0% off", "flat 0.10 off", "10.0% off"])
+
+    def test_empty_batch(self):
+        engine = vectorized_pricing.VectorizedPricingEngine(self.teller)
+        self.assertEqual(engine.price_carts([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
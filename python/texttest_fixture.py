@@ -9,11 +9,19 @@ import csv
 from pathlib import Path
 
 from models.products import Product, ProductUnit
-from models.offers import SpecialOfferType
-from receipt_printer import ReceiptPrinter
+from models.offers import BuyNGetMFreeStrategy, BuyQuantityForAmountStrategy, PercentDiscountStrategy
+from receipt_printer import TextReceiptFormatter
 from shopping_cart import ShoppingCart
 from teller import Teller
-from tests.fake_catalog import FakeCatalog
+from tests.mockers.fake_catalog import FakeCatalog
+
+# offer column of offers.csv -> strategy built from (product, argument)
+OFFER_TYPES = {
+    "THREE_FOR_TWO": lambda product, argument: BuyNGetMFreeStrategy(product, 3, 2),
+    "TEN_PERCENT_DISCOUNT": lambda product, argument: PercentDiscountStrategy(product, argument),
+    "TWO_FOR_AMOUNT": lambda product, argument: BuyQuantityForAmountStrategy(product, 2, argument),
+    "FIVE_FOR_AMOUNT": lambda product, argument: BuyQuantityForAmountStrategy(product, 5, argument),
+}
 
 
 def read_catalog(catalog_file):
@@ -31,17 +39,19 @@ def read_catalog(catalog_file):
     return catalog
 
 
-def read_offers(offers_file, teller):
+def read_offers(offers_file, teller, catalog):
     if not offers_file.exists():
         return
     with open(offers_file, "r", encoding='utf-8') as f:
         reader = csv.DictReader(f)
+        offers = []
         for row in reader:
             name = row['name']
-            offerType = SpecialOfferType[row['offer']]
+            offer_type = OFFER_TYPES[row['offer']]
             argument = float(row['argument'])
-            product = teller.product_with_name(name)
-            teller.add_special_offer(offerType, product, argument)
+            product = catalog.products[name]
+            offers.append(offer_type(product, argument))
+    teller.add_special_offers(offers)
 
 
 def read_basket(cart_file, catalog):
@@ -61,10 +71,10 @@ def read_basket(cart_file, catalog):
 def main(args):
     catalog = read_catalog(Path("catalog.csv"))
     teller = Teller(catalog)
-    read_offers(Path("offers.csv"), teller)
+    read_offers(Path("offers.csv"), teller, catalog)
     basket = read_basket(Path("cart.csv"), catalog)
     receipt = teller.checks_out_articles_from(basket)
-    print(ReceiptPrinter().print_receipt(receipt))
+    print(TextReceiptFormatter().format_receipt(receipt))
 
 
 if __name__ == "__main__":